@@ -0,0 +1,88 @@
+"""Compares the throughput and memory usage of each dictionary and split mode.
+
+Each configuration is measured in a fresh interpreter, so the memory of one
+dictionary doesn't count towards another. All configurations tokenize the same
+corpus. Dictionaries whose SudachiDict package isn't installed are skipped.
+Memory is read from /proc, so the memory columns require Linux.
+
+Usage: python benchmarks/bench_dictionaries.py [--sentences N] [--dict small core full] [--mode A B C]
+"""
+import json
+import subprocess
+import sys
+from argparse import ArgumentParser
+from importlib.util import find_spec
+
+MEASUREMENT = '''
+import json, sys, time
+sys.path.insert(0, {benchmarks!r})
+from corpus import generate_corpus
+import dango
+
+
+def read_memory():
+    try:
+        with open('/proc/self/smaps_rollup') as f:
+            usage = {{p[0].rstrip(':'): int(p[1]) for p in map(str.split, f) if len(p) == 3 and p[2] == 'kB'}}
+        return usage['Rss'], usage['Private_Clean'] + usage['Private_Dirty']
+    except OSError:
+        return None, None
+
+
+sentences = generate_corpus({sentences})
+start = time.perf_counter()
+tokenizer = dango.Tokenizer(dictionary_type={dictionary_type!r}, split_mode={split_mode!r})
+loaded = time.perf_counter()
+words = sum(len(tokenizer.tokenize(s)) for s in sentences)
+tokenized = time.perf_counter()
+rss, private = read_memory()
+print(json.dumps({{
+    'load': loaded - start, 'tokenize': tokenized - loaded, 'words': words, 'rss': rss, 'private': private
+}}))
+'''
+
+
+def measure(dictionary_type: str, split_mode: str, sentences: int) -> dict:
+    """Returns the measurements of tokenizing the corpus with the given configuration in a fresh interpreter.
+
+    Args:
+        dictionary_type: The SudachiDict system dictionary to use.
+        split_mode: The SudachiPy split mode to use.
+        sentences: The number of sentences in the corpus.
+    """
+    code = MEASUREMENT.format(
+        benchmarks=sys.path[0], sentences=sentences, dictionary_type=dictionary_type, split_mode=split_mode)
+    output = subprocess.run([sys.executable, '-c', code], check=True, stdout=subprocess.PIPE).stdout
+    return json.loads(output)
+
+
+def format_memory(kilobytes) -> str:
+    return '{:>9,} kB'.format(kilobytes) if kilobytes is not None else '{:>12}'.format('n/a')
+
+
+def main():
+    parser = ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--sentences', type=int, default=5000, help='the number of sentences to tokenize')
+    parser.add_argument('--dict', nargs='+', default=['small', 'core', 'full'], dest='dictionary_types',
+                        help='the dictionaries to compare')
+    parser.add_argument('--mode', nargs='+', default=['A', 'B', 'C'], dest='split_modes',
+                        help='the split modes to compare')
+    args = parser.parse_args()
+
+    print('{:>5} {:>4} {:>9} {:>12} {:>10} {:>12} {:>12}'.format(
+        'dict', 'mode', 'load', 'sentences/s', 'words', 'RSS', 'private'))
+
+    for dictionary_type in args.dictionary_types:
+        if find_spec('sudachidict_{}'.format(dictionary_type)) is None:
+            print('{:>5} skipped, SudachiDict-{} is not installed'.format(dictionary_type, dictionary_type))
+            continue
+
+        for split_mode in args.split_modes:
+            result = measure(dictionary_type, split_mode, args.sentences)
+            print('{:>5} {:>4} {:>6.0f} ms {:>12,.0f} {:>10,} {} {}'.format(
+                dictionary_type, split_mode, result['load'] * 1000, args.sentences / result['tokenize'],
+                result['words'], format_memory(result['rss']), format_memory(result['private'])))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,42 @@
+"""Compares the word aggregation FSM with its compiled transition table.
+
+Usage: python benchmarks/bench_fsm.py [--sentences N] [--repeat N]
+"""
+import timeit
+from argparse import ArgumentParser
+
+from corpus import generate_corpus
+
+from dango.dango import WORD_AGGREGATION_FSM, Tokenizer
+
+
+def main():
+    parser = ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--sentences', type=int, default=2000, help='the number of sentences in the text')
+    parser.add_argument('--repeat', type=int, default=5, help='the number of times each variant is run')
+    args = parser.parse_args()
+
+    tokenizer = Tokenizer()
+    text = ''.join(generate_corpus(args.sentences))
+    # Morpheme objects cache their word info, so we materialize them once
+    # up front to measure only the cost of the state machines themselves.
+    morphemes = list(tokenizer._tokenizer.tokenize(text))
+    for m in morphemes:
+        m.get_word_info()
+
+    compiled = tokenizer._aggregation_fsm
+    assert WORD_AGGREGATION_FSM.run([], morphemes) == compiled.run([], morphemes)
+
+    print('{} characters, {} morphemes'.format(len(text), len(morphemes)))
+
+    results = {}
+    for name, fsm in [('features', WORD_AGGREGATION_FSM), ('compiled', compiled)]:
+        results[name] = min(timeit.repeat(lambda: fsm.run([], morphemes), number=1, repeat=args.repeat))
+        print('{:>10}: {:8.2f} ms ({:,.0f} morphemes/s)'.format(
+            name, results[name] * 1000, len(morphemes) / results[name]))
+
+    print('speedup: {:.1f}x'.format(results['features'] / results['compiled']))
+
+
+if __name__ == '__main__':
+    main()
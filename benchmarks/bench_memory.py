@@ -0,0 +1,75 @@
+"""Measures the memory used by each additional worker process that tokenizes text.
+
+Workers are either forked from a parent that already loaded the dictionary or
+started independently. In both cases the memory mapped dictionary is shared,
+so the private memory of a worker should be small compared to its RSS.
+Requires Linux, since memory usage is read from /proc.
+
+Usage: python benchmarks/bench_memory.py [--workers N] [--start-method fork|spawn]
+"""
+import multiprocessing
+from argparse import ArgumentParser
+from typing import Dict
+
+from corpus import generate_corpus
+
+import dango
+
+
+def read_memory(pid: str = 'self') -> Dict[str, int]:
+    """Returns the memory usage of a process in kB as reported by /proc/<pid>/smaps_rollup.
+
+    Args:
+        pid: The ID of the process.
+    """
+    usage = {}
+    with open('/proc/{}/smaps_rollup'.format(pid)) as f:
+        for line in f:
+            parts = line.split()
+            if len(parts) == 3 and parts[2] == 'kB':
+                usage[parts[0].rstrip(':')] = int(parts[1])
+    return usage
+
+
+# The tokenizer of the current worker process. When forking it is inherited
+# from the parent, otherwise it is reconstructed from its options.
+worker_tokenizer = None
+
+
+def init_worker(tokenizer: dango.Tokenizer) -> None:
+    global worker_tokenizer
+    worker_tokenizer = tokenizer
+
+
+def work(sentences) -> Dict[str, int]:
+    for s in sentences:
+        worker_tokenizer.tokenize(s)
+    return read_memory()
+
+
+def main():
+    parser = ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--workers', type=int, default=4, help='the number of worker processes')
+    parser.add_argument('--sentences', type=int, default=2000, help='the number of sentences per worker')
+    parser.add_argument('--start-method', choices=['fork', 'spawn', 'forkserver'], default='fork',
+                        help='how worker processes are started')
+    args = parser.parse_args()
+
+    tokenizer = dango.Tokenizer()
+    tokenizer.tokenize('私は昨日映画を見ました')
+    parent = read_memory()
+    print('parent: RSS {:>8,} kB, PSS {:>8,} kB'.format(parent['Rss'], parent['Pss']))
+
+    sentences = generate_corpus(args.sentences)
+    context = multiprocessing.get_context(args.start_method)
+    with context.Pool(args.workers, initializer=init_worker, initargs=(tokenizer,)) as pool:
+        results = pool.map(work, [sentences] * args.workers, chunksize=1)
+
+    for i, usage in enumerate(results):
+        private = usage['Private_Clean'] + usage['Private_Dirty']
+        print('worker {}: RSS {:>8,} kB, PSS {:>8,} kB, private {:>8,} kB'.format(
+            i, usage['Rss'], usage['Pss'], private))
+
+
+if __name__ == '__main__':
+    main()
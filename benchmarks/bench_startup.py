@@ -0,0 +1,44 @@
+"""Measures the import time of dango and the time until the first phrase is tokenized.
+
+Each measurement is taken in a fresh interpreter, so nothing is cached in the process.
+
+Usage: python benchmarks/bench_startup.py [--repeat N]
+"""
+import json
+import statistics
+import subprocess
+import sys
+from argparse import ArgumentParser
+
+MEASUREMENT = '''
+import json, time
+start = time.perf_counter()
+import dango
+imported = time.perf_counter()
+dango.tokenize('私は昨日映画を見ました')
+tokenized = time.perf_counter()
+print(json.dumps({'import': imported - start, 'first_token': tokenized - start}))
+'''
+
+
+def measure() -> dict:
+    """Returns the import time and time to first token in seconds of a fresh interpreter."""
+    output = subprocess.run([sys.executable, '-c', MEASUREMENT], check=True, stdout=subprocess.PIPE).stdout
+    return json.loads(output)
+
+
+def main():
+    parser = ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--repeat', type=int, default=5, help='the number of measurements to take')
+    args = parser.parse_args()
+
+    results = [measure() for _ in range(args.repeat)]
+
+    for name in ['import', 'first_token']:
+        values = [r[name] for r in results]
+        print('{:>12}: median {:7.1f} ms, min {:7.1f} ms'.format(
+            name, statistics.median(values) * 1000, min(values) * 1000))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,46 @@
+"""Generates an offline Japanese corpus for benchmarking.
+
+The corpus is assembled from a fixed set of phrases, so it does not need to be
+downloaded and is the same on every run for a given size and seed.
+"""
+import random
+from typing import List
+
+SUBJECTS = ['私は', '彼は', '先生が', '友達と', '子供たちは', '東京の会社員は', '隣の猫が', 'この店は']
+TIMES = ['', '昨日', '毎朝', '来週の日曜日に', '去年の夏', '今', '三時間前に']
+OBJECTS = ['映画を', '本を', 'ラーメンを', '日本語を', '手紙を', 'ケーキを', '新しい車を', '音楽を']
+PREDICATES = [
+    '見ました', '読む', '読まなかった', '食べています', '作ってみた', '勉強しなければならない',
+    '書いてない', '買いたいです', '聞いていませんでした', '食べられそう'
+]
+ADJECTIVE_CLAUSES = ['天気は良くなかった', 'このビルは高い', 'そのケーキはおいしそう', '部屋が静かで広い']
+PUNCTUATION = ['。', '！', '？', '、そして']
+
+
+def generate_sentence(rng: random.Random, max_clauses: int) -> str:
+    """Returns a random sentence made up of one or more clauses.
+
+    Args:
+        rng: The random number generator to use.
+        max_clauses: The maximum number of clauses in the sentence.
+    """
+    clauses = []
+    for _ in range(rng.randint(1, max_clauses)):
+        if rng.random() < 0.2:
+            clauses.append(rng.choice(ADJECTIVE_CLAUSES))
+        else:
+            clauses.append(rng.choice(SUBJECTS) + rng.choice(TIMES) + rng.choice(OBJECTS) + rng.choice(PREDICATES))
+        clauses.append(rng.choice(PUNCTUATION))
+    return ''.join(clauses[:-1]) + '。'
+
+
+def generate_corpus(sentences: int, max_clauses: int = 4, seed: int = 0) -> List[str]:
+    """Returns a list of random sentences of varying lengths.
+
+    Args:
+        sentences: The number of sentences to generate.
+        max_clauses: The maximum number of clauses per sentence.
+        seed: The seed for the random number generator.
+    """
+    rng = random.Random(seed)
+    return [generate_sentence(rng, max_clauses) for _ in range(sentences)]
@@ -0,0 +1,243 @@
+"""Runs the benchmark suite and compares the results with a saved baseline.
+
+The suite tokenizes generated corpora of short, medium and long sentences and
+measures the time of each stage of the tokenizer, the state machine, accessing
+word attributes, kana conversion, peak memory and import time. All metrics are
+lower-is-better. With --save the results become the new baseline, with --compare
+the run fails if any metric is slower than the baseline by more than the threshold.
+
+Baselines depend on the machine, so they should only be compared on the machine
+they were saved on.
+
+Usage: python benchmarks/suite.py [--save] [--compare] [--threshold 0.2] [--only NAME ...]
+"""
+import gc
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import timeit
+import tracemalloc
+from argparse import ArgumentParser
+from typing import Callable, Dict, List, Tuple
+
+from corpus import generate_corpus
+
+import dango
+from dango.dango import WORD_AGGREGATION_FSM, Tokenizer
+from dango.util import katakana_to_hiragana
+
+DEFAULT_BASELINE = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), '.benchmarks',
+                                'baseline.json')
+
+# The maximum number of clauses per sentence of each corpus.
+CORPORA = {'short': 1, 'medium': 4, 'long': 12}
+
+# A metric is its value and its unit, all metrics are lower-is-better.
+Metrics = Dict[str, Tuple[float, str]]
+
+
+def best_of(repeat: int, function: Callable[[], object]) -> float:
+    """Returns the shortest time in seconds of running a function repeatedly.
+
+    Args:
+        repeat: The number of times to run the function.
+        function: The function to run.
+    """
+    return min(timeit.repeat(function, number=1, repeat=repeat))
+
+
+def bench_tokenize(tokenizer: Tokenizer, sentences: int, repeat: int) -> Metrics:
+    """Measures Tokenizer.tokenize on corpora with different sentence lengths."""
+    metrics: Metrics = {}
+    for name, max_clauses in CORPORA.items():
+        corpus = generate_corpus(sentences, max_clauses)
+        words = sum(len(tokenizer.tokenize(s)) for s in corpus)
+        seconds = best_of(repeat, lambda: [tokenizer.tokenize(s) for s in corpus])
+        metrics['tokenize.{}'.format(name)] = (seconds, 's')
+        metrics['tokenize.{}.per_word'.format(name)] = (seconds / words * 1e6, 'us')
+    return metrics
+
+
+def bench_stages(tokenizer: Tokenizer, sentences: int, repeat: int) -> Metrics:
+    """Measures the time spent in SudachiPy, the aggregation state machine and word construction."""
+    corpus = generate_corpus(sentences)
+    timer = timeit.default_timer
+    stages: Dict[str, List[float]] = {'analysis': [], 'aggregation': [], 'words': []}
+
+    for _ in range(repeat):
+        # Morphemes cache their word info, so every repetition starts from fresh ones.
+        start = timer()
+        morphemes = [tokenizer._tokenizer.tokenize(s) for s in corpus]
+        analyzed = timer()
+        chunks = [tokenizer._aggregation_fsm.run([], mm) for mm in morphemes]
+        aggregated = timer()
+        for phrase, phrase_chunks in zip(corpus, chunks):
+            for chunk in phrase_chunks:
+                tokenizer.create_word(chunk, phrase)
+        created = timer()
+
+        stages['analysis'].append(analyzed - start)
+        stages['aggregation'].append(aggregated - analyzed)
+        stages['words'].append(created - aggregated)
+
+    return {'stage.{}'.format(name): (min(times), 's') for name, times in stages.items()}
+
+
+def bench_state_machine(tokenizer: Tokenizer, sentences: int, repeat: int) -> Metrics:
+    """Measures running the aggregation state machine by features and compiled."""
+    morphemes = list(tokenizer._tokenizer.tokenize(''.join(generate_corpus(sentences))))
+    compiled = tokenizer._aggregation_fsm
+    return {
+        'fsm.features': (best_of(repeat, lambda: WORD_AGGREGATION_FSM.run([], morphemes)), 's'),
+        'fsm.compiled': (best_of(repeat, lambda: compiled.run([], morphemes)), 's'),
+    }
+
+
+def bench_word_attributes(tokenizer: Tokenizer, sentences: int, repeat: int) -> Metrics:
+    """Measures accessing the attributes of words."""
+    words = [w for s in generate_corpus(sentences) for w in tokenizer.tokenize(s)]
+
+    def access():
+        for w in words:
+            w.surface, w.surface_reading, w.dictionary_form, w.dictionary_form_reading, w.part_of_speech
+
+    return {'word.attributes': (best_of(repeat, access), 's')}
+
+
+def bench_kana(tokenizer: Tokenizer, sentences: int, repeat: int) -> Metrics:
+    """Measures converting the readings of all morphemes to hiragana."""
+    readings = [m.reading_form() for m in tokenizer._tokenizer.tokenize(''.join(generate_corpus(sentences)))]
+    return {'kana.katakana_to_hiragana': (best_of(repeat, lambda: [katakana_to_hiragana(r) for r in readings]), 's')}
+
+
+def bench_memory(tokenizer: Tokenizer, sentences: int, repeat: int) -> Metrics:
+    """Measures the peak memory allocated while keeping the words of a corpus."""
+    corpus = generate_corpus(sentences)
+    compact = Tokenizer(compact=True, dictionary=tokenizer.dictionary)
+
+    metrics: Metrics = {}
+    for name, t in [('word', tokenizer), ('compact', compact)]:
+        gc.collect()
+        tracemalloc.start()
+        words = [t.tokenize(s) for s in corpus]
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        del words
+        metrics['memory.{}'.format(name)] = (peak / 1024, 'kB')
+    return metrics
+
+
+def bench_import(tokenizer: Tokenizer, sentences: int, repeat: int) -> Metrics:
+    """Measures importing dango and tokenizing the first phrase, each in a fresh interpreter."""
+    code = ('import time; start = time.perf_counter(); import dango; imported = time.perf_counter(); '
+            'dango.tokenize("私は昨日映画を見ました"); print(imported - start, time.perf_counter() - start)')
+    results = []
+    for _ in range(repeat):
+        output = subprocess.run([sys.executable, '-c', code], check=True, stdout=subprocess.PIPE).stdout
+        results.append([float(v) for v in output.split()])
+    return {
+        'startup.import': (statistics.median(r[0] for r in results), 's'),
+        'startup.first_token': (statistics.median(r[1] for r in results), 's'),
+    }
+
+
+BENCHMARKS = {
+    'tokenize': bench_tokenize,
+    'stages': bench_stages,
+    'fsm': bench_state_machine,
+    'word': bench_word_attributes,
+    'kana': bench_kana,
+    'memory': bench_memory,
+    'startup': bench_import,
+}
+
+
+def environment() -> Dict[str, str]:
+    """Returns a description of the environment the results were measured in."""
+    return {'python': platform.python_version(), 'machine': platform.machine(), 'node': platform.node(),
+            'dango': dango.__version__}
+
+
+def format_value(value: float, unit: str) -> str:
+    if unit == 's':
+        return '{:10.2f} ms'.format(value * 1000)
+    return '{:10.2f} {:2}'.format(value, unit)
+
+
+def compare(results: Metrics, baseline: Metrics, threshold: float) -> List[str]:
+    """Prints the results next to the baseline and returns the names of the metrics that regressed.
+
+    Args:
+        results: The results of this run.
+        baseline: The results of the baseline run.
+        threshold: The relative slowdown that counts as a regression, e.g. 0.2 for 20%.
+    """
+    regressions = []
+    for name, (value, unit) in results.items():
+        if name not in baseline:
+            print('{:32} {}   (no baseline)'.format(name, format_value(value, unit)))
+            continue
+
+        base = baseline[name][0]
+        change = (value - base) / base if base else 0.0
+        regressed = change > threshold
+        if regressed:
+            regressions.append(name)
+        print('{:32} {} {} {:+7.1%}{}'.format(
+            name, format_value(value, unit), format_value(base, unit), change, '  REGRESSION' if regressed else ''))
+    return regressions
+
+
+def main():
+    parser = ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--sentences', type=int, default=2000, help='the number of sentences per corpus')
+    parser.add_argument('--repeat', type=int, default=5, help='the number of times each benchmark is run')
+    parser.add_argument('--only', nargs='+', choices=BENCHMARKS, help='the benchmarks to run, by default all')
+    parser.add_argument('--baseline', default=DEFAULT_BASELINE, help='the path of the baseline file')
+    parser.add_argument('--save', action='store_true', help='save the results as the new baseline')
+    parser.add_argument('--compare', action='store_true',
+                        help='fail if any metric regressed compared to the baseline by more than the threshold')
+    parser.add_argument('--threshold', type=float, default=0.2,
+                        help='the relative slowdown that counts as a regression, e.g. 0.2 for 20%%')
+    args = parser.parse_args()
+
+    tokenizer = Tokenizer()
+    tokenizer.tokenize('私は昨日映画を見ました')
+
+    results: Metrics = {}
+    for name in args.only or BENCHMARKS:
+        results.update(BENCHMARKS[name](tokenizer, args.sentences, args.repeat))
+
+    baseline: Metrics = {}
+    if os.path.exists(args.baseline):
+        with open(args.baseline, encoding='utf-8') as f:
+            saved = json.load(f)
+        if saved['environment'] != environment():
+            print('warning: the baseline was measured in a different environment: {}'.format(saved['environment']))
+        if (saved['sentences'], saved['repeat']) != (args.sentences, args.repeat):
+            print('warning: the baseline was measured with --sentences {} --repeat {}'.format(
+                saved['sentences'], saved['repeat']))
+        baseline = {name: tuple(metric) for name, metric in saved['metrics'].items()}
+    elif args.compare:
+        parser.error('there is no baseline at {}, run with --save first'.format(args.baseline))
+
+    regressions = compare(results, baseline, args.threshold)
+
+    if args.save:
+        os.makedirs(os.path.dirname(os.path.abspath(args.baseline)), exist_ok=True)
+        with open(args.baseline, 'w', encoding='utf-8') as f:
+            json.dump({'environment': environment(), 'sentences': args.sentences, 'repeat': args.repeat,
+                       'metrics': dict(baseline, **results)}, f, indent=2)
+        print('saved baseline to {}'.format(args.baseline))
+
+    if args.compare and regressions:
+        print('{} metrics regressed by more than {:.0%}: {}'.format(
+            len(regressions), args.threshold, ', '.join(regressions)))
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
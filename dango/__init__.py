@@ -1,12 +1,38 @@
-from typing import List
+from typing import AbstractSet, Counter, Iterable, Iterator, List, Sequence, TextIO, Union
 
+from .cache import DiskPhraseCache, MemoryPhraseCache  # noqa: F401
+from .columns import TokenColumns
+from .corpus import Corpus  # noqa: F401
 from .dango import Tokenizer
-from .word import Word
+from .document import Document  # noqa: F401
+from .index import WordIndex  # noqa: F401
+from .metrics import TokenizerMetrics  # noqa: F401
+from .pool import TokenizerPool
+from .version import __version__  # noqa: F401
+from .vocabulary import DEFAULT_EXCLUDED_PARTS_OF_SPEECH, VocabularyEntry
+from .word import AnyWord, CompactWord, PartOfSpeech, Word  # noqa: F401
 
-DEFAULT_TOKENIZER = Tokenizer()
+# Tokenizers must not be used by multiple threads at once, so every thread uses its own.
+_default_pool = TokenizerPool()
 
 
-def tokenize(phrase: str) -> List[Word]:
+def get_default_tokenizer() -> Tokenizer:
+    """Returns the tokenizer used by the module level functions in the current thread.
+
+    The tokenizer is created on first use, so importing dango does not load the dictionary.
+    """
+    return _default_pool.get()
+
+
+def __getattr__(name: str):
+    # DEFAULT_TOKENIZER used to be created on import, it is kept available for
+    # backwards compatibility but is created lazily as well now.
+    if name == 'DEFAULT_TOKENIZER':
+        return get_default_tokenizer()
+    raise AttributeError('module {!r} has no attribute {!r}'.format(__name__, name))
+
+
+def tokenize(phrase: str) -> List[AnyWord]:
     """Splits a given phrase into a list of words.
 
     Args:
@@ -15,4 +41,76 @@ def tokenize(phrase: str) -> List[Word]:
     Returns:
         A list of words that make up the given phrase.
     """
-    return DEFAULT_TOKENIZER.tokenize(phrase)
+    return get_default_tokenizer().tokenize(phrase)
+
+
+def iter_tokenize(text: Union[str, TextIO]) -> Iterator[AnyWord]:
+    """Splits a given text into words, yielding each word as soon as it is complete.
+
+    See Tokenizer.iter_tokenize for details.
+
+    Args:
+        text: The text that should be tokenized, either as a string or a file opened in text mode.
+
+    Returns:
+        An iterator over the words that make up the given text.
+    """
+    return get_default_tokenizer().iter_tokenize(text)
+
+
+def tokenize_many(
+        phrases: Iterable[str],
+        workers: int = 1,
+        chunksize: int = 64
+) -> Iterator[Sequence[AnyWord]]:
+    """Splits each of the given phrases into a list of words.
+
+    See Tokenizer.tokenize_many for details.
+
+    Args:
+        phrases: The phrases that should be tokenized.
+        workers: The number of worker processes to use.
+        chunksize: The number of phrases that are sent to a worker at once.
+
+    Returns:
+        An iterator over the words of each phrase, in the same order as the phrases.
+    """
+    return get_default_tokenizer().tokenize_many(phrases, workers, chunksize)
+
+
+def tokenize_columns(phrases: Iterable[str], workers: int = 1, chunksize: int = 64) -> TokenColumns:
+    """Splits each of the given phrases into words and returns them column by column.
+
+    See Tokenizer.tokenize_columns for details.
+
+    Args:
+        phrases: The phrases that should be tokenized.
+        workers: The number of worker processes to use.
+        chunksize: The number of phrases that are sent to a worker at once.
+
+    Returns:
+        The words of all phrases, in the same order as the phrases.
+    """
+    return get_default_tokenizer().tokenize_columns(phrases, workers, chunksize)
+
+
+def count_vocabulary(
+        texts: Iterable[str],
+        workers: int = 1,
+        chunksize: int = 64,
+        exclude: AbstractSet[PartOfSpeech] = DEFAULT_EXCLUDED_PARTS_OF_SPEECH
+) -> Counter[VocabularyEntry]:
+    """Counts how often each distinct word occurs in the given texts.
+
+    See Tokenizer.count_vocabulary for details.
+
+    Args:
+        texts: The texts to count the words of, e.g. the lines of a file.
+        workers: The number of worker processes to use.
+        chunksize: The number of texts that are sent to a worker at once.
+        exclude: The parts of speech of words that should not be counted.
+
+    Returns:
+        The number of occurrences of each distinct word.
+    """
+    return get_default_tokenizer().count_vocabulary(texts, workers, chunksize, exclude)
@@ -0,0 +1,215 @@
+import asyncio
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from functools import partial
+from typing import Any, AsyncIterator, Callable, List, Optional, Sequence, Set, TextIO, Tuple, Union
+
+from .dango import READ_CHUNK_SIZE, Tokenizer, _init_worker, _tokenize_compact_chunk
+from .pool import TokenizerPool
+from .util import iter_segments
+from .word import AnyWord
+
+_Request = Tuple[str, 'asyncio.Future[List[AnyWord]]']
+
+
+class AsyncTokenizer:
+    """Tokenizer for use with asyncio that runs the tokenization in a pool of worker threads or processes.
+
+    Concurrent requests are collected into batches, so that many small phrases
+    only cost a single call to a worker. A batch is sent as soon as it is full
+    or the oldest phrase in it has waited for the maximum delay. If all workers
+    are busy, requests are queued up to the maximum queue size, after which
+    callers have to wait until there is room in the queue again.
+
+    Instances have to be closed after use, e.g. by using them with "async with".
+    """
+
+    def __init__(
+            self,
+            workers: int = 1,
+            executor: str = 'thread',
+            max_batch_size: int = 32,
+            max_delay: float = 0.002,
+            max_queue_size: int = 1024,
+            **tokenizer_options: Any
+    ):
+        """Constructs a new asynchronous tokenizer.
+
+        Args:
+            workers: The number of worker threads or processes.
+            executor: Either 'thread' to run the tokenization in threads or 'process' to run
+                it in processes. Processes can tokenize in parallel but always return CompactWord.
+            max_batch_size: The maximum number of phrases sent to a worker at once.
+            max_delay: The maximum number of seconds a phrase waits for a batch to fill up.
+            max_queue_size: The maximum number of phrases waiting for a worker.
+            tokenizer_options: The options the tokenizer of each worker is constructed with.
+        """
+        if workers < 1:
+            raise ValueError('workers must be at least 1, got {}'.format(workers))
+        if executor not in ('thread', 'process'):
+            raise ValueError('executor must be "thread" or "process", got {!r}'.format(executor))
+
+        self._workers = workers
+        self._executor_type = executor
+        self._max_batch_size = max_batch_size
+        self._max_delay = max_delay
+        self._max_queue_size = max_queue_size
+        self._tokenizer_options = tokenizer_options
+
+        self._executor: Optional[Executor] = None
+        self._tokenize_batch: Optional[Callable[[Sequence[str]], Sequence[Sequence[AnyWord]]]] = None
+        self._queue: 'Optional[asyncio.Queue[_Request]]' = None
+        self._batcher: 'Optional[asyncio.Task[None]]' = None
+        self._starting: 'Optional[asyncio.Task[None]]' = None
+        self._batches: 'Set[asyncio.Task[None]]' = set()
+        self._pool = TokenizerPool(**tokenizer_options)
+
+    async def __aenter__(self) -> 'AsyncTokenizer':
+        return self
+
+    async def __aexit__(self, *exc_info: Any) -> None:
+        await self.close()
+
+    def _tokenize_batch_in_thread(self, phrases: Sequence[str]) -> List[List[AnyWord]]:
+        tokenizer = self._pool.get()
+        return [tokenizer.tokenize(p) for p in phrases]
+
+    async def _start(self) -> None:
+        # Concurrent first requests all wait for the same start.
+        if self._starting is None:
+            self._starting = asyncio.get_running_loop().create_task(self._create_workers())
+        await self._starting
+
+    async def _create_workers(self) -> None:
+        loop = asyncio.get_running_loop()
+        if self._executor_type == 'thread':
+            self._executor = ThreadPoolExecutor(self._workers)
+            self._tokenize_batch = self._tokenize_batch_in_thread
+        else:
+            # Loading the dictionary takes a while, so it must not block the event loop.
+            tokenizer = await loop.run_in_executor(None, partial(Tokenizer, **self._tokenizer_options))
+            self._executor = ProcessPoolExecutor(self._workers, initializer=_init_worker, initargs=(tokenizer,))
+            self._tokenize_batch = _tokenize_compact_chunk
+
+        self._queue = asyncio.Queue(self._max_queue_size)
+        self._batcher = loop.create_task(self._run_batcher())
+
+    async def _run_batcher(self) -> None:
+        assert self._queue is not None
+        loop = asyncio.get_running_loop()
+        # limits the number of batches in flight, so further requests pile up in the queue
+        slots = asyncio.Semaphore(self._workers)
+
+        batch: List[_Request] = []
+        try:
+            while True:
+                batch = [await self._queue.get()]
+                deadline = loop.time() + self._max_delay
+
+                while len(batch) < self._max_batch_size:
+                    timeout = deadline - loop.time()
+                    if timeout <= 0:
+                        break
+                    try:
+                        batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+                    except asyncio.TimeoutError:
+                        break
+
+                await slots.acquire()
+                task = loop.create_task(self._process_batch(batch, slots))
+                self._batches.add(task)
+                task.add_done_callback(self._batches.discard)
+                batch = []
+        except asyncio.CancelledError:
+            # The requests already taken from the queue would otherwise never be answered.
+            for _, future in batch:
+                future.cancel()
+            raise
+
+    async def _process_batch(self, batch: List[_Request], slots: asyncio.Semaphore) -> None:
+        assert self._tokenize_batch is not None
+        try:
+            phrases = [phrase for phrase, _ in batch]
+            results = await asyncio.get_running_loop().run_in_executor(self._executor, self._tokenize_batch, phrases)
+        except Exception as e:
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+        else:
+            for (_, future), words in zip(batch, results):
+                if not future.done():
+                    future.set_result(list(words))
+        finally:
+            slots.release()
+
+    async def tokenize(self, phrase: str) -> List[AnyWord]:
+        """Splits a given phrase into a list of words.
+
+        Args:
+            phrase: The phrase that should be tokenized.
+
+        Returns:
+            A list of words that make up the given phrase.
+        """
+        if self._queue is None:
+            await self._start()
+        assert self._queue is not None
+
+        future: 'asyncio.Future[List[AnyWord]]' = asyncio.get_running_loop().create_future()
+        await self._queue.put((phrase, future))
+        return await future
+
+    async def iter_tokenize(self, text: Union[str, TextIO]) -> AsyncIterator[AnyWord]:
+        """Splits a given text into words, yielding them sentence by sentence.
+
+        See Tokenizer.iter_tokenize for details. Note that reading from a file blocks
+        the event loop, so files should be small or fast to read.
+
+        Args:
+            text: The text that should be tokenized, either as a string or a file opened in text mode.
+
+        Returns:
+            An asynchronous iterator over the words that make up the given text.
+        """
+        chunks = (text,) if isinstance(text, str) else iter(lambda: text.read(READ_CHUNK_SIZE), '')
+
+        offset = 0
+
+        for segment in iter_segments(chunks):
+            for word in await self.tokenize(segment):
+                yield word.shifted(offset) if offset else word
+            offset += len(segment)
+
+    async def close(self) -> None:
+        """Stops the workers.
+
+        Phrases that are already sent to a worker are tokenized, all other requests are cancelled.
+        """
+        if self._starting is not None:
+            # Workers that are still being started have to be stopped as well.
+            try:
+                await self._starting
+            except Exception:
+                pass
+            self._starting = None
+
+        if self._batcher is not None:
+            self._batcher.cancel()
+            try:
+                await self._batcher
+            except asyncio.CancelledError:
+                pass
+            self._batcher = None
+
+        if self._batches:
+            await asyncio.gather(*self._batches)
+
+        if self._queue is not None:
+            while not self._queue.empty():
+                _, future = self._queue.get_nowait()
+                future.cancel()
+            self._queue = None
+
+        if self._executor is not None:
+            # Waiting for the workers to finish must not block the event loop.
+            await asyncio.get_running_loop().run_in_executor(None, self._executor.shutdown)
+            self._executor = None
@@ -0,0 +1,250 @@
+import hashlib
+import json
+import sys
+from collections import OrderedDict
+from threading import Lock
+from typing import Any, List, Optional, Sequence, Tuple
+
+from .util import CacheInfo
+from .word import CompactWord, PartOfSpeech
+
+CachedWords = Tuple[CompactWord, ...]
+
+
+class PhraseCache:
+    """Interface for caches of tokenization results that a Tokenizer can be constructed with.
+
+    Results are stored per namespace, which identifies the configuration of the
+    tokenizer that created them. A tokenizer will never see results that were
+    created with a different dango version, dictionary or configuration.
+    """
+
+    def get(self, namespace: str, phrase: str) -> Optional[CachedWords]:
+        """Returns the cached words for a phrase, or None if the phrase is not cached.
+
+        Args:
+            namespace: The namespace of the tokenizer.
+            phrase: The phrase that was tokenized.
+        """
+        raise NotImplementedError()
+
+    def put(self, namespace: str, phrase: str, words: CachedWords) -> None:
+        """Stores the words for a phrase.
+
+        Args:
+            namespace: The namespace of the tokenizer.
+            phrase: The phrase that was tokenized.
+            words: The words of the phrase.
+        """
+        raise NotImplementedError()
+
+    def info(self) -> CacheInfo:
+        """Returns statistics of the cache."""
+        raise NotImplementedError()
+
+
+def estimate_size(phrase: str, words: CachedWords) -> int:
+    """Returns an estimate of the number of bytes used by a cache entry.
+
+    Args:
+        phrase: The phrase that was tokenized.
+        words: The words of the phrase.
+    """
+    size = sys.getsizeof(phrase) + sys.getsizeof(words)
+    for w in words:
+        size += sys.getsizeof(w) + sum(sys.getsizeof(v) for v in w._fields() if isinstance(v, str))
+    return size
+
+
+class MemoryPhraseCache(PhraseCache):
+    """An in-process phrase cache evicting the least recently used phrases.
+
+    The cache is bounded both by the number of phrases and the estimated number
+    of bytes used by them. It is safe to use from multiple threads.
+    """
+
+    def __init__(self, max_entries: Optional[int] = 10000, max_bytes: Optional[int] = 64 * 1024 * 1024):
+        """Constructs a new in-memory phrase cache.
+
+        Args:
+            max_entries: The maximum number of cached phrases, or None for no limit.
+            max_bytes: The maximum estimated number of bytes used by the cached phrases, or None for no limit.
+        """
+        self._max_entries = max_entries
+        self._max_bytes = max_bytes
+        self._entries: 'OrderedDict[Tuple[str, str], Tuple[CachedWords, int]]' = OrderedDict()
+        self._bytes = 0
+        self._hits = 0
+        self._misses = 0
+        self._lock = Lock()
+
+    def __reduce__(self):
+        # Each process gets its own empty cache.
+        return type(self), (self._max_entries, self._max_bytes)
+
+    def get(self, namespace: str, phrase: str) -> Optional[CachedWords]:
+        with self._lock:
+            entry = self._entries.get((namespace, phrase))
+            if entry is None:
+                self._misses += 1
+                return None
+
+            self._hits += 1
+            self._entries.move_to_end((namespace, phrase))
+            return entry[0]
+
+    def put(self, namespace: str, phrase: str, words: CachedWords) -> None:
+        size = estimate_size(phrase, words)
+        if self._max_bytes is not None and size > self._max_bytes:
+            return
+
+        with self._lock:
+            previous = self._entries.pop((namespace, phrase), None)
+            if previous is not None:
+                self._bytes -= previous[1]
+
+            self._entries[(namespace, phrase)] = (words, size)
+            self._bytes += size
+
+            while (self._max_entries is not None and len(self._entries) > self._max_entries) or \
+                    (self._max_bytes is not None and self._bytes > self._max_bytes):
+                _, (_, evicted_size) = self._entries.popitem(last=False)
+                self._bytes -= evicted_size
+
+    def info(self) -> CacheInfo:
+        with self._lock:
+            return CacheInfo(self._hits, self._misses, self._max_entries, len(self._entries))
+
+
+def encode_words(words: Sequence[CompactWord]) -> str:
+    """Returns a JSON representation of the given words.
+
+    Args:
+        words: The words to encode.
+    """
+    return json.dumps(
+        [[str(v) if isinstance(v, PartOfSpeech) else v for v in w._fields()] for w in words],
+        ensure_ascii=False, separators=(',', ':'))
+
+
+def decode_words(data: str) -> CachedWords:
+    """Returns the words from a JSON representation created by encode_words.
+
+    Args:
+        data: The JSON representation of the words.
+    """
+    pos_index = CompactWord.__slots__.index('part_of_speech')
+    words: List[CompactWord] = []
+
+    for fields in json.loads(data):
+        if fields[pos_index] is not None:
+            fields[pos_index] = PartOfSpeech[fields[pos_index]]
+        words.append(CompactWord(*fields))
+
+    return tuple(words)
+
+
+class DiskPhraseCache(PhraseCache):
+    """A phrase cache stored in a local SQLite database that persists across processes and restarts.
+
+    Phrases are stored by a hash of the namespace and the phrase. Optionally the
+    most recently used phrases are additionally kept in memory.
+    The database can be shared by multiple processes.
+
+    The database is bounded by the number of phrases. When it is full the phrases
+    that were stored first are evicted, since tracking the last use of each phrase
+    would turn every lookup into a write.
+    """
+
+    def __init__(self, path: str, memory_entries: int = 0, max_entries: Optional[int] = 1000000):
+        """Constructs a new disk phrase cache.
+
+        Args:
+            path: The path of the SQLite database file. It is created if it doesn't exist yet.
+            memory_entries: The number of phrases to additionally keep in memory.
+            max_entries: The maximum number of phrases in the database, or None for no limit.
+        """
+        self._path = path
+        self._memory_entries = memory_entries
+        self._max_entries = max_entries
+        self._memory = MemoryPhraseCache(memory_entries, None) if memory_entries > 0 else None
+        self._hits = 0
+        self._misses = 0
+        self._lock = Lock()
+
+        import sqlite3
+
+        self._connection = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._connection.execute('PRAGMA journal_mode=WAL')
+        self._connection.execute('PRAGMA synchronous=NORMAL')
+        self._connection.execute('CREATE TABLE IF NOT EXISTS phrases (key TEXT PRIMARY KEY, words TEXT NOT NULL)')
+
+    def __reduce__(self):
+        # The connection can't be pickled, so a cache that is sent to another
+        # process opens the same database again.
+        return type(self), (self._path, self._memory_entries, self._max_entries)
+
+    @staticmethod
+    def _key(namespace: str, phrase: str) -> str:
+        return hashlib.sha256('{}\0{}'.format(namespace, phrase).encode('utf-8')).hexdigest()
+
+    def get(self, namespace: str, phrase: str) -> Optional[CachedWords]:
+        if self._memory is not None:
+            words = self._memory.get(namespace, phrase)
+            if words is not None:
+                with self._lock:
+                    self._hits += 1
+                return words
+
+        with self._lock:
+            row = self._connection.execute(
+                'SELECT words FROM phrases WHERE key = ?', (self._key(namespace, phrase),)).fetchone()
+            if row is None:
+                self._misses += 1
+                return None
+            self._hits += 1
+
+        words = decode_words(row[0])
+        if self._memory is not None:
+            self._memory.put(namespace, phrase, words)
+        return words
+
+    def put(self, namespace: str, phrase: str, words: CachedWords) -> None:
+        if self._memory is not None:
+            self._memory.put(namespace, phrase, words)
+
+        with self._lock:
+            self._connection.execute(
+                'INSERT OR REPLACE INTO phrases (key, words) VALUES (?, ?)',
+                (self._key(namespace, phrase), encode_words(words)))
+            if self._max_entries is not None:
+                # Row IDs increase with every insert, so the oldest phrases have the smallest ones.
+                # Gaps left by replaced phrases only make this evict a few phrases too many.
+                self._connection.execute(
+                    'DELETE FROM phrases WHERE rowid <= (SELECT MAX(rowid) FROM phrases) - ?', (self._max_entries,))
+
+    def info(self) -> CacheInfo:
+        with self._lock:
+            size = self._connection.execute('SELECT COUNT(*) FROM phrases').fetchone()[0]
+            return CacheInfo(self._hits, self._misses, self._max_entries, size)
+
+    def clear(self) -> None:
+        """Removes all phrases from the cache."""
+        with self._lock:
+            self._connection.execute('DELETE FROM phrases')
+        if self._memory is not None:
+            self._memory = MemoryPhraseCache(self._memory_entries, None)
+
+    def close(self) -> None:
+        """Closes the underlying database connection."""
+        with self._lock:
+            self._connection.close()
+
+
+def make_namespace(*parts: Any) -> str:
+    """Returns a namespace identifying a tokenizer configuration.
+
+    Args:
+        parts: Anything that affects the result of tokenization, e.g. versions and options.
+    """
+    return hashlib.sha256(repr(parts).encode('utf-8')).hexdigest()[:16]
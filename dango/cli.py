@@ -1,24 +1,302 @@
 import sys
-from argparse import ArgumentParser, FileType
+from argparse import ArgumentParser, ArgumentTypeError, FileType
+from functools import partial
+from itertools import islice
+from typing import Any, Counter, FrozenSet, Iterable, List, Optional, Sequence, TextIO
 
 import dango
-from .word import PartOfSpeech
+from .corpus import write_corpus
+from .dango import DICTIONARY_TYPES, READ_CHUNK_SIZE, SPLIT_MODES, Tokenizer
+from .metrics import TokenizerMetrics
+from .util import iter_segments
+from .vocabulary import DEFAULT_EXCLUDED_PARTS_OF_SPEECH, VocabularyEntry
+from .word import AnyWord, PartOfSpeech
 
 
-def main():
-    parser = ArgumentParser(description='Tokenize Japanese text')
+def positive_int(value: str) -> int:
+    """Parses a command line argument as a positive integer.
+
+    Args:
+        value: The value of the argument.
+    """
+    number = int(value)
+    if number < 1:
+        raise ArgumentTypeError('must be at least 1, got {}'.format(value))
+    return number
+
+
+def parts_of_speech(value: str) -> FrozenSet[PartOfSpeech]:
+    """Parses a command line argument as comma separated part of speech names, e.g. NOUN,VERB.
+
+    An empty value is parsed as no parts of speech.
+
+    Args:
+        value: The value of the argument.
+    """
+    names = [name.strip() for name in value.split(',') if name.strip()]
+    unknown = [name for name in names if name not in PartOfSpeech.__members__]
+    if unknown:
+        raise ArgumentTypeError('unknown part of speech {}, choose from {}'.format(
+            ', '.join(unknown), ', '.join(PartOfSpeech.__members__)))
+    return frozenset(PartOfSpeech[name] for name in names)
+
+
+# The word attributes needed to write surfaces, so that nothing else is computed.
+SURFACE_FIELDS = frozenset({'surface', 'part_of_speech'})
+
+
+def format_surfaces(words: Iterable[AnyWord]) -> str:
+    """Returns the surfaces of the given words separated by spaces, skipping any whitespace.
+
+    Args:
+        words: The words to format.
+    """
+    return ' '.join(w.surface or '' for w in words if w.part_of_speech != PartOfSpeech.WHITESPACE)
+
+
+def write_surfaces(words: Iterable[AnyWord], out: TextIO) -> None:
+    """Writes the surfaces of the given words separated by spaces.
+
+    Whitespace is not written, except for line breaks which are preserved
+    so that each line of the input corresponds to one line of the output.
+
+    Args:
+        words: The words to write.
+        out: The stream to write to.
+    """
+    line: List[str] = []
+
+    for w in words:
+        surface = w.surface or ''
+        if w.part_of_speech == PartOfSpeech.WHITESPACE:
+            line_breaks = surface.count('\n')
+            if line_breaks:
+                out.write(' '.join(line) + '\n' * line_breaks)
+                line = []
+            continue
+
+        line.append(surface)
+
+    if line:
+        out.write(' '.join(line) + '\n')
+
+
+def write_surfaces_parallel(
+        file: TextIO,
+        out: TextIO,
+        jobs: int,
+        batch_size: int,
+        tokenizer: Optional[Tokenizer] = None
+) -> None:
+    """Tokenizes the lines of a file using multiple processes and writes their surfaces in input order.
+
+    Lines are read only a few batches per process ahead of the output, so the memory
+    used depends on the number of processes and the batch size but not on the file size.
+
+    Args:
+        file: The file to tokenize.
+        out: The stream to write to.
+        jobs: The number of processes to use.
+        batch_size: The number of lines that are sent to a process at once.
+        tokenizer: The tokenizer whose options the processes use. If None the default tokenizer is used.
+    """
+    tokenizer = tokenizer or dango.get_default_tokenizer()
+    results = tokenizer.tokenize_many((line.strip() for line in file), workers=jobs, chunksize=batch_size)
+
+    while True:
+        batch: List[Sequence[AnyWord]] = list(islice(results, batch_size))
+        if not batch:
+            break
+        # Writing a whole batch at once instead of line by line keeps the overhead of the output small.
+        out.write(''.join(format_surfaces(words) + '\n' for words in batch))
+
+
+def add_tokenizer_arguments(parser: ArgumentParser) -> None:
+    """Adds the arguments selecting the dictionary and split mode of the tokenizer to a parser.
+
+    Args:
+        parser: The parser to add the arguments to.
+    """
+    group = parser.add_argument_group('dictionary')
+    group.add_argument('--dict', dest='dictionary_type', choices=DICTIONARY_TYPES,
+                       help='the SudachiDict system dictionary to use; the package has to be installed')
+    group.add_argument('--config', dest='config_path', metavar='PATH',
+                       help='a SudachiPy configuration file to load the dictionary with')
+    group.add_argument('--user-dict', dest='user_dictionaries', metavar='PATH', action='append', default=[],
+                       help='a compiled SudachiPy user dictionary to load; can be given multiple times')
+    group.add_argument('--mode', dest='split_mode', choices=SPLIT_MODES, default='C',
+                       help='the SudachiPy split mode, from A for the shortest to C for the longest units')
+
+
+def create_tokenizer(args: Any, **options: Any) -> Tokenizer:
+    """Returns a tokenizer configured by the arguments added with add_tokenizer_arguments.
+
+    If the arguments are the defaults and all options are None the default tokenizer is returned.
+    If only the default dictionary is needed, it is shared with the default tokenizer.
+
+    Args:
+        args: The parsed arguments.
+        options: Further options for the tokenizer.
+    """
+    if args.dictionary_type is None and args.config_path is None and not args.user_dictionaries:
+        if args.split_mode == 'C' and all(v is None for v in options.values()):
+            return dango.get_default_tokenizer()
+        # The default dictionary is shared with the default tokenizer instead of loading it again.
+        return Tokenizer(dictionary=dango.get_default_tokenizer().dictionary, split_mode=args.split_mode, **options)
+
+    return Tokenizer(
+        dictionary_type=args.dictionary_type,
+        config_path=args.config_path,
+        user_dictionaries=args.user_dictionaries,
+        split_mode=args.split_mode,
+        **options)
+
+
+def write_vocabulary(counts: Counter[VocabularyEntry], out: TextIO, top: Optional[int] = None) -> None:
+    """Writes vocabulary counts as tab separated lines, most frequent first.
+
+    Each line holds the count, the dictionary form, its reading and the part of speech of a word.
+
+    Args:
+        counts: The counts to write.
+        out: The stream to write to.
+        top: The number of most frequent words to write, or None to write all.
+    """
+    for (dictionary_form, reading, pos), count in counts.most_common(top):
+        out.write('{}\t{}\t{}\t{}\n'.format(count, dictionary_form, reading, pos.name))
+
+
+def vocab_main(argv: Sequence[str]) -> None:
+    parser = ArgumentParser(prog='dango vocab', description='Count the distinct words of Japanese text')
+    parser.add_argument('file', nargs='?', type=FileType('r'), default=sys.stdin,
+                        help='a file containing text to be counted; if not specified standard input is read')
+    parser.add_argument('-j', '--jobs', type=positive_int, default=1,
+                        help='the number of processes used for tokenizing')
+    parser.add_argument('--batch-size', type=positive_int, default=256,
+                        help='the number of lines that are sent to a process at once when using multiple jobs')
+    parser.add_argument('-n', '--top', type=positive_int,
+                        help='only write the given number of most frequent words')
+    parser.add_argument('--exclude', type=parts_of_speech,
+                        default=','.join(sorted(pos.name for pos in DEFAULT_EXCLUDED_PARTS_OF_SPEECH)),
+                        metavar='POS[,POS...]',
+                        help='the comma separated parts of speech that are not counted, or an empty string '
+                             'to count all words; by default %(default)s')
+    add_tokenizer_arguments(parser)
+
+    args = parser.parse_args(argv)
+    tokenizer = create_tokenizer(args)
+
+    try:
+        counts = tokenizer.count_vocabulary(args.file, args.jobs, args.batch_size, args.exclude)
+        write_vocabulary(counts, sys.stdout, args.top)
+    except (BrokenPipeError, KeyboardInterrupt):
+        sys.exit()
+
+
+def index_main(argv: Sequence[str]) -> None:
+    parser = ArgumentParser(prog='dango index',
+                            description='Tokenize Japanese text and save the words to a corpus file')
     parser.add_argument('file', nargs='?', type=FileType('r'), default=sys.stdin,
                         help='a file containing text to be tokenized; if not specified standard input is read')
+    parser.add_argument('-o', '--output', required=True, metavar='PATH',
+                        help='the path of the corpus file to write, usually ending in .dgc')
+    parser.add_argument('-j', '--jobs', type=positive_int, default=1,
+                        help='the number of processes used for tokenizing')
+    parser.add_argument('--batch-size', type=positive_int, default=256,
+                        help='the number of sentences that are sent to a process at once when using multiple jobs')
+    add_tokenizer_arguments(parser)
+
+    args = parser.parse_args(argv)
+    tokenizer = create_tokenizer(args)
+    # Each segment becomes a sentence of the corpus, so that sentences can be accessed by index.
+    sentences = iter_segments(iter(partial(args.file.read, READ_CHUNK_SIZE), ''))
+
+    try:
+        write_corpus(args.output, tokenizer.tokenize_many(sentences, args.jobs, args.batch_size))
+    except KeyboardInterrupt:
+        sys.exit(1)
+
+
+def serve_main(argv: Sequence[str]) -> None:
+    from .server import DEFAULT_BATCH_SIZE, DEFAULT_MAX_DELAY, TokenizationService, create_server
+
+    parser = ArgumentParser(prog='dango serve', description='Serve tokenization over HTTP on the local machine',
+                            epilog='POST /tokenize with {"text": "..."} or {"texts": [...]}; '
+                                   'GET /health and /metrics')
+    parser.add_argument('--host', default='127.0.0.1', help='the host to listen on; by default %(default)s')
+    parser.add_argument('--port', type=int, default=8080, help='the port to listen on; by default %(default)s')
+    parser.add_argument('--socket', dest='unix_socket', metavar='PATH',
+                        help='listen on a Unix socket at the given path instead of a port')
+    parser.add_argument('-j', '--jobs', type=positive_int, default=1,
+                        help='the number of processes used for tokenizing; 1 tokenizes in the server process')
+    parser.add_argument('--batch-size', type=positive_int, default=DEFAULT_BATCH_SIZE,
+                        help='the maximum number of texts tokenized at once')
+    parser.add_argument('--max-delay', type=float, default=DEFAULT_MAX_DELAY * 1000, metavar='MS',
+                        help='the maximum milliseconds a text waits for a batch to fill up; by default %(default)s')
+    add_tokenizer_arguments(parser)
+
+    args = parser.parse_args(argv)
+    tokenizer = create_tokenizer(args, compact=True, metrics=TokenizerMetrics())
+    service = TokenizationService(tokenizer, args.jobs, args.batch_size, args.max_delay / 1000)
+    try:
+        server = create_server(service, args.host, args.port, args.unix_socket)
+    except FileExistsError as e:
+        service.close()
+        parser.error(str(e))
+
+    address = args.unix_socket or 'http://{}:{}'.format(*server.server_address[:2])
+    sys.stderr.write('serving on {}\n'.format(address))
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        service.close()
+
+
+# Subcommands by their name, anything else is tokenized by main itself.
+COMMANDS = {
+    'index': index_main,
+    'serve': serve_main,
+    'vocab': vocab_main,
+}
+
+
+def main(argv: Optional[Sequence[str]] = None):
+    argv = sys.argv[1:] if argv is None else argv
+    if argv and argv[0] in COMMANDS:
+        return COMMANDS[argv[0]](argv[1:])
+
+    parser = ArgumentParser(description='Tokenize Japanese text',
+                            epilog='subcommands: {}; see "dango <subcommand> --help"'.format(', '.join(COMMANDS)))
+    parser.add_argument('file', nargs='?', type=FileType('r'), default=sys.stdin,
+                        help='a file containing text to be tokenized; if not specified standard input is read')
+    parser.add_argument('-j', '--jobs', type=positive_int, default=1,
+                        help='the number of processes used for tokenizing; the output order is always kept')
+    parser.add_argument('--batch-size', type=positive_int, default=256,
+                        help='the number of lines that are sent to a process at once when using multiple jobs')
+    parser.add_argument('--profile', action='store_true',
+                        help='print the time spent in each stage of tokenization to standard error when done')
+    add_tokenizer_arguments(parser)
+
+    args = parser.parse_args(argv)
+    if args.profile and args.jobs > 1:
+        parser.error('--profile can only be used with a single job')
 
-    args = parser.parse_args()
+    metrics = TokenizerMetrics() if args.profile else None
+    tokenizer = create_tokenizer(args, metrics=metrics, fields=SURFACE_FIELDS)
 
     try:
-        for line in args.file:
-            words = dango.tokenize(line.strip())
-            surfaces = (w.surface for w in words if w.part_of_speech != PartOfSpeech.WHITESPACE)
-            print(' '.join(surfaces), file=sys.stdout)
+        if args.jobs == 1:
+            write_surfaces(tokenizer.iter_tokenize(args.file), sys.stdout)
+        else:
+            write_surfaces_parallel(args.file, sys.stdout, args.jobs, args.batch_size, tokenizer)
     except (BrokenPipeError, KeyboardInterrupt):
         sys.exit()
+    finally:
+        if metrics is not None:
+            sys.stderr.write(metrics.report())
 
 
 if __name__ == '__main__':
@@ -0,0 +1,180 @@
+from array import array
+from typing import Any, Dict, Iterable, List, Sequence
+
+from .word import AnyWord, CompactWord, PartOfSpeech
+
+# The part of speech tags in the order of their integer codes.
+PARTS_OF_SPEECH = tuple(PartOfSpeech)
+
+PART_OF_SPEECH_CODES = {pos: code for code, pos in enumerate(PARTS_OF_SPEECH)}
+
+# The names of the columns holding indexes into the string table.
+STRING_COLUMNS = ('surface', 'surface_reading', 'dictionary_form', 'dictionary_form_reading')
+
+
+class TokenColumns:
+    """The words of tokenized phrases stored column by column.
+
+    Instead of one object per word there is one array per attribute, holding the
+    attribute of all words in order. Strings are interned in a table and the
+    columns only hold their index, so e.g. counting dictionary forms boils down
+    to counting integers. The arrays support the buffer protocol and can be
+    converted to NumPy arrays or an Arrow table without copying.
+
+    Attributes:
+        sentence: The index of the phrase each word belongs to.
+        begin: The offset of the first character of each word in its phrase.
+        end: The offset after the last character of each word in its phrase.
+        surface: The index of the surface of each word in the string table.
+        surface_reading: The index of the surface reading of each word in the string table.
+        dictionary_form: The index of the dictionary form of each word in the string table.
+        dictionary_form_reading: The index of the dictionary form reading of each word in the string table.
+        part_of_speech: The code of the part of speech tag of each word, see PARTS_OF_SPEECH.
+        strings: The string table.
+    """
+
+    def __init__(self):
+        """Constructs empty columns."""
+        self.sentence = array('I')
+        self.begin = array('I')
+        self.end = array('I')
+        self.surface = array('I')
+        self.surface_reading = array('I')
+        self.dictionary_form = array('I')
+        self.dictionary_form_reading = array('I')
+        self.part_of_speech = array('B')
+        self.strings: List[str] = []
+        self._string_ids: Dict[str, int] = {}
+        self._sentences = 0
+
+    def __len__(self) -> int:
+        return len(self.surface)
+
+    @property
+    def sentences(self) -> int:
+        """The number of phrases that were added."""
+        return self._sentences
+
+    def intern(self, string: str) -> int:
+        """Returns the index of a string in the string table, adding it if necessary.
+
+        Args:
+            string: The string to look up.
+        """
+        string_id = self._string_ids.get(string)
+        if string_id is None:
+            string_id = self._string_ids[string] = len(self.strings)
+            self.strings.append(string)
+        return string_id
+
+    def append(self, words: Iterable[AnyWord]) -> None:
+        """Adds the words of the next phrase.
+
+        Args:
+            words: The words of the phrase, in order.
+
+        Raises:
+            ValueError: If the part of speech of a word wasn't computed.
+        """
+        sentence = self._sentences
+        offset = 0
+
+        for w in words:
+            if w.part_of_speech is None:
+                raise ValueError('the part of speech of {!r} is missing, it is needed to store words as columns'.format(
+                    w.surface))
+            # Attributes that weren't computed, see the fields of Tokenizer, are stored as empty strings.
+            surface = w.surface or ''
+            self.sentence.append(sentence)
+            # Words filtered by part of speech leave gaps, so their own offsets are used where they were
+            # computed. Otherwise the words cover their phrase without gaps and the offsets follow from the surfaces.
+            begin = w.begin if w.begin is not None else offset
+            offset = w.end if w.end is not None else begin + len(surface)
+            self.begin.append(begin)
+            self.end.append(offset)
+            self.surface.append(self.intern(surface))
+            self.surface_reading.append(self.intern(w.surface_reading or ''))
+            self.dictionary_form.append(self.intern(w.dictionary_form or ''))
+            self.dictionary_form_reading.append(self.intern(w.dictionary_form_reading or ''))
+            self.part_of_speech.append(PART_OF_SPEECH_CODES[w.part_of_speech])
+
+        self._sentences += 1
+
+    def word(self, index: int) -> CompactWord:
+        """Returns the word at the given position.
+
+        Args:
+            index: The position of the word across all phrases.
+        """
+        strings = self.strings
+        return CompactWord(
+            strings[self.surface[index]],
+            strings[self.surface_reading[index]],
+            strings[self.dictionary_form[index]],
+            strings[self.dictionary_form_reading[index]],
+            PARTS_OF_SPEECH[self.part_of_speech[index]],
+            self.begin[index],
+            self.end[index])
+
+    def columns(self) -> Dict[str, array]:
+        """Returns all columns by name."""
+        return {
+            'sentence': self.sentence,
+            'begin': self.begin,
+            'end': self.end,
+            'surface': self.surface,
+            'surface_reading': self.surface_reading,
+            'dictionary_form': self.dictionary_form,
+            'dictionary_form_reading': self.dictionary_form_reading,
+            'part_of_speech': self.part_of_speech,
+        }
+
+    def to_numpy(self) -> Dict[str, Any]:
+        """Returns all columns as NumPy arrays sharing the memory of the columns.
+
+        No further phrases can be appended while the returned arrays are in use.
+        Requires NumPy to be installed.
+        """
+        import numpy as np
+
+        return {name: np.frombuffer(column, dtype=column.typecode) for name, column in self.columns().items()}
+
+    def to_arrow(self) -> Any:
+        """Returns the columns as an Arrow table.
+
+        String columns are dictionary encoded with the string table as dictionary and part
+        of speech tags are dictionary encoded with their names. No further phrases can be
+        appended while the table is in use. Requires pyarrow to be installed.
+        """
+        import pyarrow as pa
+
+        strings = pa.array(self.strings, type=pa.string())
+        part_of_speech_names = pa.array([str(pos) for pos in PARTS_OF_SPEECH], type=pa.string())
+
+        def indices(column: array, type_: Any) -> Any:
+            return pa.Array.from_buffers(type_, len(column), [None, pa.py_buffer(column)])
+
+        index_type = pa.uint32()
+        table: Dict[str, Any] = {
+            'sentence': indices(self.sentence, index_type),
+            'begin': indices(self.begin, index_type),
+            'end': indices(self.end, index_type),
+        }
+        for name in STRING_COLUMNS:
+            table[name] = pa.DictionaryArray.from_arrays(indices(getattr(self, name), index_type), strings)
+        table['part_of_speech'] = pa.DictionaryArray.from_arrays(
+            indices(self.part_of_speech, pa.uint8()), part_of_speech_names)
+
+        return pa.table(table)
+
+
+def build_columns(results: Iterable[Sequence[AnyWord]]) -> TokenColumns:
+    """Returns the columns holding the words of all given phrases.
+
+    Args:
+        results: The words of each phrase, e.g. as returned by Tokenizer.tokenize_many.
+    """
+    columns = TokenColumns()
+    for words in results:
+        columns.append(words)
+    return columns
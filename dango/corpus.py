@@ -0,0 +1,373 @@
+import mmap
+import os
+import shutil
+import struct
+import sys
+import tempfile
+from array import array
+from typing import IO, Any, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple, Union
+
+from .columns import PARTS_OF_SPEECH, STRING_COLUMNS, TokenColumns
+from .word import AnyWord, CompactWord
+
+# The first bytes of every corpus file.
+MAGIC = b'DANGOCRP'
+
+# The version of the file format, files of other versions can't be read.
+FORMAT_VERSION = 1
+
+# The conventional file extension of corpus files.
+CORPUS_FILE_EXTENSION = '.dgc'
+
+# magic, format version, number of words, sentences and strings, size of the string data in bytes
+_HEADER = struct.Struct('<8sI4xQQQQ')
+
+# The columns holding one value per word, in the order they are stored.
+WORD_COLUMNS = ('begin', 'end') + STRING_COLUMNS + ('part_of_speech',)
+
+# The sections of a file after the header with their element type, in the order they are stored.
+_SECTIONS = (
+    ('sentence_offsets', 'Q'),
+    ('string_offsets', 'Q'),
+    ('string_data', 'B'),
+    ('begin', 'I'),
+    ('end', 'I'),
+    ('surface', 'I'),
+    ('surface_reading', 'I'),
+    ('dictionary_form', 'I'),
+    ('dictionary_form_reading', 'I'),
+    ('part_of_speech', 'B'),
+)
+
+# Sections start at multiples of this, so their values can be read in place.
+_ALIGNMENT = 8
+
+# The number of words kept in memory by a CorpusWriter before they are written to disk.
+DEFAULT_BUFFER_WORDS = 1 << 20
+
+_Layout = Dict[str, Tuple[int, str, int]]
+
+
+def _layout(words: int, sentences: int, strings: int, string_bytes: int) -> _Layout:
+    # Returns the offset, element type and length of each section.
+    lengths = {'sentence_offsets': sentences + 1, 'string_offsets': strings + 1, 'string_data': string_bytes}
+    layout: _Layout = {}
+    offset = _HEADER.size
+    for name, typecode in _SECTIONS:
+        offset = -(-offset // _ALIGNMENT) * _ALIGNMENT
+        length = lengths.get(name, words)
+        layout[name] = (offset, typecode, length)
+        offset += length * struct.calcsize(typecode)
+    return layout
+
+
+def _write_array(f: IO[bytes], values: array) -> None:
+    # Corpus files are little endian regardless of the machine they were written on.
+    if sys.byteorder != 'little' and values.itemsize > 1:
+        values = array(values.typecode, values)
+        values.byteswap()
+    values.tofile(f)
+
+
+def _read_array(buffer: memoryview, typecode: str) -> Union[memoryview, array]:
+    # Values are read in place, except on big endian machines where they have to be converted.
+    if sys.byteorder == 'little' or typecode == 'B':
+        return buffer.cast(typecode)  # type: ignore
+    values = array(typecode, buffer.tobytes())
+    values.byteswap()
+    return values
+
+
+class CorpusWriter:
+    """Writes the words of tokenized sentences to a corpus file, see Corpus.
+
+    Only the string table and the offsets of the sentences are kept in memory, the
+    words are buffered and then written to temporary files next to the corpus file,
+    so corpora much larger than the memory can be written. The corpus file is only
+    created when the writer is closed, a partially written file never exists.
+    """
+
+    def __init__(self, path: Union[str, 'os.PathLike[str]'], buffer_words: int = DEFAULT_BUFFER_WORDS):
+        """Constructs a new writer.
+
+        Args:
+            path: The path of the corpus file, which is replaced if it exists.
+            buffer_words: The number of words kept in memory before they are written to disk.
+        """
+        self._path = os.fspath(path)
+        self._directory = os.path.dirname(os.path.abspath(self._path))
+        self._buffer_words = buffer_words
+        self._columns = TokenColumns()
+        self._sentence_offsets = array('Q', [0])
+        self._words = 0
+        self._spill: Optional[Dict[str, IO[bytes]]] = {
+            name: tempfile.TemporaryFile(dir=self._directory) for name in WORD_COLUMNS}
+
+    def __enter__(self) -> 'CorpusWriter':
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        if exc_type is None:
+            self.close()
+        else:
+            self._discard()
+
+    @property
+    def sentences(self) -> int:
+        """The number of sentences that were added."""
+        return len(self._sentence_offsets) - 1
+
+    @property
+    def words(self) -> int:
+        """The number of words that were added."""
+        return self._words + len(self._columns)
+
+    def append(self, words: Iterable[AnyWord]) -> None:
+        """Adds the words of the next sentence.
+
+        Args:
+            words: The words of the sentence, in order.
+        """
+        if self._spill is None:
+            raise ValueError('the writer is closed')
+
+        self._columns.append(words)
+        self._sentence_offsets.append(self.words)
+
+        if len(self._columns) >= self._buffer_words:
+            self._flush()
+
+    def _flush(self) -> None:
+        assert self._spill is not None
+        columns = self._columns
+        self._words += len(columns)
+        for name in WORD_COLUMNS:
+            column = getattr(columns, name)
+            _write_array(self._spill[name], column)
+            del column[:]
+        del columns.sentence[:]
+
+    def close(self) -> None:
+        """Writes the corpus file. Closing a closed writer has no effect."""
+        if self._spill is None:
+            return
+        self._flush()
+
+        strings = [s.encode('utf-8') for s in self._columns.strings]
+        string_offsets = array('Q', [0])
+        for string in strings:
+            string_offsets.append(string_offsets[-1] + len(string))
+
+        layout = _layout(self._words, self.sentences, len(strings), string_offsets[-1])
+        header = _HEADER.pack(MAGIC, FORMAT_VERSION, self._words, self.sentences, len(strings), string_offsets[-1])
+
+        # The file is written under a temporary name first, so readers never see it half written.
+        fd, temporary_path = tempfile.mkstemp(suffix=CORPUS_FILE_EXTENSION, dir=self._directory)
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(header)
+                for name, (offset, _, _) in layout.items():
+                    f.write(b'\0' * (offset - f.tell()))
+                    if name == 'sentence_offsets':
+                        _write_array(f, self._sentence_offsets)
+                    elif name == 'string_offsets':
+                        _write_array(f, string_offsets)
+                    elif name == 'string_data':
+                        f.writelines(strings)
+                    else:
+                        spill = self._spill[name]
+                        spill.seek(0)
+                        shutil.copyfileobj(spill, f)
+            os.replace(temporary_path, self._path)
+        except BaseException:
+            os.unlink(temporary_path)
+            raise
+        finally:
+            self._discard()
+
+    def _discard(self) -> None:
+        if self._spill is not None:
+            for f in self._spill.values():
+                f.close()
+            self._spill = None
+
+
+def write_corpus(
+        path: Union[str, 'os.PathLike[str]'],
+        results: Iterable[Sequence[AnyWord]],
+        buffer_words: int = DEFAULT_BUFFER_WORDS
+) -> None:
+    """Writes the words of all given sentences to a corpus file.
+
+    Args:
+        path: The path of the corpus file, which is replaced if it exists.
+        results: The words of each sentence, e.g. as returned by Tokenizer.tokenize_many.
+        buffer_words: The number of words kept in memory before they are written to disk.
+    """
+    with CorpusWriter(path, buffer_words) as writer:
+        for words in results:
+            writer.append(words)
+
+
+class Corpus:
+    """The words of tokenized sentences read from a corpus file.
+
+    A corpus file stores the words like TokenColumns: one column per attribute with
+    strings interned in a table, plus the offset of the first word of each sentence.
+    The file is memory mapped and the columns are read in place without copying, so
+    opening even a large corpus is instant and only the parts that are accessed are
+    read from disk. Sentences can be accessed by index like a list of lists of words.
+
+    Strings are decoded on first access and kept afterwards. The columns must not be
+    in use anymore when the corpus is closed.
+    """
+
+    def __init__(self, path: Union[str, 'os.PathLike[str]']):
+        """Opens a corpus file.
+
+        Args:
+            path: The path of the corpus file, as written by CorpusWriter.
+
+        Raises:
+            ValueError: If the file is not a corpus file or has an unsupported format version.
+        """
+        with open(path, 'rb') as f:
+            header = f.read(_HEADER.size)
+            if len(header) < _HEADER.size or header[:len(MAGIC)] != MAGIC:
+                raise ValueError('{} is not a dango corpus file'.format(os.fspath(path)))
+            _, version, words, sentences, strings, string_bytes = _HEADER.unpack(header)
+            if version != FORMAT_VERSION:
+                raise ValueError('{} has format version {}, expected {}'.format(
+                    os.fspath(path), version, FORMAT_VERSION))
+
+            layout = _layout(words, sentences, strings, string_bytes)
+            offset, typecode, length = layout[_SECTIONS[-1][0]]
+            if os.fstat(f.fileno()).st_size < offset + length * struct.calcsize(typecode):
+                raise ValueError('{} is truncated'.format(os.fspath(path)))
+
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        self._layout = layout
+        self._map_sections()
+        self._strings: List[Optional[str]] = [None] * strings
+        self._words = words
+
+    def _map_sections(self) -> None:
+        buffer = memoryview(self._mmap)
+        self._sections: Dict[str, Any] = {
+            name: _read_array(buffer[offset:offset + length * struct.calcsize(typecode)], typecode)
+            for name, (offset, typecode, length) in self._layout.items()
+        }
+        buffer.release()
+        self._sentence_offsets = self._sections['sentence_offsets']
+        self._string_offsets = self._sections['string_offsets']
+        self._string_data = self._sections['string_data']
+
+    def __enter__(self) -> 'Corpus':
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        self.close()
+
+    def __len__(self) -> int:
+        return len(self._sentence_offsets) - 1
+
+    def __getitem__(self, index: int) -> List[CompactWord]:
+        """Returns the words of the sentence at the given index.
+
+        Args:
+            index: The index of the sentence, negative indexes count from the end.
+        """
+        sentences = len(self)
+        if index < 0:
+            index += sentences
+        if not 0 <= index < sentences:
+            raise IndexError('sentence index out of range')
+        return [self.word(i) for i in range(self._sentence_offsets[index], self._sentence_offsets[index + 1])]
+
+    def __iter__(self) -> Iterator[List[CompactWord]]:
+        for index in range(len(self)):
+            yield self[index]
+
+    @property
+    def sentences(self) -> int:
+        """The number of sentences in the corpus."""
+        return len(self)
+
+    @property
+    def words(self) -> int:
+        """The number of words in the corpus."""
+        return self._words
+
+    @property
+    def sentence_offsets(self) -> Sequence[int]:
+        """The index of the first word of each sentence, followed by the number of words."""
+        return self._sentence_offsets
+
+    def string(self, index: int) -> str:
+        """Returns a string of the string table.
+
+        Args:
+            index: The index of the string, e.g. a value of one of the string columns.
+        """
+        string = self._strings[index]
+        if string is None:
+            data = self._string_data[self._string_offsets[index]:self._string_offsets[index + 1]]
+            string = self._strings[index] = str(data, 'utf-8')
+        return string
+
+    @property
+    def strings(self) -> List[str]:
+        """The string table, decoding all strings that weren't accessed yet."""
+        return [self.string(i) for i in range(len(self._strings))]
+
+    def word(self, index: int) -> CompactWord:
+        """Returns the word at the given position.
+
+        Args:
+            index: The position of the word across all sentences.
+        """
+        sections = self._sections
+        string = self.string
+        return CompactWord(
+            string(sections['surface'][index]),
+            string(sections['surface_reading'][index]),
+            string(sections['dictionary_form'][index]),
+            string(sections['dictionary_form_reading'][index]),
+            PARTS_OF_SPEECH[sections['part_of_speech'][index]],
+            sections['begin'][index],
+            sections['end'][index])
+
+    def columns(self) -> Dict[str, Any]:
+        """Returns the columns holding one value per word by name, see TokenColumns."""
+        return {name: self._sections[name] for name in WORD_COLUMNS}
+
+    def to_numpy(self) -> Dict[str, Any]:
+        """Returns the columns as NumPy arrays sharing the memory map of the file.
+
+        The arrays are read-only. Requires NumPy to be installed.
+        """
+        import numpy as np
+
+        typecodes = dict(_SECTIONS)
+        return {name: np.frombuffer(column, dtype=typecodes[name]) for name, column in self.columns().items()}
+
+    def close(self) -> None:
+        """Closes the file. Closing a closed corpus has no effect.
+
+        Raises:
+            BufferError: If arrays returned by to_numpy are still in use. The corpus stays
+                open and usable then, and can be closed once the arrays are deleted.
+        """
+        if self._mmap.closed:
+            return
+        try:
+            for section in self._sections.values():
+                if isinstance(section, memoryview):
+                    section.release()
+            self._mmap.close()
+        except BufferError:
+            # Whether a section is in use is only known when releasing it fails, at which point
+            # other sections may already be released. So all of them are mapped again.
+            self._map_sections()
+            raise BufferError('the corpus can\'t be closed while arrays of its columns are in use') from None
@@ -1,124 +1,392 @@
-from typing import List
+import json
+import os
+import tempfile
+from collections import Counter, deque
+from functools import lru_cache, partial
+from itertools import islice
+from threading import Lock
+from time import perf_counter
+from typing import TYPE_CHECKING, AbstractSet, Any, Callable, Deque, Dict, Iterable, Iterator, List, Optional, \
+    Sequence, TextIO, Tuple, TypeVar, Union
+from weakref import WeakKeyDictionary
 
-from sudachipy import dictionary
-from sudachipy.morpheme import Morpheme
+from .cache import PhraseCache, make_namespace
+from .columns import TokenColumns, build_columns
+from .fsm import StateMachine
+from .metrics import TokenizerMetrics
+from .rules import WORD_AGGREGATION_FSM, WordState, load_rules, rules_fingerprint  # noqa: F401
+from .util import CacheInfo, iter_segments, katakana_to_hiragana
+from .version import __version__
+from .vocabulary import DEFAULT_EXCLUDED_PARTS_OF_SPEECH, VocabularyEntry, count_words
+from .word import WORD_FIELDS, AnyWord, CompactWord, PartOfSpeech, Word, map_part_of_speech
 
-from .fsm import StateMachine, State
-from .util import katakana_to_hiragana
-from .word import Word
+if TYPE_CHECKING:
+    from sudachipy.dictionary import Dictionary
+    from sudachipy.morpheme import Morpheme
 
 
-class WordState(State):
-    """FSM state used to aggregate morphemes into "word chunks"."""
+# Guards loading dictionaries from multiple threads at the same time, see Tokenizer.
+_dictionary_lock = Lock()
 
-    def __init__(self, name: str, start_new_word=False):
-        """Constructs a new word aggregation state.
+# The arguments of load_dictionary each loaded dictionary was created with, i.e. the dictionary type,
+# configuration and user dictionaries. Tokenizers sent to other processes load the dictionary again from them.
+_dictionary_sources: 'WeakKeyDictionary[Dictionary, Tuple[Optional[str], Optional[str], Tuple[str, ...]]]' = \
+    WeakKeyDictionary()
+
+# Guards the reads of each dictionary, see Tokenizer.find_dictionary_form_reading.
+_dictionary_read_locks: 'WeakKeyDictionary[Dictionary, Lock]' = WeakKeyDictionary()
+
+# The number of characters that are read at once when tokenizing a file.
+READ_CHUNK_SIZE = 64 * 1024
+
+# The SudachiDict system dictionaries that can be selected by name, from fewest to most words.
+DICTIONARY_TYPES = ('small', 'core', 'full')
+
+# The SudachiPy split modes, from shortest to longest units.
+SPLIT_MODES = ('A', 'B', 'C')
+
+# The number of chunks per worker process that are submitted ahead of the results being consumed.
+CHUNKS_AHEAD_PER_WORKER = 2
+
+T = TypeVar('T')
+R = TypeVar('R')
+
+
+def iter_chunks(items: Iterable[T], size: int) -> Iterator[List[T]]:
+    """Returns the items split into lists of the given size, the last one possibly shorter.
+
+    Args:
+        items: The items to split.
+        size: The number of items per list.
+    """
+    items = iter(items)
+    return iter(lambda: list(islice(items, size)), [])
+
+
+def imap_bounded(pool: Any, function: Callable[[T], R], tasks: Iterable[T], window: int) -> Iterator[R]:
+    """Like Pool.imap, but reads the tasks only as far ahead as the results are consumed.
+
+    Pool.imap submits all tasks as fast as it can read them, so a large input ends
+    up in memory. Here at most window tasks are submitted but not yet consumed.
+
+    Args:
+        pool: The multiprocessing pool to run the function in.
+        function: The function to apply to each task.
+        tasks: The arguments of the function.
+        window: The maximum number of tasks that are submitted ahead.
+
+    Returns:
+        An iterator over the results, in the order of the tasks.
+    """
+    pending: Deque[Any] = deque()
+    for task in tasks:
+        if len(pending) >= window:
+            yield pending.popleft().get()
+        pending.append(pool.apply_async(function, (task,)))
+    while pending:
+        yield pending.popleft().get()
+
+
+def load_dictionary(
+        dictionary_type: Optional[str] = None,
+        config_path: Optional[str] = None,
+        user_dictionaries: Sequence[str] = ()
+) -> 'Dictionary':
+    """Returns a newly loaded SudachiPy dictionary.
+
+    Args:
+        dictionary_type: The SudachiDict system dictionary to use, see DICTIONARY_TYPES.
+            The corresponding SudachiDict package has to be installed. If None the system
+            dictionary of the configuration is used, or SudachiDict-core if there is none.
+        config_path: The path of a SudachiPy configuration file. If None the default
+            configuration of SudachiPy is used.
+        user_dictionaries: The paths of compiled user dictionaries to load in addition to
+            the ones of the configuration.
+    """
+    if dictionary_type is not None and dictionary_type not in DICTIONARY_TYPES:
+        raise ValueError('dictionary_type must be one of {}, got {!r}'.format(
+            ', '.join(DICTIONARY_TYPES), dictionary_type))
+
+    # SudachiPy is only imported once it is needed since importing it alone takes a noticeable amount of time.
+    from sudachipy import config
+    from sudachipy.dictionary import Dictionary
+
+    if not user_dictionaries:
+        # SudachiPy keeps the settings of the dictionary that is being loaded in a global.
+        with _dictionary_lock:
+            dictionary = Dictionary(config_path, dict_type=dictionary_type)
+        _dictionary_sources[dictionary] = (dictionary_type, config_path, ())
+        return dictionary
+
+    # SudachiPy only reads user dictionaries from the configuration file, so they are added
+    # to a copy of it. Relative paths in the copy still refer to the original directory.
+    user_dictionaries = tuple(os.path.abspath(p) for p in user_dictionaries)
+    settings_path = config_path or config.DEFAULT_SETTINGFILE
+    with open(settings_path, encoding='utf-8') as f:
+        settings = json.load(f)
+    settings['userDict'] = list(settings.get('userDict', ())) + list(user_dictionaries)
+
+    fd, merged_config_path = tempfile.mkstemp(suffix='.json')
+    try:
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            json.dump(settings, f)
+        with _dictionary_lock:
+            dictionary = Dictionary(merged_config_path, os.path.dirname(os.path.abspath(settings_path)),
+                                    dictionary_type)
+    finally:
+        os.remove(merged_config_path)
+
+    _dictionary_sources[dictionary] = (dictionary_type, config_path, user_dictionaries)
+    return dictionary
+
+
+class _PartOfSpeechFilter:
+    """Decides which chunks of morphemes are turned into words by their part of speech."""
+
+    def __init__(
+            self,
+            part_of_speech_table: Sequence[PartOfSpeech],
+            include: Optional[AbstractSet[PartOfSpeech]],
+            exclude: Optional[AbstractSet[PartOfSpeech]]
+    ):
+        self.include = include
+        self.exclude = exclude
+        # Whether a chunk is included for every part of speech ID, see Tokenizer.part_of_speech_table.
+        self.included = [self.accepts(pos) for pos in part_of_speech_table]
+
+    def accepts(self, pos: PartOfSpeech) -> bool:
+        return (self.include is None or pos in self.include) and (self.exclude is None or pos not in self.exclude)
+
+
+class Tokenizer:
+    """Tokenizer used to split phrases into words."""
+
+    def __init__(
+            self,
+            compact: bool = False,
+            reading_cache_size: Optional[int] = 4096,
+            phrase_cache: Optional[PhraseCache] = None,
+            dictionary: Optional['Dictionary'] = None,
+            rules: Union[StateMachine, str, 'os.PathLike[str]', None] = None,
+            dictionary_type: Optional[str] = None,
+            config_path: Optional[str] = None,
+            user_dictionaries: Sequence[str] = (),
+            split_mode: str = 'C',
+            metrics: Optional[TokenizerMetrics] = None,
+            fields: Optional[Iterable[str]] = None,
+            include_pos: Optional[Iterable[PartOfSpeech]] = None,
+            exclude_pos: Optional[Iterable[PartOfSpeech]] = None
+    ):
+        """Constructs a new tokenizer.
 
         Args:
-            name: The name of the state.
-            start_new_word: Flag if a new chunk should be started on_input or if the morpheme
-                should just be appended to the last chunk.
+            compact: Flag if words should be created as CompactWord instead of Word.
+                Compact words don't keep the morphemes they were created from, which
+                makes them cheaper to keep in memory in large amounts.
+            reading_cache_size: The maximum number of dictionary form readings that are
+                cached by word ID. If None the cache is unbounded, if 0 it is disabled.
+            phrase_cache: A cache for the results of tokenize, e.g. a MemoryPhraseCache or
+                a DiskPhraseCache. Since cached results are shared they are immutable, so
+                tokenize always returns CompactWord if a phrase cache is used.
+            dictionary: An already loaded SudachiPy dictionary to use instead of loading
+                a new one, e.g. the dictionary of another tokenizer or one returned by
+                load_dictionary. Note that SudachiPy dictionaries must not be used by multiple
+                threads at the same time. Tokenizers using a dictionary that wasn't loaded by
+                load_dictionary can't be pickled, e.g. for tokenize_many with multiple workers.
+            rules: The rules used to aggregate morphemes into words, either as a StateMachine
+                or the path of a rule file, see dango.rules.load_rules. Defaults to
+                WORD_AGGREGATION_FSM, which aggregates inflected verbs and adjectives.
+            dictionary_type: The SudachiDict system dictionary to load, i.e. 'small', 'core' or
+                'full'. Smaller dictionaries load faster and use less memory but know fewer words.
+            config_path: The path of a SudachiPy configuration file to load the dictionary with.
+            user_dictionaries: The paths of compiled SudachiPy user dictionaries to load.
+            split_mode: The SudachiPy split mode, i.e. 'A' for the shortest units, 'B' for
+                middle units or 'C' for the longest units, e.g. whole compound nouns.
+            metrics: Metrics to record the durations of the stages of tokenization, the number
+                of morphemes and words and cache hits in. Nothing is measured if None.
+            fields: The names of the word attributes the caller needs, see WORD_FIELDS. Only those
+                are computed when creating words. Other attributes of a Word are computed on first
+                access instead, those of a CompactWord are None. If None all attributes are computed.
+                For example {'surface', 'part_of_speech'} skips looking up dictionary form readings.
+                The part of speech is always included, as it is determined for every word anyway.
+            include_pos: If given only words with one of these parts of speech are returned.
+            exclude_pos: If given words with one of these parts of speech are not returned, e.g.
+                whitespace and symbols. Words are filtered before they are created, so filtered
+                words cost neither the creation of a word nor the lookup of its reading.
         """
-        self.name = name
-        self.start_new_word = start_new_word
+        if dictionary is not None and (dictionary_type is not None or config_path is not None or user_dictionaries):
+            raise ValueError('dictionary can not be combined with dictionary_type, config_path or user_dictionaries')
+        if fields is not None:
+            fields = frozenset(fields)
+            if not fields <= frozenset(WORD_FIELDS):
+                raise ValueError('unknown fields {}, expected any of {}'.format(
+                    ', '.join(sorted(fields - frozenset(WORD_FIELDS))), ', '.join(WORD_FIELDS)))
+            # Aggregating and filtering words needs the part of speech, so it costs nothing to keep.
+            # Without it words couldn't be stored as columns, in a corpus or in an index.
+            fields |= {'part_of_speech'}
+        include_pos = frozenset(include_pos) if include_pos is not None else None
+        exclude_pos = frozenset(exclude_pos) if exclude_pos is not None else None
+        if split_mode not in SPLIT_MODES:
+            raise ValueError('split_mode must be one of {}, got {!r}'.format(', '.join(SPLIT_MODES), split_mode))
 
-    def on_input(self, context: List[List[Morpheme]], morpheme: Morpheme) -> None:
-        """Processes the current morpheme.
+        self._compact = compact
+        self._phrase_cache = phrase_cache
+        self._metrics = metrics
+        self._fields = fields
+        self._resolve_reading = fields is None or 'dictionary_form_reading' in fields
+        self._rules = WORD_AGGREGATION_FSM if rules is None else \
+            rules if isinstance(rules, StateMachine) else load_rules(rules)
+        self._find_reading_by_word_id = lru_cache(reading_cache_size)(self._find_reading_by_word_id_uncached)
 
-        Args:
-            context: The list of morpheme chunks so far.
-            morpheme: The morpheme to process.
+        if dictionary is None:
+            dictionary = load_dictionary(dictionary_type, config_path, user_dictionaries)
+
+        # The dictionary can't be pickled, so it is not part of the options used to reconstruct the
+        # tokenizer in another process. The dictionary is loaded again there with the same arguments
+        # instead, which is cheap as the file is memory mapped and its pages are shared with all other
+        # processes using it. The arguments are unknown for dictionaries not loaded by load_dictionary.
+        source = _dictionary_sources.get(dictionary)
+        self._options: Optional[Dict[str, Any]] = None if source is None else dict(
+            compact=compact, reading_cache_size=reading_cache_size, phrase_cache=phrase_cache, rules=rules,
+            dictionary_type=source[0], config_path=source[1], user_dictionaries=source[2],
+            split_mode=split_mode, metrics=metrics, fields=fields, include_pos=include_pos, exclude_pos=exclude_pos)
+
+        from sudachipy.tokenizer import Tokenizer as SudachiTokenizer
+
+        self._dictionary = dictionary
+        with _dictionary_lock:
+            self._read_lock = _dictionary_read_locks.setdefault(dictionary, Lock())
+        self._split_mode = split_mode
+        self._tokenizer = self._dictionary.create(getattr(SudachiTokenizer.SplitMode, split_mode))
+
+        # Identifies cached results that were created with the same version, dictionaries and
+        # options, i.e. anything that affects the words, as those of this tokenizer.
+        headers = [(d.header.create_time, d.header.description) for d in self._dictionary.dictionaries]
+        self._cache_namespace = make_namespace(
+            __version__, headers, split_mode, rules_fingerprint(self._rules), fields and sorted(fields),
+            include_pos and sorted(pos.name for pos in include_pos),
+            exclude_pos and sorted(pos.name for pos in exclude_pos))
+
+        # Looking up transitions and part of speech tags by part of speech ID is much faster
+        # than by features, but the IDs are specific to the dictionary so this has to be
+        # done per tokenizer. The rules keep their compiled form, so tokenizers sharing
+        # the same rules and dictionary only compile them once.
+        grammar = self._dictionary.grammar
+        pos_features = [grammar.get_part_of_speech_string(i) for i in range(grammar.get_part_of_speech_size())]
+        self._aggregation_fsm = self._rules.compile(pos_features)
+        self._part_of_speech_table = tuple(map_part_of_speech(f) for f in pos_features)
+        self._pos_filter = _PartOfSpeechFilter(self._part_of_speech_table, include_pos, exclude_pos) \
+            if include_pos is not None or exclude_pos is not None else None
+
+    @property
+    def dictionary(self) -> 'Dictionary':
+        """The SudachiPy dictionary used by the tokenizer.
+
+        It can be passed to other tokenizers, so they don't have to load it again.
         """
-        if self.start_new_word:
-            context.append([])
-        context[-1].append(morpheme)
-
-
-UNSPECIFIED_WORD_STATE = WordState('UNSPECIFIED', start_new_word=True)
-VERB_STATE = WordState('VERB', start_new_word=True)
-VERB_INFLECTION_STATE = WordState('VERB_INFLECTION')
-ADJECTIVE_STATE = WordState('ADJECTIVE', start_new_word=True)
-ADJECTIVE_INFLECTION_STATE = WordState('ADJECTIVE_INFLECTION')
-
-WORD_AGGREGATION_FSM = StateMachine(
-    [
-        UNSPECIFIED_WORD_STATE,
-        VERB_STATE,
-        VERB_INFLECTION_STATE,
-        ADJECTIVE_STATE,
-        ADJECTIVE_INFLECTION_STATE
-    ],
-    UNSPECIFIED_WORD_STATE,
-    UNSPECIFIED_WORD_STATE,
-    [
-        # --- transitions to aggregate inflected verbs ---
-
-        # start of a verb
-        (None, ('動詞', '一般', '*', '*'), VERB_STATE),
-        # Some verbs (for example 見る) are detected as non independent even when standing alone, so we also need
-        # to account for these cases for starting a new verb. Since specific transitions have higher priority than
-        # wildcard transition we don't risk breaking apart an inflected verb by accident.
-        (None, ('動詞', '非自立可能', '*', '*'), VERB_STATE),
-        # The inflected part of a verb is started by either an auxiliary verb, ...
-        (VERB_STATE, ('助動詞', '*', '*', '*'), VERB_INFLECTION_STATE),
-        # or a conjunctive particle, i.e. て or で.
-        (VERB_STATE, ('助詞', '接続助詞', '*', '*'), VERB_INFLECTION_STATE),
-        # continue aggregating any auxiliary verbs ...
-        (VERB_INFLECTION_STATE, ('助動詞', '*', '*', '*'), VERB_INFLECTION_STATE),
-        # and non independent verbs, e.g. the いる　of the continuous form
-        (VERB_INFLECTION_STATE, ('動詞', '非自立可能', '*', '*'), VERB_INFLECTION_STATE),
-
-        # suffix for seeming/looks-like
-        (VERB_STATE, ('形状詞', '助動詞語幹', '*', '*'), VERB_INFLECTION_STATE),
-
-        # --- transitions to aggregate inflected adjectives ---
-
-        # start of an adjective
-        (None, ('形容詞', '一般', '*', '*'), ADJECTIVE_STATE),
-        # can be followed by negating suffix
-        (ADJECTIVE_STATE, ('形容詞', '非自立可能', '*', '*'), ADJECTIVE_INFLECTION_STATE),
-        # and/or suffix for the past-tense
-        (ADJECTIVE_STATE, ('助動詞', '*', '*', '*'), VERB_INFLECTION_STATE),
-        (ADJECTIVE_INFLECTION_STATE, ('助動詞', '*', '*', '*'), VERB_INFLECTION_STATE),
-
-        # suffix for seeming/looks-like
-        (ADJECTIVE_STATE, ('形状詞', '助動詞語幹', '*', '*'), ADJECTIVE_INFLECTION_STATE)
-    ])
+        return self._dictionary
 
+    @property
+    def metrics(self) -> Optional[TokenizerMetrics]:
+        """The metrics the tokenizer records in, if any."""
+        return self._metrics
 
-class Tokenizer:
-    """Tokenizer used to split phrases into words."""
+    @property
+    def fields(self) -> Optional[AbstractSet[str]]:
+        """The names of the word attributes that are computed when creating words, or None for all."""
+        return self._fields
+
+    @property
+    def split_mode(self) -> str:
+        """The SudachiPy split mode used by the tokenizer, i.e. 'A', 'B' or 'C'."""
+        return self._split_mode
+
+    @property
+    def rules(self) -> StateMachine:
+        """The rules used to aggregate morphemes into words."""
+        return self._rules
 
-    def __init__(self):
-        self._dictionary = dictionary.Dictionary()
-        self._tokenizer = self._dictionary.create()
+    @property
+    def part_of_speech_table(self) -> Sequence[PartOfSpeech]:
+        """The part of speech tag for every part of speech ID of the dictionary.
 
-    def find_dictionary_form_reading(self, morpheme: Morpheme) -> str:
+        This can be used to determine the part of speech tag of a morpheme by its
+        part_of_speech_id() without having to look at its features.
+        """
+        return self._part_of_speech_table
+
+    def get_part_of_speech(self, morpheme: 'Morpheme') -> PartOfSpeech:
+        """Returns the part of speech tag for a given morpheme.
+
+        Args:
+            morpheme: The morpheme for which to find the part of speech tag.
+        """
+        pos_id = morpheme.part_of_speech_id()
+        if pos_id < len(self._part_of_speech_table):
+            return self._part_of_speech_table[pos_id]
+        return map_part_of_speech(morpheme.part_of_speech())
+
+    def __reduce__(self):
+        # The SudachiPy objects can't be pickled, so a tokenizer that is sent
+        # to another process is reconstructed from its configuration instead.
+        if self._options is None:
+            raise TypeError('a tokenizer using a dictionary that was not loaded by load_dictionary can\'t be pickled')
+        return partial(type(self), **self._options), ()
+
+    def find_dictionary_form_reading(self, morpheme: 'Morpheme') -> str:
         """Returns the dictionary form for a given morpheme.
 
         Args:
             morpheme: The morpheme for which to find the dictionary form.
         """
-        word_id = morpheme.get_word_info().dictionary_form_word_id
+        word_info = morpheme.get_word_info()
+        word_id = word_info.dictionary_form_word_id
 
         if word_id == -1:
             # If the word ID is -1, then the morpheme is already in
             # dictionary form and we can use its own reading form.
-            return katakana_to_hiragana(morpheme.reading_form())
+            return katakana_to_hiragana(word_info.reading_form)
         else:
             # Otherwise we need to look up the word info for the
             # dictionary form and get the reading form of that.
-            return katakana_to_hiragana(self._dictionary.lexicon.get_word_info(word_id).reading_form)
+            return self._find_reading_by_word_id(word_id)
+
+    def _find_reading_by_word_id_uncached(self, word_id: int) -> str:
+        # Decoding the word info from the lexicon is comparatively expensive, but since
+        # the frequency of words follows Zipf's law a small cache of this function
+        # avoids most of it.
+        # Readings that aren't part of the fields are looked up when they are first accessed, which
+        # may happen in another thread than the one tokenizing. The lexicon seeks in the dictionary
+        # file before reading, so reads of the same dictionary must not overlap.
+        with self._read_lock:
+            word_info = self._dictionary.lexicon.get_word_info(word_id)
+        return katakana_to_hiragana(word_info.reading_form)
+
+    def reading_cache_info(self) -> CacheInfo:
+        """Returns statistics for the cache of dictionary form readings.
+
+        Returns:
+            The number of hits and misses as well as the maximum and current size of the cache.
+        """
+        return CacheInfo(*self._find_reading_by_word_id.cache_info())
 
-    def create_word(self, morphemes: List[Morpheme]) -> Word:
+    def create_word(self, morphemes: List['Morpheme'], phrase: Optional[str] = None, offset: int = 0) -> AnyWord:
         """Returns a new word created as an aggregation of morphemes.
 
         Args:
             morphemes: The morphemes that the new word will be composed of.
+            phrase: The phrase the morphemes were created from.
+            offset: The offset of the phrase within the whole text.
         """
-        return Word(morphemes, self.find_dictionary_form_reading(morphemes[0]))
+        if self._resolve_reading:
+            word = Word(morphemes, self.find_dictionary_form_reading(morphemes[0]),
+                        self.get_part_of_speech(morphemes[0]), phrase, offset)
+        else:
+            word = Word(morphemes, None, self.get_part_of_speech(morphemes[0]), phrase, offset,
+                        self.find_dictionary_form_reading)
+        return CompactWord.from_word(word, self._fields) if self._compact else word
 
-    def tokenize(self, phrase: str) -> List[Word]:
+    def tokenize(self, phrase: str) -> List[AnyWord]:
         """Splits a given phrase into a list of words.
 
         Args:
@@ -127,7 +395,25 @@ class Tokenizer:
         Returns:
             A list of words that make up the given phrase.
         """
-        morphemes = self._tokenizer.tokenize(phrase)
+        if self._phrase_cache is None:
+            return self._tokenize(phrase)
+
+        words = self._phrase_cache.get(self._cache_namespace, phrase)
+        if self._metrics is not None:
+            self._metrics.record_phrase_cache(words is not None)
+        if words is None:
+            words = tuple(CompactWord.from_word(w, self._fields) for w in self._tokenize(phrase))
+            self._phrase_cache.put(self._cache_namespace, phrase, words)
+
+        # The words themselves are immutable, but the list isn't so every caller gets their own.
+        return list(words)
+
+    def _tokenize(self, phrase: str) -> List[AnyWord]:
+        if self._metrics is not None:
+            return self._tokenize_measured(phrase, 0, self._pos_filter)
+
+        with self._read_lock:
+            morphemes = self._tokenizer.tokenize(phrase)
 
         # Aggregating the individual morphemes we get from the tokenizer into words,
         # for example inflected verbs, is heavily dependent on what was already processed
@@ -136,4 +422,248 @@ class Tokenizer:
         # By doing so we don't have to resort to writing deeply nested if-statements
         # but can instead declare the dependencies through the transition rules.
 
-        return [self.create_word(mm) for mm in WORD_AGGREGATION_FSM.run([], morphemes)]
+        return self._create_words(self._aggregation_fsm.run([], morphemes), phrase, 0, self._pos_filter)
+
+    def _create_words(
+            self,
+            chunks: List[List['Morpheme']],
+            phrase: str,
+            offset: int,
+            pos_filter: Optional['_PartOfSpeechFilter']
+    ) -> List[AnyWord]:
+        if pos_filter is None:
+            return [self.create_word(mm, phrase, offset) for mm in chunks]
+        return [self.create_word(mm, phrase, offset) for mm in chunks if self._is_included(mm, pos_filter)]
+
+    def _is_included(self, morphemes: List['Morpheme'], pos_filter: '_PartOfSpeechFilter') -> bool:
+        # Like the aggregation, the filter is looked up by the part of speech ID
+        # of the chunk, before anything is computed for a word.
+        pos_id = morphemes[0].part_of_speech_id()
+        if pos_id < len(pos_filter.included):
+            return pos_filter.included[pos_id]
+        return pos_filter.accepts(self.get_part_of_speech(morphemes[0]))
+
+    def _tokenize_measured(
+            self,
+            phrase: str,
+            offset: int = 0,
+            pos_filter: Optional['_PartOfSpeechFilter'] = None
+    ) -> List[AnyWord]:
+        # Same as _tokenize, but records the duration of each stage. This is kept separate
+        # so that tokenizers without metrics don't pay for taking the time.
+        assert self._metrics is not None
+        cache_info = self._find_reading_by_word_id.cache_info()
+
+        start = perf_counter()
+        with self._read_lock:
+            morphemes = self._tokenizer.tokenize(phrase)
+        analyzed = perf_counter()
+        chunks = self._aggregation_fsm.run([], morphemes)
+        aggregated = perf_counter()
+        words = self._create_words(chunks, phrase, offset, pos_filter)
+        created = perf_counter()
+
+        new_cache_info = self._find_reading_by_word_id.cache_info()
+        self._metrics.record_phrase(
+            len(phrase), len(morphemes), len(words), (analyzed - start, aggregated - analyzed, created - aggregated),
+            new_cache_info.hits - cache_info.hits, new_cache_info.misses - cache_info.misses)
+
+        return words
+
+    def iter_tokenize(self, text: Union[str, TextIO]) -> Iterator[AnyWord]:
+        """Splits a given text into words, yielding each word as soon as it is complete.
+
+        The text is tokenized in segments split at sentence or line boundaries, so
+        the memory used stays bounded regardless of the size of the text. The begin
+        and end offsets of the words are relative to the start of the whole text.
+
+        Args:
+            text: The text that should be tokenized, either as a string or a file opened in text mode.
+
+        Returns:
+            An iterator over the words that make up the given text.
+        """
+        return self._iter_tokenize(text, self._pos_filter)
+
+    def _iter_tokenize(
+            self,
+            text: Union[str, TextIO],
+            pos_filter: Optional['_PartOfSpeechFilter']
+    ) -> Iterator[AnyWord]:
+        chunks = (text,) if isinstance(text, str) else iter(partial(text.read, READ_CHUNK_SIZE), '')
+
+        offset = 0
+
+        for segment in iter_segments(chunks):
+            if self._metrics is not None:
+                # Stages can only be measured separately if a whole segment is tokenized at once.
+                yield from self._tokenize_measured(segment, offset, pos_filter)
+                offset += len(segment)
+                continue
+
+            with self._read_lock:
+                morphemes = self._tokenizer.tokenize(segment)
+            context: List[List['Morpheme']] = []
+
+            for _ in self._aggregation_fsm.iter_run(context, morphemes):
+                # A new chunk was started so the previous one can't grow any further.
+                if len(context) > 1:
+                    mm = context.pop(0)
+                    if pos_filter is None or self._is_included(mm, pos_filter):
+                        yield self.create_word(mm, segment, offset)
+
+            yield from self._create_words(context, segment, offset, pos_filter)
+
+            offset += len(segment)
+
+    def tokenize_many(
+            self,
+            phrases: Iterable[str],
+            workers: int = 1,
+            chunksize: int = 64
+    ) -> Iterator[Sequence[AnyWord]]:
+        """Splits each of the given phrases into a list of words.
+
+        If more than one worker is requested the phrases are distributed across
+        a pool of worker processes. Each worker loads the dictionary only once.
+        Since words backed by SudachiPy morphemes can't be sent between processes
+        the words are always returned as CompactWord in that case. Phrases are only
+        read a few chunks per worker ahead of the results that were consumed, so the
+        memory used doesn't grow with the number of phrases.
+
+        Args:
+            phrases: The phrases that should be tokenized.
+            workers: The number of worker processes to use.
+            chunksize: The number of phrases that are sent to a worker at once.
+
+        Returns:
+            An iterator over the words of each phrase, in the same order as the phrases.
+        """
+        if workers < 1:
+            raise ValueError('workers must be at least 1, got {}'.format(workers))
+
+        if workers == 1:
+            return map(self.tokenize, phrases)
+
+        return self._tokenize_parallel(phrases, workers, chunksize)
+
+    def tokenize_columns(self, phrases: Iterable[str], workers: int = 1, chunksize: int = 64) -> TokenColumns:
+        """Splits each of the given phrases into words and returns them column by column.
+
+        This is meant for analyzing large amounts of text, as storing the words in
+        columns requires far fewer objects than lists of words. See TokenColumns.
+
+        Args:
+            phrases: The phrases that should be tokenized.
+            workers: The number of worker processes to use, see tokenize_many.
+            chunksize: The number of phrases that are sent to a worker at once.
+
+        Returns:
+            The words of all phrases, in the same order as the phrases.
+        """
+        return build_columns(self.tokenize_many(phrases, workers, chunksize))
+
+    def count_vocabulary(
+            self,
+            texts: Iterable[str],
+            workers: int = 1,
+            chunksize: int = 64,
+            exclude: AbstractSet[PartOfSpeech] = DEFAULT_EXCLUDED_PARTS_OF_SPEECH
+    ) -> 'Counter[VocabularyEntry]':
+        """Counts how often each distinct word occurs in the given texts.
+
+        Words are counted by their dictionary form, its reading and their part of
+        speech, so all inflections of a word count towards the same entry. The texts
+        are streamed through the tokenizer without keeping their words, so the memory
+        used only depends on the size of the vocabulary. Use most_common(k) of the
+        result to get the k most frequent words.
+
+        If more than one worker is requested the texts are distributed across a
+        pool of worker processes. Each batch of texts is counted by a worker and
+        the counts of all batches are merged as they arrive.
+
+        Args:
+            texts: The texts to count the words of, e.g. the lines of a file.
+            workers: The number of worker processes to use.
+            chunksize: The number of texts that are sent to a worker at once.
+            exclude: The parts of speech of words that should not be counted. By default
+                whitespace, symbols and particles.
+
+        Returns:
+            The number of occurrences of each distinct word.
+        """
+        if workers < 1:
+            raise ValueError('workers must be at least 1, got {}'.format(workers))
+
+        counts: 'Counter[VocabularyEntry]' = Counter()
+
+        if workers == 1:
+            pos_filter = self._vocabulary_filter(exclude)
+            for text in texts:
+                count_words(self._iter_tokenize(text, pos_filter), counts, exclude)
+            return counts
+
+        from multiprocessing import Pool
+
+        with Pool(workers, initializer=_init_worker, initargs=(self,)) as pool:
+            for batch_counts in imap_bounded(pool, partial(_count_vocabulary, exclude=exclude),
+                                             iter_chunks(texts, chunksize), workers * CHUNKS_AHEAD_PER_WORKER):
+                counts.update(batch_counts)
+
+        return counts
+
+    def _vocabulary_filter(self, exclude: AbstractSet[PartOfSpeech]) -> Optional['_PartOfSpeechFilter']:
+        # Excluded words are filtered before they are created, in addition to the filter of the tokenizer.
+        if self._pos_filter is None and not exclude:
+            return None
+        include = self._pos_filter.include if self._pos_filter is not None else None
+        excluded = frozenset(exclude)
+        if self._pos_filter is not None and self._pos_filter.exclude is not None:
+            excluded |= self._pos_filter.exclude
+        return _PartOfSpeechFilter(self._part_of_speech_table, include, excluded)
+
+    def _tokenize_parallel(
+            self,
+            phrases: Iterable[str],
+            workers: int,
+            chunksize: int
+    ) -> Iterator[List[CompactWord]]:
+        from multiprocessing import Pool
+
+        with Pool(workers, initializer=_init_worker, initargs=(self,)) as pool:
+            chunks = iter_chunks(phrases, chunksize)
+            for results in imap_bounded(pool, _tokenize_compact_chunk, chunks, workers * CHUNKS_AHEAD_PER_WORKER):
+                yield from results
+
+
+# The tokenizer of the current worker process, see Tokenizer.tokenize_many.
+_worker_tokenizer: Optional[Tokenizer] = None
+
+
+def _init_worker(tokenizer: Tokenizer) -> None:
+    global _worker_tokenizer
+    _worker_tokenizer = tokenizer
+
+
+def _get_worker_tokenizer() -> Tokenizer:
+    # Other modules can't import the variable itself, as they would only get its value at the time of the import.
+    assert _worker_tokenizer is not None
+    return _worker_tokenizer
+
+
+def _tokenize_compact(phrase: str) -> List[CompactWord]:
+    assert _worker_tokenizer is not None
+    return [CompactWord.from_word(w, _worker_tokenizer.fields) for w in _worker_tokenizer.tokenize(phrase)]
+
+
+def _tokenize_compact_chunk(phrases: Sequence[str]) -> List[List[CompactWord]]:
+    return [_tokenize_compact(p) for p in phrases]
+
+
+def _count_vocabulary(texts: List[str], exclude: AbstractSet[PartOfSpeech]) -> 'Counter[VocabularyEntry]':
+    assert _worker_tokenizer is not None
+    counts: 'Counter[VocabularyEntry]' = Counter()
+    pos_filter = _worker_tokenizer._vocabulary_filter(exclude)
+    for text in texts:
+        count_words(_worker_tokenizer._iter_tokenize(text, pos_filter), counts, exclude)
+    return counts
@@ -0,0 +1,177 @@
+from bisect import bisect_right
+from typing import TYPE_CHECKING, Iterable, List, Optional, Sequence
+
+from .util import iter_segments
+from .word import AnyWord
+
+if TYPE_CHECKING:
+    from .dango import Tokenizer
+
+
+def _segment_starts(segments: Iterable[str], offset: int) -> List[int]:
+    # Returns the offset of each segment in the text, given the offset of the first one.
+    starts = []
+    for segment in segments:
+        starts.append(offset)
+        offset += len(segment)
+    return starts
+
+
+class Document:
+    """A tokenized text that is tokenized again only where it is edited.
+
+    The text is split into segments at sentence or line boundaries, like for
+    Tokenizer.iter_tokenize, and the words of each segment are kept. An edit only
+    tokenizes the segments it touches again and splices their words in place of the
+    previous ones, so the cost of an edit depends on the size of the edit and the
+    sentences around it rather than on the size of the document.
+
+    The offsets of the words of segment_words are relative to their segment, see
+    segment_offset, those of words and word_at are relative to the whole text.
+    """
+
+    def __init__(self, text: str = '', tokenizer: Optional['Tokenizer'] = None):
+        """Constructs a new document.
+
+        Args:
+            text: The initial text of the document.
+            tokenizer: The tokenizer to use. If None the default tokenizer of the current thread is used.
+        """
+        if tokenizer is None:
+            import dango
+
+            tokenizer = dango.get_default_tokenizer()
+
+        self._tokenizer = tokenizer
+        self._segments: List[str] = list(iter_segments((text,)))
+        self._words: List[List[AnyWord]] = [tokenizer.tokenize(s) for s in self._segments]
+        # The offsets of the segments from _shifted_from on are stored without the shift of the
+        # edits before them. So an edit only updates the offsets between its segment and the
+        # previous edit, which are close to each other when editing text.
+        self._starts = _segment_starts(self._segments, 0)
+        self._shifted_from = len(self._starts)
+        self._shift = 0
+        self._length = len(text)
+        self._text: Optional[str] = text
+
+    @property
+    def text(self) -> str:
+        """The current text of the document."""
+        if self._text is None:
+            self._text = ''.join(self._segments)
+        return self._text
+
+    @property
+    def segments(self) -> Sequence[str]:
+        """The segments the text is split into."""
+        return self._segments
+
+    @property
+    def words(self) -> List[AnyWord]:
+        """The words of all segments in order, with offsets relative to the whole text."""
+        return [w.shifted(start) if start else w
+                for start, words in zip(map(self._segment_start, range(len(self._words))), self._words)
+                for w in words]
+
+    def segment_words(self, index: int) -> List[AnyWord]:
+        """Returns the words of a segment.
+
+        Args:
+            index: The index of the segment.
+        """
+        return self._words[index]
+
+    def segment_offset(self, index: int) -> int:
+        """Returns the offset of the first character of a segment in the text.
+
+        Args:
+            index: The index of the segment.
+        """
+        return self._segment_start(index)
+
+    def _segment_start(self, index: int) -> int:
+        if index < 0:
+            index += len(self._starts)
+        start = self._starts[index]
+        return start + self._shift if index >= self._shifted_from else start
+
+    def _find_segment(self, offset: int) -> int:
+        # Returns the number of segments starting at or before the offset, i.e. bisect_right of the offsets.
+        starts = self._starts
+        if self._shifted_from < len(starts) and starts[self._shifted_from] + self._shift <= offset:
+            return bisect_right(starts, offset - self._shift, self._shifted_from)
+        return bisect_right(starts, offset, 0, self._shifted_from)
+
+    def _move_shift(self, index: int) -> None:
+        # Moves the start of the shifted offsets to the given segment, updating the offsets in between.
+        starts = self._starts
+        for i in range(self._shifted_from, index):
+            starts[i] += self._shift
+        for i in range(index, self._shifted_from):
+            starts[i] -= self._shift
+        self._shifted_from = index
+
+    def word_at(self, offset: int) -> Optional[AnyWord]:
+        """Returns the word at an offset of the text, or None if the offset is outside of the text.
+
+        The offsets of the returned word are relative to the whole text.
+
+        Args:
+            offset: The offset of a character of the word in the text.
+        """
+        if not 0 <= offset < self._length:
+            return None
+        index = self._find_segment(offset) - 1
+        start = self._segment_start(index)
+        offset -= start
+        for w in self._words[index]:
+            if w.begin is None or w.end is None:
+                raise ValueError('the tokenizer of the document must compute the begin and end of words')
+            if w.begin <= offset < w.end:
+                return w.shifted(start) if start else w
+        return None
+
+    def edit(self, offset: int, deleted: int, inserted: str) -> range:
+        """Replaces a part of the text and tokenizes the segments it touches again.
+
+        Args:
+            offset: The offset in the text where the edit starts.
+            deleted: The number of characters that are removed from the offset on.
+            inserted: The text that is inserted at the offset.
+
+        Returns:
+            The indexes of the segments that were tokenized again. Segments after them
+            keep their words but are shifted if the number of segments changed.
+
+        Raises:
+            ValueError: If the edit is outside of the text.
+        """
+        if offset < 0 or deleted < 0 or offset + deleted > self._length:
+            raise ValueError('edit of {} characters at {} is outside of the text of length {}'.format(
+                deleted, offset, self._length))
+
+        end = offset + deleted
+
+        # Whether a segment ends at a boundary depends on the characters on both sides of it.
+        # So the segments from the one with the character before the edit up to the one with
+        # the character after the edit are split again, all other boundaries stay the same.
+        first = self._find_segment(offset - 1) - 1 if offset > 0 else 0
+        stop = self._find_segment(end) if self._segments else 0
+        span_offset = self._segment_start(first) if self._segments else 0
+
+        span = ''.join(self._segments[first:stop])
+        span = span[:offset - span_offset] + inserted + span[end - span_offset:]
+        segments = list(iter_segments((span,)))
+
+        self._segments[first:stop] = segments
+        self._words[first:stop] = [self._tokenizer.tokenize(s) for s in segments]
+
+        # The segments after the edit are moved by the change in length, which is only added to the shift.
+        self._move_shift(first)
+        self._starts[first:stop] = _segment_starts(segments, span_offset)
+        self._shifted_from = first + len(segments)
+        self._shift += len(inserted) - deleted
+        self._length += len(inserted) - deleted
+        self._text = None
+
+        return range(first, first + len(segments))
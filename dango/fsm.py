@@ -1,12 +1,14 @@
-from typing import Iterable, List, Tuple, Optional, Any
+from threading import Lock
+from typing import TYPE_CHECKING, Any, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
 
-from sudachipy.morpheme import Morpheme
+if TYPE_CHECKING:
+    from sudachipy.morpheme import Morpheme
 
 
 class State:
     """Interface for any states a StateMachine can be constructed with."""
 
-    def on_input(self, context: Any, morpheme: Morpheme) -> None:
+    def on_input(self, context: Any, morpheme: 'Morpheme') -> None:
         """Processes the current input.
 
         Args:
@@ -21,7 +23,7 @@ MorphemeFeatures = Tuple[str, str, str, str]
 StateTransitionRule = Tuple[Optional[State], MorphemeFeatures, State]
 
 
-def get_morpheme_features(morpheme: Morpheme) -> MorphemeFeatures:
+def get_morpheme_features(morpheme: 'Morpheme') -> MorphemeFeatures:
     """Returns the relevant features from a morpheme.
 
     Args:
@@ -63,22 +65,59 @@ class StateMachine:
                 All source and destination states specified in the rules
                 have to be members of the set of possible states.
         """
-        self._states = frozenset(states)
-        self._transitions = {}
+        # The order of the states is kept, so compiling the state machine is deterministic.
+        self._states = tuple(dict.fromkeys(states))
+        state_set = frozenset(self._states)
+        self._transitions: Dict[Tuple[Optional[State], MorphemeFeatures], State] = {}
 
         # construct internal transition table for faster lookup.
         for src, features, dst in transitions:
-            assert src is None or src in self._states
-            assert dst in self._states
+            assert src is None or src in state_set
+            assert dst in state_set
             self._transitions[(src, features)] = dst
 
-        assert initial_state in self._states
+        assert initial_state in state_set
         self._initial_state = initial_state
 
-        assert default_state in self._states
+        assert default_state in state_set
         self._default_state = default_state
 
-    def get_next_state(self, source_state: State, morpheme: Morpheme):
+        self._compiled: Dict[Tuple[MorphemeFeatures, ...], CompiledStateMachine] = {}
+        self._compile_lock = Lock()
+
+    def __getstate__(self):
+        # Compiled state machines are specific to a dictionary and the lock can't be pickled.
+        state = self.__dict__.copy()
+        del state['_compiled']
+        del state['_compile_lock']
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._compiled = {}
+        self._compile_lock = Lock()
+
+    @property
+    def states(self) -> Sequence[State]:
+        """The set of states the state machine could possibly enter, in the order they were given."""
+        return self._states
+
+    @property
+    def initial_state(self) -> State:
+        """The state the state machine starts in."""
+        return self._initial_state
+
+    @property
+    def default_state(self) -> State:
+        """The state the state machine falls back on if there is no matching transition."""
+        return self._default_state
+
+    @property
+    def transitions(self) -> List[StateTransitionRule]:
+        """The transition rules of the state machine."""
+        return [(src, features, dst) for (src, features), dst in self._transitions.items()]
+
+    def get_next_state(self, source_state: State, morpheme: 'Morpheme'):
         """Returns the next state to advance to.
 
         The next state is determined based on the source state and current input depending
@@ -89,8 +128,9 @@ class StateMachine:
             source_state: The source state for the transition.
             morpheme: The input on which to transition.
         """
-        features = get_morpheme_features(morpheme)
+        return self._find_next_state(source_state, get_morpheme_features(morpheme))
 
+    def _find_next_state(self, source_state: State, features: MorphemeFeatures) -> State:
         # 1) transition from specific source state
         if (source_state, features) in self._transitions:
             return self._transitions[(source_state, features)]
@@ -101,7 +141,37 @@ class StateMachine:
         else:
             return self._default_state
 
-    def run(self, context: Any, morphemes: Iterable[Morpheme]) -> Any:
+    def compile(self, part_of_speech_table: Sequence[Sequence[str]]) -> 'CompiledStateMachine':
+        """Returns an equivalent state machine that looks up transitions by part of speech ID.
+
+        The result is kept, so compiling the same state machine for the same part of speech
+        table again, e.g. for every tokenizer of a pool, returns the same compiled state machine.
+
+        Args:
+            part_of_speech_table: The part of speech features of every part of speech ID
+                of the dictionary that the morphemes will originate from.
+        """
+        key = tuple((pos[0], pos[1], pos[2], pos[3]) for pos in part_of_speech_table)
+
+        with self._compile_lock:
+            compiled = self._compiled.get(key)
+            if compiled is None:
+                compiled = self._compiled[key] = self._compile(key)
+
+        return compiled
+
+    def _compile(self, part_of_speech_table: Sequence[MorphemeFeatures]) -> 'CompiledStateMachine':
+        states = list(self._states)
+        state_indices = {state: i for i, state in enumerate(states)}
+
+        table = [
+            [state_indices[self._find_next_state(state, features)] for features in part_of_speech_table]
+            for state in states
+        ]
+
+        return CompiledStateMachine(self, states, table, state_indices[self._initial_state])
+
+    def run(self, context: Any, morphemes: Iterable['Morpheme']) -> Any:
         """Runs the state machine on a stream of morphemes.
 
         Args:
@@ -119,3 +189,101 @@ class StateMachine:
             current_state = next_state
 
         return context
+
+    def iter_run(self, context: Any, morphemes: Iterable['Morpheme']) -> Iterator[Any]:
+        """Runs the state machine on a stream of morphemes step by step.
+
+        Other than run this does not consume the whole stream at once but
+        processes one morpheme at a time, which allows the caller to act on
+        intermediate results.
+
+        Args:
+            context: The context to provide to the states for processing.
+            morphemes: The stream of morphemes to process.
+
+        Returns:
+            An iterator yielding the context after each processed morpheme.
+        """
+        current_state = self._initial_state
+
+        for m in morphemes:
+            next_state = self.get_next_state(current_state, m)
+            next_state.on_input(context, m)
+            current_state = next_state
+            yield context
+
+
+class CompiledStateMachine:
+    """A state machine whose transitions have been precomputed for every part of speech ID.
+
+    This behaves exactly like the state machine it was compiled from, but determining
+    the next state only takes a single lookup in a table indexed by the current state
+    and the part of speech ID of the morpheme instead of comparing its features.
+    Instances are created with StateMachine.compile.
+    """
+
+    def __init__(self, source: StateMachine, states: List[State], table: List[List[int]], initial_state: int):
+        """Constructs a compiled state machine.
+
+        Args:
+            source: The state machine that was compiled, used for morphemes with unknown part of speech IDs.
+            states: The states of the state machine, indexed by their position.
+            table: For each state index the index of the next state for every part of speech ID.
+            initial_state: The index of the initial state.
+        """
+        self._source = source
+        self._states = states
+        self._table = table
+        self._initial_state = initial_state
+        self._state_indices = {state: i for i, state in enumerate(states)}
+
+    def _find_next_state(self, source_state: int, morpheme: 'Morpheme') -> int:
+        # The part of speech is unknown to the table, e.g. because it was added by
+        # a user dictionary after compilation, so we have to match it by its features.
+        next_state = self._source.get_next_state(self._states[source_state], morpheme)
+        return self._state_indices[next_state]
+
+    def run(self, context: Any, morphemes: Iterable['Morpheme']) -> Any:
+        """Runs the state machine on a stream of morphemes.
+
+        Args:
+            context: The context to provide to the states for processing.
+            morphemes: The stream of morphemes to process.
+
+        Returns:
+            The context after processing of all input is complete.
+        """
+        states = self._states
+        table = self._table
+        current_state = self._initial_state
+
+        for m in morphemes:
+            try:
+                current_state = table[current_state][m.part_of_speech_id()]
+            except IndexError:
+                current_state = self._find_next_state(current_state, m)
+            states[current_state].on_input(context, m)
+
+        return context
+
+    def iter_run(self, context: Any, morphemes: Iterable['Morpheme']) -> Iterator[Any]:
+        """Runs the state machine on a stream of morphemes step by step.
+
+        Args:
+            context: The context to provide to the states for processing.
+            morphemes: The stream of morphemes to process.
+
+        Returns:
+            An iterator yielding the context after each processed morpheme.
+        """
+        states = self._states
+        table = self._table
+        current_state = self._initial_state
+
+        for m in morphemes:
+            try:
+                current_state = table[current_state][m.part_of_speech_id()]
+            except IndexError:
+                current_state = self._find_next_state(current_state, m)
+            states[current_state].on_input(context, m)
+            yield context
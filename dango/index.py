@@ -0,0 +1,296 @@
+from collections import ChainMap, Counter, deque
+from itertools import islice
+from threading import Lock
+from typing import TYPE_CHECKING, AbstractSet, Deque, Dict, Iterable, List, NamedTuple, Optional, Sequence, Tuple, Union
+
+from .word import AnyWord, PartOfSpeech
+
+if TYPE_CHECKING:
+    import os
+
+    from .dango import Tokenizer
+
+# The word attributes needed to index a sentence, so that no readings are looked up.
+INDEX_FIELDS = frozenset({'dictionary_form', 'part_of_speech', 'begin', 'end'})
+
+# The parts of speech that are not indexed by default.
+DEFAULT_UNINDEXED_PARTS_OF_SPEECH = frozenset({PartOfSpeech.WHITESPACE})
+
+_SCHEMA = (
+    'CREATE TABLE IF NOT EXISTS sentences (id INTEGER PRIMARY KEY, text TEXT NOT NULL)',
+    'CREATE TABLE IF NOT EXISTS words ('
+    '    id INTEGER PRIMARY KEY, dictionary_form TEXT NOT NULL, part_of_speech TEXT NOT NULL,'
+    '    count INTEGER NOT NULL, UNIQUE (dictionary_form, part_of_speech))',
+    'CREATE INDEX IF NOT EXISTS words_by_count ON words (count DESC)',
+    # Postings are clustered by word, so all occurrences of a word are read in one range scan.
+    'CREATE TABLE IF NOT EXISTS postings ('
+    '    word_id INTEGER NOT NULL, sentence_id INTEGER NOT NULL, begin INTEGER NOT NULL, end INTEGER NOT NULL,'
+    '    PRIMARY KEY (word_id, sentence_id, begin)) WITHOUT ROWID',
+)
+
+
+class Posting(NamedTuple):
+    """An occurrence of a word in an indexed sentence."""
+
+    sentence_id: int
+    begin: int
+    end: int
+    part_of_speech: PartOfSpeech
+
+
+class ConcordanceLine(NamedTuple):
+    """An occurrence of a word with the text surrounding it, i.e. a line of a KWIC concordance."""
+
+    sentence_id: int
+    left: str
+    keyword: str
+    right: str
+
+
+class WordIndex:
+    """An inverted index of sentences by the dictionary forms of their words, stored in a local SQLite database.
+
+    Every occurrence of a word is recorded with the ID of its sentence and its offsets,
+    keyed by its dictionary form and part of speech. So all sentences containing a word
+    in any inflection can be found without tokenizing them again, e.g. 見ました and
+    見ていない for 見る. Sentences can be added at any time and are tokenized by multiple
+    processes if requested. The number of occurrences of each word is kept up to date,
+    so frequencies don't have to be counted on every query.
+
+    The database can be shared by multiple processes, but should only be written by one.
+    """
+
+    def __init__(
+            self,
+            path: Union[str, 'os.PathLike[str]'],
+            tokenizer: Optional['Tokenizer'] = None,
+            exclude: AbstractSet[PartOfSpeech] = DEFAULT_UNINDEXED_PARTS_OF_SPEECH
+    ):
+        """Opens an index, creating it if it doesn't exist yet.
+
+        Args:
+            path: The path of the SQLite database file.
+            tokenizer: The tokenizer used to split added sentences into words. If None a tokenizer
+                with its own dictionary is used, which only computes the attributes needed for
+                indexing. A SudachiPy dictionary must not be used by multiple threads at once,
+                and the index tokenizes outside of its lock.
+            exclude: The parts of speech of words that are not indexed.
+
+        Raises:
+            ValueError: If the tokenizer doesn't compute all of INDEX_FIELDS.
+        """
+        if tokenizer is not None and tokenizer.fields is not None and not INDEX_FIELDS <= tokenizer.fields:
+            raise ValueError('the tokenizer of an index must also compute {}'.format(', '.join(sorted(
+                INDEX_FIELDS - tokenizer.fields))))
+        if tokenizer is None:
+            import dango
+
+            tokenizer = dango.Tokenizer(fields=INDEX_FIELDS, exclude_pos=exclude)
+
+        self._tokenizer = tokenizer
+        self._exclude = frozenset(exclude)
+        self._word_ids: Dict[Tuple[str, str], int] = {}
+        self._lock = Lock()
+
+        import sqlite3
+
+        self._connection = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._connection.execute('PRAGMA journal_mode=WAL')
+        self._connection.execute('PRAGMA synchronous=NORMAL')
+        for statement in _SCHEMA:
+            self._connection.execute(statement)
+
+    def __enter__(self) -> 'WordIndex':
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        self.close()
+
+    def __len__(self) -> int:
+        """Returns the number of indexed sentences."""
+        with self._lock:
+            return self._connection.execute('SELECT COUNT(*) FROM sentences').fetchone()[0]
+
+    def add(self, sentences: Iterable[str], workers: int = 1, chunksize: int = 64, batch_size: int = 1000) -> int:
+        """Tokenizes the given sentences and adds them to the index.
+
+        The sentences are stored in batches, each in one transaction, so an interrupted
+        run keeps the batches that were completed.
+
+        Args:
+            sentences: The sentences to add, e.g. the lines of a file.
+            workers: The number of worker processes used for tokenizing, see Tokenizer.tokenize_many.
+            chunksize: The number of sentences that are sent to a worker at once.
+            batch_size: The number of sentences stored per transaction.
+
+        Returns:
+            The number of sentences that were added.
+        """
+        # The texts are needed again when the words of their batch are stored. Since tokenize_many
+        # only reads a few chunks per worker ahead, only those texts and the current batch are kept.
+        texts: Deque[str] = deque()
+
+        def remember(text: str) -> str:
+            texts.append(text)
+            return text
+
+        results = iter(self._tokenizer.tokenize_many(map(remember, sentences), workers, chunksize))
+        added = 0
+
+        while True:
+            batch = list(islice(results, batch_size))
+            if not batch:
+                break
+            self._add_batch([texts.popleft() for _ in batch], batch)
+            added += len(batch)
+
+        return added
+
+    def _add_batch(self, texts: Sequence[str], results: Sequence[Sequence[AnyWord]]) -> None:
+        with self._lock:
+            connection = self._connection
+            connection.execute('BEGIN IMMEDIATE')
+            try:
+                first_id = connection.execute('SELECT COALESCE(MAX(id) + 1, 0) FROM sentences').fetchone()[0]
+                connection.executemany('INSERT INTO sentences (id, text) VALUES (?, ?)', enumerate(texts, first_id))
+
+                counts: 'Counter[Tuple[str, str]]' = Counter()
+                postings = []
+                for sentence_id, words in enumerate(results, first_id):
+                    for w in words:
+                        pos = w.part_of_speech
+                        # All fields needed are computed by the tokenizer, see __init__.
+                        assert pos is not None and w.dictionary_form is not None
+                        if pos in self._exclude:
+                            continue
+                        key = (w.dictionary_form, pos.name)
+                        counts[key] += 1
+                        postings.append((key, sentence_id, w.begin, w.end))
+
+                for key, count in counts.items():
+                    connection.execute(
+                        'INSERT OR IGNORE INTO words (dictionary_form, part_of_speech, count) VALUES (?, ?, 0)', key)
+                    connection.execute(
+                        'UPDATE words SET count = count + ? WHERE dictionary_form = ? AND part_of_speech = ?',
+                        (count,) + key)
+
+                new_word_ids = {
+                    key: connection.execute(
+                        'SELECT id FROM words WHERE dictionary_form = ? AND part_of_speech = ?', key).fetchone()[0]
+                    for key in counts if key not in self._word_ids}
+                word_ids = ChainMap(new_word_ids, self._word_ids)
+                connection.executemany(
+                    'INSERT INTO postings (word_id, sentence_id, begin, end) VALUES (?, ?, ?, ?)',
+                    ((word_ids[key], sentence_id, begin, end) for key, sentence_id, begin, end in postings))
+                connection.execute('COMMIT')
+            except BaseException:
+                connection.execute('ROLLBACK')
+                raise
+
+            # Word IDs never change once committed, so they are cached for the lifetime of the index.
+            self._word_ids.update(new_word_ids)
+
+    @staticmethod
+    def _word_filter(dictionary_form: str, part_of_speech: Optional[PartOfSpeech]) -> Tuple[str, Tuple[str, ...]]:
+        if part_of_speech is None:
+            return 'w.dictionary_form = ?', (dictionary_form,)
+        return 'w.dictionary_form = ? AND w.part_of_speech = ?', (dictionary_form, part_of_speech.name)
+
+    def lookup(
+            self,
+            dictionary_form: str,
+            part_of_speech: Optional[PartOfSpeech] = None,
+            limit: Optional[int] = None
+    ) -> List[Posting]:
+        """Returns the occurrences of a word in any inflection, in the order of the sentences.
+
+        Args:
+            dictionary_form: The dictionary form of the word, e.g. 見る.
+            part_of_speech: The part of speech of the word, or None for any part of speech.
+            limit: The maximum number of occurrences to return, or None for all.
+        """
+        condition, parameters = self._word_filter(dictionary_form, part_of_speech)
+        with self._lock:
+            rows = self._connection.execute(
+                'SELECT p.sentence_id, p.begin, p.end, w.part_of_speech FROM words w '
+                'JOIN postings p ON p.word_id = w.id WHERE {} ORDER BY p.sentence_id, p.begin LIMIT ?'.format(
+                    condition), parameters + (-1 if limit is None else limit,)).fetchall()
+        return [Posting(sentence_id, begin, end, PartOfSpeech[pos]) for sentence_id, begin, end, pos in rows]
+
+    def concordance(
+            self,
+            dictionary_form: str,
+            part_of_speech: Optional[PartOfSpeech] = None,
+            width: int = 20,
+            limit: Optional[int] = None
+    ) -> List[ConcordanceLine]:
+        """Returns the occurrences of a word in any inflection with their context, i.e. a KWIC concordance.
+
+        Args:
+            dictionary_form: The dictionary form of the word, e.g. 見る.
+            part_of_speech: The part of speech of the word, or None for any part of speech.
+            width: The maximum number of characters of context on each side of the word.
+            limit: The maximum number of occurrences to return, or None for all.
+        """
+        condition, parameters = self._word_filter(dictionary_form, part_of_speech)
+        with self._lock:
+            rows = self._connection.execute(
+                'SELECT p.sentence_id, p.begin, p.end, s.text FROM words w '
+                'JOIN postings p ON p.word_id = w.id JOIN sentences s ON s.id = p.sentence_id '
+                'WHERE {} ORDER BY p.sentence_id, p.begin LIMIT ?'.format(condition),
+                parameters + (-1 if limit is None else limit,)).fetchall()
+        return [ConcordanceLine(sentence_id, text[max(begin - width, 0):begin], text[begin:end], text[end:end + width])
+                for sentence_id, begin, end, text in rows]
+
+    def frequency(self, dictionary_form: str, part_of_speech: Optional[PartOfSpeech] = None) -> int:
+        """Returns the number of occurrences of a word in any inflection.
+
+        Args:
+            dictionary_form: The dictionary form of the word, e.g. 見る.
+            part_of_speech: The part of speech of the word, or None for any part of speech.
+        """
+        condition, parameters = self._word_filter(dictionary_form, part_of_speech)
+        with self._lock:
+            return self._connection.execute(
+                'SELECT COALESCE(SUM(w.count), 0) FROM words w WHERE {}'.format(condition), parameters).fetchone()[0]
+
+    def most_common(
+            self,
+            n: Optional[int] = None,
+            part_of_speech: Optional[PartOfSpeech] = None
+    ) -> List[Tuple[str, PartOfSpeech, int]]:
+        """Returns the most frequent words, most frequent first.
+
+        Args:
+            n: The number of words to return, or None for all.
+            part_of_speech: Only return words of this part of speech, or None for any part of speech.
+
+        Returns:
+            The dictionary form, part of speech and number of occurrences of each word.
+        """
+        condition, parameters = ('WHERE part_of_speech = ?', (part_of_speech.name,)) if part_of_speech else ('', ())
+        with self._lock:
+            rows = self._connection.execute(
+                'SELECT dictionary_form, part_of_speech, count FROM words {} ORDER BY count DESC, id LIMIT ?'.format(
+                    condition), parameters + (-1 if n is None else n,)).fetchall()
+        return [(dictionary_form, PartOfSpeech[pos], count) for dictionary_form, pos, count in rows]
+
+    def sentence(self, sentence_id: int) -> str:
+        """Returns the text of an indexed sentence.
+
+        Args:
+            sentence_id: The ID of the sentence, e.g. of a posting.
+
+        Raises:
+            KeyError: If there is no sentence with the given ID.
+        """
+        with self._lock:
+            row = self._connection.execute('SELECT text FROM sentences WHERE id = ?', (sentence_id,)).fetchone()
+        if row is None:
+            raise KeyError(sentence_id)
+        return row[0]
+
+    def close(self) -> None:
+        """Closes the underlying database connection."""
+        with self._lock:
+            self._connection.close()
@@ -0,0 +1,212 @@
+from bisect import bisect_left
+from threading import Lock
+from typing import Any, Dict, List, Sequence
+
+# The stages of tokenizing a phrase, in order.
+STAGES = ('analysis', 'aggregation', 'words')
+
+# The upper bounds in seconds of the histogram buckets for the duration of a stage per phrase.
+DEFAULT_BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 1.0)
+
+COUNTERS = ('phrases', 'characters', 'morphemes', 'words',
+            'reading_cache_hits', 'reading_cache_misses', 'phrase_cache_hits', 'phrase_cache_misses')
+
+_COUNTER_HELP = {
+    'phrases': 'Number of phrases that were tokenized.',
+    'characters': 'Number of characters that were tokenized.',
+    'morphemes': 'Number of morphemes produced by SudachiPy.',
+    'words': 'Number of words that were created.',
+    'reading_cache_hits': 'Number of dictionary form readings found in the reading cache.',
+    'reading_cache_misses': 'Number of dictionary form readings looked up in the lexicon.',
+    'phrase_cache_hits': 'Number of phrases found in the phrase cache.',
+    'phrase_cache_misses': 'Number of phrases not found in the phrase cache.',
+}
+
+
+class TokenizerMetrics:
+    """Collects counters and per-stage durations of one or more tokenizers.
+
+    A tokenizer constructed with metrics records the time each phrase spends in
+    the stages of tokenization, i.e. the analysis by SudachiPy, the aggregation of
+    morphemes into chunks and the creation of words including their readings.
+    Tokenizers without metrics don't measure anything. The same metrics can be
+    shared by multiple tokenizers, e.g. those of a TokenizerPool, and are safe to
+    use from multiple threads.
+
+    Metrics sent to another process start out empty there and are not sent back,
+    so the metrics of worker processes are not collected.
+    """
+
+    def __init__(self, buckets: Sequence[float] = DEFAULT_BUCKETS):
+        """Constructs new empty metrics.
+
+        Args:
+            buckets: The upper bounds in seconds of the histogram buckets for the stage durations.
+        """
+        self._buckets = tuple(sorted(buckets))
+        self._lock = Lock()
+        self.reset()
+
+    def __reduce__(self):
+        return type(self), (self._buckets,)
+
+    def reset(self) -> None:
+        """Sets all counters and histograms back to zero."""
+        with self._lock:
+            self._counters = dict.fromkeys(COUNTERS, 0)
+            self._durations = dict.fromkeys(STAGES, 0.0)
+            # the last bucket counts durations above the largest bound
+            self._histograms = {stage: [0] * (len(self._buckets) + 1) for stage in STAGES}
+
+    def record_phrase(
+            self,
+            characters: int,
+            morphemes: int,
+            words: int,
+            durations: Sequence[float],
+            reading_cache_hits: int = 0,
+            reading_cache_misses: int = 0
+    ) -> None:
+        """Records a tokenized phrase.
+
+        Args:
+            characters: The length of the phrase.
+            morphemes: The number of morphemes of the phrase.
+            words: The number of words of the phrase.
+            durations: The seconds spent in each stage, in the order of STAGES.
+            reading_cache_hits: The number of readings found in the reading cache.
+            reading_cache_misses: The number of readings looked up in the lexicon.
+        """
+        with self._lock:
+            counters = self._counters
+            counters['phrases'] += 1
+            counters['characters'] += characters
+            counters['morphemes'] += morphemes
+            counters['words'] += words
+            counters['reading_cache_hits'] += reading_cache_hits
+            counters['reading_cache_misses'] += reading_cache_misses
+
+            for stage, seconds in zip(STAGES, durations):
+                self._durations[stage] += seconds
+                self._histograms[stage][bisect_left(self._buckets, seconds)] += 1
+
+    def record_phrase_cache(self, hit: bool) -> None:
+        """Records a lookup in the phrase cache.
+
+        Args:
+            hit: Flag if the phrase was found in the cache.
+        """
+        with self._lock:
+            self._counters['phrase_cache_hits' if hit else 'phrase_cache_misses'] += 1
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Returns the current state of all metrics as a plain dict.
+
+        Returns:
+            The counters by name, and under 'stages' the total seconds, the number of
+            phrases and the cumulative bucket counts of each stage, keyed by upper bound.
+        """
+        with self._lock:
+            snapshot: Dict[str, Any] = dict(self._counters)
+            snapshot['stages'] = {
+                stage: {
+                    'seconds': self._durations[stage],
+                    'count': sum(self._histograms[stage]),
+                    'buckets': dict(zip(self._buckets + (float('inf'),), _cumulative(self._histograms[stage]))),
+                }
+                for stage in STAGES
+            }
+        return snapshot
+
+    def merge(self, snapshot: Dict[str, Any]) -> None:
+        """Adds the metrics of a snapshot to these metrics, e.g. one taken in a worker process.
+
+        Args:
+            snapshot: The snapshot to add, as returned by snapshot.
+
+        Raises:
+            ValueError: If the snapshot has different histogram buckets.
+        """
+        stages = snapshot['stages']
+        for stage in STAGES:
+            if tuple(stages[stage]['buckets'])[:-1] != self._buckets:
+                raise ValueError('the buckets of the snapshot differ from {}'.format(self._buckets))
+
+        with self._lock:
+            for name in COUNTERS:
+                self._counters[name] += snapshot[name]
+
+            for stage in STAGES:
+                self._durations[stage] += stages[stage]['seconds']
+                histogram = self._histograms[stage]
+                previous = 0
+                for i, count in enumerate(stages[stage]['buckets'].values()):
+                    histogram[i] += count - previous
+                    previous = count
+
+    def to_prometheus(self, prefix: str = 'dango') -> str:
+        """Returns the metrics in the Prometheus text exposition format.
+
+        Args:
+            prefix: The prefix of all metric names.
+        """
+        snapshot = self.snapshot()
+        lines: List[str] = []
+
+        for name in COUNTERS:
+            metric = '{}_{}_total'.format(prefix, name)
+            lines.append('# HELP {} {}'.format(metric, _COUNTER_HELP[name]))
+            lines.append('# TYPE {} counter'.format(metric))
+            lines.append('{} {}'.format(metric, snapshot[name]))
+
+        metric = '{}_stage_duration_seconds'.format(prefix)
+        lines.append('# HELP {} Seconds spent per phrase in each stage of tokenization.'.format(metric))
+        lines.append('# TYPE {} histogram'.format(metric))
+        for stage, histogram in snapshot['stages'].items():
+            for bound, count in histogram['buckets'].items():
+                lines.append('{}_bucket{{stage="{}",le="{}"}} {}'.format(metric, stage, _format_bound(bound), count))
+            lines.append('{}_sum{{stage="{}"}} {!r}'.format(metric, stage, histogram['seconds']))
+            lines.append('{}_count{{stage="{}"}} {}'.format(metric, stage, histogram['count']))
+
+        return '\n'.join(lines) + '\n'
+
+    def report(self) -> str:
+        """Returns a human readable breakdown of the time spent in each stage."""
+        snapshot = self.snapshot()
+        stages = snapshot['stages']
+        total = sum(s['seconds'] for s in stages.values())
+        phrases = snapshot['phrases']
+
+        lines = ['{:<12} {:>12} {:>7} {:>14}'.format('stage', 'total', 'share', 'per phrase')]
+        for stage, histogram in stages.items():
+            lines.append('{:<12} {:>9.1f} ms {:>6.1f}% {:>11.3f} ms'.format(
+                stage, histogram['seconds'] * 1000, _ratio(histogram['seconds'], total) * 100,
+                _ratio(histogram['seconds'], phrases) * 1000))
+        lines.append('{:<12} {:>9.1f} ms'.format('total', total * 1000))
+
+        lines.append('{:,} phrases, {:,} characters, {:,} morphemes, {:,} words'.format(
+            phrases, snapshot['characters'], snapshot['morphemes'], snapshot['words']))
+        for cache in ('reading_cache', 'phrase_cache'):
+            hits, misses = snapshot[cache + '_hits'], snapshot[cache + '_misses']
+            if hits or misses:
+                lines.append('{}: {:,} hits, {:,} misses ({:.1f}% hits)'.format(
+                    cache.replace('_', ' '), hits, misses, _ratio(hits, hits + misses) * 100))
+
+        return '\n'.join(lines) + '\n'
+
+
+def _cumulative(counts: Sequence[int]) -> List[int]:
+    total = 0
+    result = []
+    for count in counts:
+        total += count
+        result.append(total)
+    return result
+
+
+def _format_bound(bound: float) -> str:
+    return '+Inf' if bound == float('inf') else repr(bound)
+
+
+def _ratio(value: float, total: float) -> float:
+    return value / total if total else 0.0
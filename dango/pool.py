@@ -0,0 +1,72 @@
+import threading
+from contextlib import contextmanager
+from typing import Any, Iterator, List
+
+from .dango import Tokenizer
+from .word import AnyWord
+
+
+class TokenizerPool:
+    """Provides tokenizers that can be used from multiple threads at the same time.
+
+    A tokenizer must not be used by multiple threads at once. The pool either hands
+    out one tokenizer per thread with get, or lends tokenizers to whichever thread
+    needs one with checkout. All tokenizers are constructed with the same options.
+
+    Every tokenizer loads its own SudachiPy dictionary, since those can't be shared
+    between threads either. As the dictionary file is memory mapped, the tokenizers
+    still share its pages and each additional one only needs a few megabytes.
+    """
+
+    def __init__(self, **tokenizer_options: Any):
+        """Constructs a new pool.
+
+        Args:
+            tokenizer_options: The options every tokenizer is constructed with, see Tokenizer.
+                Caches passed as options, e.g. a phrase cache, are shared by all tokenizers.
+        """
+        self._tokenizer_options = tokenizer_options
+        self._local = threading.local()
+        self._idle: List[Tokenizer] = []
+        self._lock = threading.Lock()
+
+    def create(self) -> Tokenizer:
+        """Returns a new tokenizer constructed with the options of the pool."""
+        return Tokenizer(**self._tokenizer_options)
+
+    def get(self) -> Tokenizer:
+        """Returns the tokenizer of the current thread, which is created on first use."""
+        tokenizer = getattr(self._local, 'tokenizer', None)
+        if tokenizer is None:
+            tokenizer = self._local.tokenizer = self.create()
+        return tokenizer
+
+    @contextmanager
+    def checkout(self) -> Iterator[Tokenizer]:
+        """Lends a tokenizer to the current thread until the end of the with-block.
+
+        This is useful when there are many short-lived threads, as the tokenizers
+        are reused instead of creating a new one for each thread.
+        """
+        with self._lock:
+            tokenizer = self._idle.pop() if self._idle else None
+
+        if tokenizer is None:
+            tokenizer = self.create()
+
+        try:
+            yield tokenizer
+        finally:
+            with self._lock:
+                self._idle.append(tokenizer)
+
+    def tokenize(self, phrase: str) -> List[AnyWord]:
+        """Splits a given phrase into a list of words using the tokenizer of the current thread.
+
+        Args:
+            phrase: The phrase that should be tokenized.
+
+        Returns:
+            A list of words that make up the given phrase.
+        """
+        return self.get().tokenize(phrase)
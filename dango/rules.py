@@ -0,0 +1,285 @@
+import hashlib
+import json
+import os
+from typing import TYPE_CHECKING, Any, Dict, List, Mapping, Optional, Union
+
+from .fsm import State, StateMachine, StateTransitionRule
+
+if TYPE_CHECKING:
+    from sudachipy.morpheme import Morpheme
+
+
+class WordState(State):
+    """FSM state used to aggregate morphemes into "word chunks"."""
+
+    def __init__(self, name: str, start_new_word=False):
+        """Constructs a new word aggregation state.
+
+        Args:
+            name: The name of the state.
+            start_new_word: Flag if a new chunk should be started on_input or if the morpheme
+                should just be appended to the last chunk.
+        """
+        self.name = name
+        self.start_new_word = start_new_word
+
+    def on_input(self, context: List[List['Morpheme']], morpheme: 'Morpheme') -> None:
+        """Processes the current morpheme.
+
+        Args:
+            context: The list of morpheme chunks so far.
+            morpheme: The morpheme to process.
+        """
+        if self.start_new_word:
+            context.append([])
+        context[-1].append(morpheme)
+
+    def __repr__(self):
+        return 'WordState({!r}, start_new_word={!r})'.format(self.name, self.start_new_word)
+
+
+UNSPECIFIED_WORD_STATE = WordState('UNSPECIFIED', start_new_word=True)
+VERB_STATE = WordState('VERB', start_new_word=True)
+VERB_INFLECTION_STATE = WordState('VERB_INFLECTION')
+ADJECTIVE_STATE = WordState('ADJECTIVE', start_new_word=True)
+ADJECTIVE_INFLECTION_STATE = WordState('ADJECTIVE_INFLECTION')
+
+WORD_AGGREGATION_FSM = StateMachine(
+    [
+        UNSPECIFIED_WORD_STATE,
+        VERB_STATE,
+        VERB_INFLECTION_STATE,
+        ADJECTIVE_STATE,
+        ADJECTIVE_INFLECTION_STATE
+    ],
+    UNSPECIFIED_WORD_STATE,
+    UNSPECIFIED_WORD_STATE,
+    [
+        # --- transitions to aggregate inflected verbs ---
+
+        # start of a verb
+        (None, ('動詞', '一般', '*', '*'), VERB_STATE),
+        # Some verbs (for example 見る) are detected as non independent even when standing alone, so we also need
+        # to account for these cases for starting a new verb. Since specific transitions have higher priority than
+        # wildcard transition we don't risk breaking apart an inflected verb by accident.
+        (None, ('動詞', '非自立可能', '*', '*'), VERB_STATE),
+        # The inflected part of a verb is started by either an auxiliary verb, ...
+        (VERB_STATE, ('助動詞', '*', '*', '*'), VERB_INFLECTION_STATE),
+        # or a conjunctive particle, i.e. て or で.
+        (VERB_STATE, ('助詞', '接続助詞', '*', '*'), VERB_INFLECTION_STATE),
+        # continue aggregating any auxiliary verbs ...
+        (VERB_INFLECTION_STATE, ('助動詞', '*', '*', '*'), VERB_INFLECTION_STATE),
+        # and non independent verbs, e.g. the いる　of the continuous form
+        (VERB_INFLECTION_STATE, ('動詞', '非自立可能', '*', '*'), VERB_INFLECTION_STATE),
+
+        # suffix for seeming/looks-like
+        (VERB_STATE, ('形状詞', '助動詞語幹', '*', '*'), VERB_INFLECTION_STATE),
+
+        # --- transitions to aggregate inflected adjectives ---
+
+        # start of an adjective
+        (None, ('形容詞', '一般', '*', '*'), ADJECTIVE_STATE),
+        # can be followed by negating suffix
+        (ADJECTIVE_STATE, ('形容詞', '非自立可能', '*', '*'), ADJECTIVE_INFLECTION_STATE),
+        # and/or suffix for the past-tense
+        (ADJECTIVE_STATE, ('助動詞', '*', '*', '*'), VERB_INFLECTION_STATE),
+        (ADJECTIVE_INFLECTION_STATE, ('助動詞', '*', '*', '*'), VERB_INFLECTION_STATE),
+
+        # suffix for seeming/looks-like
+        (ADJECTIVE_STATE, ('形状詞', '助動詞語幹', '*', '*'), ADJECTIVE_INFLECTION_STATE)
+    ])
+
+# The file extensions of the supported rule file formats.
+RULE_FILE_FORMATS = {
+    '.json': 'json',
+    '.toml': 'toml',
+    '.yaml': 'yaml',
+    '.yml': 'yaml',
+}
+
+_STATE_KEYS = {'name', 'start_new_word'}
+_TRANSITION_KEYS = {'from', 'features', 'to'}
+_RULES_KEYS = {'states', 'initial_state', 'default_state', 'transitions'}
+
+
+def _check_keys(value: Any, allowed: set, what: str) -> None:
+    if not isinstance(value, Mapping):
+        raise ValueError('{} must be a mapping, got {!r}'.format(what, value))
+    unknown = set(value) - allowed
+    if unknown:
+        raise ValueError('{} has unknown keys: {}'.format(what, ', '.join(sorted(map(str, unknown)))))
+
+
+def parse_rules(data: Mapping[str, Any]) -> StateMachine:
+    """Returns a word aggregation state machine created from a declarative specification.
+
+    The specification has the following form, shown as JSON:
+
+        {
+            "states": [{"name": "OTHER", "start_new_word": true}, {"name": "VERB", "start_new_word": true}, ...],
+            "initial_state": "OTHER",
+            "default_state": "OTHER",
+            "transitions": [{"from": "VERB", "features": ["助動詞", "*", "*", "*"], "to": "VERB_INFLECTION"}, ...]
+        }
+
+    A transition without "from" applies to any source state, like a source state of
+    None in StateMachine. States that don't start a new word append the morpheme to
+    the previous word instead.
+
+    Args:
+        data: The specification, e.g. as parsed from a JSON, TOML or YAML file.
+
+    Raises:
+        ValueError: If the specification is invalid.
+    """
+    _check_keys(data, _RULES_KEYS, 'rules')
+
+    states: Dict[str, WordState] = {}
+    for i, spec in enumerate(data.get('states') or ()):
+        _check_keys(spec, _STATE_KEYS, 'state {}'.format(i))
+        name = spec.get('name')
+        if not isinstance(name, str) or not name:
+            raise ValueError('state {} must have a name, got {!r}'.format(i, name))
+        if name in states:
+            raise ValueError('state {!r} is defined more than once'.format(name))
+        start_new_word = spec.get('start_new_word', False)
+        if not isinstance(start_new_word, bool):
+            raise ValueError('start_new_word of state {!r} must be a boolean, got {!r}'.format(name, start_new_word))
+        states[name] = WordState(name, start_new_word)
+
+    if not states:
+        raise ValueError('rules must define at least one state')
+
+    def get_state(name: Any, what: str) -> WordState:
+        if name not in states:
+            raise ValueError('{} refers to an unknown state {!r}'.format(what, name))
+        return states[name]
+
+    initial_state = get_state(data.get('initial_state'), 'initial_state')
+    default_state = get_state(data.get('default_state'), 'default_state')
+    # The first morpheme of a phrase has no previous word to be appended to.
+    if not default_state.start_new_word:
+        raise ValueError('default_state {!r} must start a new word'.format(default_state.name))
+
+    transitions: List[StateTransitionRule] = []
+    targets: Dict[Any, WordState] = {}
+    for i, spec in enumerate(data.get('transitions') or ()):
+        what = 'transition {}'.format(i)
+        _check_keys(spec, _TRANSITION_KEYS, what)
+
+        src = get_state(spec['from'], what) if spec.get('from') is not None else None
+        dst = get_state(spec.get('to'), what)
+
+        features = spec.get('features')
+        if not isinstance(features, (list, tuple)) or len(features) != 4 or \
+                not all(isinstance(f, str) for f in features):
+            raise ValueError('features of {} must be a list of 4 strings, got {!r}'.format(what, features))
+        features = tuple(features)
+
+        if (src is None or src is initial_state) and not dst.start_new_word:
+            raise ValueError('{} can be taken by the first morpheme, so {!r} must start a new word'.format(
+                what, dst.name))
+        if targets.setdefault((src, features), dst) is not dst:
+            raise ValueError('{} conflicts with an earlier transition for the same state and features'.format(what))
+
+        transitions.append((src, features, dst))
+
+    return StateMachine(list(states.values()), initial_state, default_state, transitions)
+
+
+def load_rules(path: Union[str, 'os.PathLike[str]']) -> StateMachine:
+    """Returns a word aggregation state machine loaded from a rule file.
+
+    The format is determined by the file extension, see RULE_FILE_FORMATS. TOML files
+    require Python 3.11 or the tomli package and YAML files require PyYAML.
+    See parse_rules for the structure of the file.
+
+    Args:
+        path: The path of the rule file.
+
+    Raises:
+        ValueError: If the format is not supported or the rules are invalid.
+    """
+    extension = os.path.splitext(os.fspath(path))[1].lower()
+    file_format = RULE_FILE_FORMATS.get(extension)
+    if file_format is None:
+        raise ValueError('unsupported rule file format {!r}, expected one of {}'.format(
+            extension, ', '.join(RULE_FILE_FORMATS)))
+
+    with open(path, 'rb') as f:
+        content = f.read()
+
+    data: Any
+    if file_format == 'json':
+        data = json.loads(content.decode('utf-8'))
+    elif file_format == 'toml':
+        try:
+            import tomllib
+        except ImportError:
+            import tomli as tomllib  # type: ignore
+        data = tomllib.loads(content.decode('utf-8'))
+    else:
+        import yaml
+        data = yaml.safe_load(content)
+
+    return parse_rules(data)
+
+
+def dump_rules(fsm: StateMachine) -> Dict[str, Any]:
+    """Returns the declarative specification of a word aggregation state machine.
+
+    This is the inverse of parse_rules, e.g. to save the default rules to a file as
+    a starting point for custom rules.
+
+    Args:
+        fsm: A state machine whose states are all WordState instances.
+
+    Raises:
+        ValueError: If the state machine has states other than WordState.
+    """
+    for state in fsm.states:
+        if not isinstance(state, WordState):
+            raise ValueError('only state machines made of WordState can be dumped, got {!r}'.format(state))
+
+    def name(state: Optional[State]) -> Optional[str]:
+        return getattr(state, 'name', None)
+
+    transitions = []
+    for src, features, dst in fsm.transitions:
+        transition: Dict[str, Any] = {'features': list(features), 'to': name(dst)}
+        if src is not None:
+            transition['from'] = name(src)
+        transitions.append(transition)
+
+    return {
+        'states': [{'name': name(s), 'start_new_word': getattr(s, 'start_new_word')} for s in fsm.states],
+        'initial_state': name(fsm.initial_state),
+        'default_state': name(fsm.default_state),
+        'transitions': transitions,
+    }
+
+
+def rules_fingerprint(fsm: StateMachine) -> str:
+    """Returns a hash identifying the behavior of a state machine, e.g. for cache namespaces.
+
+    Two state machines with the same states and transitions have the same fingerprint,
+    regardless of whether they were loaded from a file or constructed in code.
+
+    Args:
+        fsm: The state machine to identify.
+    """
+    def describe(state: Optional[State]) -> Any:
+        if state is None:
+            return None
+        return [type(state).__module__, type(state).__qualname__,
+                getattr(state, 'name', None), getattr(state, 'start_new_word', None)]
+
+    spec = {
+        'states': [describe(s) for s in fsm.states],
+        'initial_state': describe(fsm.initial_state),
+        'default_state': describe(fsm.default_state),
+        'transitions': sorted(
+            [[describe(src), list(features), describe(dst)] for src, features, dst in fsm.transitions],
+            key=lambda t: json.dumps(t, ensure_ascii=False)),
+    }
+    return hashlib.sha256(json.dumps(spec, ensure_ascii=False, sort_keys=True).encode('utf-8')).hexdigest()[:16]
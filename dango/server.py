@@ -0,0 +1,403 @@
+import json
+import os
+import queue
+import socketserver
+import stat
+import threading
+from concurrent.futures import Future
+from functools import partial
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from socketserver import ThreadingMixIn
+from time import perf_counter
+from typing import TYPE_CHECKING, Any, Dict, Iterable, List, Optional, Sequence, Tuple, Union
+
+from .dango import _get_worker_tokenizer, _init_worker
+from .metrics import TokenizerMetrics
+from .word import WORD_FIELDS, AnyWord, PartOfSpeech
+
+if TYPE_CHECKING:
+    from .dango import Tokenizer
+
+# The maximum number of phrases tokenized at once.
+DEFAULT_BATCH_SIZE = 64
+
+# The maximum number of seconds a phrase waits for further phrases to fill its batch.
+DEFAULT_MAX_DELAY = 0.002
+
+# The maximum size of a request body in bytes.
+MAX_REQUEST_BYTES = 16 * 1024 * 1024
+
+SERVICE_COUNTERS = ('requests', 'request_errors', 'batches', 'batched_phrases')
+
+_SERVICE_COUNTER_HELP = {
+    'requests': 'Number of tokenization requests.',
+    'request_errors': 'Number of requests that failed.',
+    'batches': 'Number of batches that were tokenized.',
+    'batched_phrases': 'Number of phrases that were tokenized in batches.',
+}
+
+
+def encode_words_json(words: Iterable[AnyWord]) -> str:
+    """Returns the words as a JSON array of objects, with the parts of speech by name.
+
+    Args:
+        words: The words to encode.
+    """
+    encoded = []
+    for w in words:
+        word: Dict[str, Any] = {name: getattr(w, name) for name in WORD_FIELDS}
+        if isinstance(word['part_of_speech'], PartOfSpeech):
+            word['part_of_speech'] = word['part_of_speech'].name
+        encoded.append(word)
+    return json.dumps(encoded, ensure_ascii=False, separators=(',', ':'))
+
+
+def _tokenize_worker_batch(phrases: Sequence[str]) -> Tuple[List[str], Optional[Dict[str, Any]]]:
+    # Returns the encoded words of each phrase and the metrics recorded since the last batch.
+    tokenizer = _get_worker_tokenizer()
+    results = [encode_words_json(tokenizer.tokenize(phrase)) for phrase in phrases]
+    metrics = tokenizer.metrics
+    if metrics is None:
+        return results, None
+    snapshot = metrics.snapshot()
+    metrics.reset()
+    return results, snapshot
+
+
+class TokenizationService:
+    """Tokenizes phrases submitted from multiple threads in batches.
+
+    Phrases are collected into batches of up to batch_size phrases, waiting at most
+    max_delay seconds for a batch to fill up. Batches are tokenized either in the
+    current process or, with more than one worker, by a pool of worker processes that
+    each load the dictionary once. The words of each phrase are returned encoded as
+    JSON, see encode_words_json, so they don't have to be sent between processes as
+    objects. The metrics of the tokenizer include those of the worker processes.
+    """
+
+    def __init__(
+            self,
+            tokenizer: 'Tokenizer',
+            workers: int = 1,
+            batch_size: int = DEFAULT_BATCH_SIZE,
+            max_delay: float = DEFAULT_MAX_DELAY
+    ):
+        """Constructs a new service and starts its worker processes.
+
+        Args:
+            tokenizer: The tokenizer to use. Worker processes use a copy with the same options.
+            workers: The number of worker processes, or 1 to tokenize in the current process.
+            batch_size: The maximum number of phrases tokenized at once.
+            max_delay: The maximum number of seconds a phrase waits for further phrases to fill its batch.
+        """
+        if workers < 1:
+            raise ValueError('workers must be at least 1, got {}'.format(workers))
+
+        self._tokenizer = tokenizer
+        self._workers = workers
+        self._batch_size = batch_size
+        self._max_delay = max_delay
+        self._counters = dict.fromkeys(SERVICE_COUNTERS, 0)
+        self._lock = threading.Lock()
+        self._queue: 'queue.Queue[Optional[Tuple[str, Future]]]' = queue.Queue()
+
+        self._pool: Any = None
+        if workers > 1:
+            from multiprocessing import Pool
+
+            self._pool = Pool(workers, initializer=_init_worker, initargs=(tokenizer,))
+        # Limits the batches in flight, so that phrases keep being batched while the workers are busy.
+        self._in_flight = threading.BoundedSemaphore(workers)
+
+        self._batcher = threading.Thread(target=self._run, name='dango-batcher', daemon=True)
+        self._batcher.start()
+
+    @property
+    def workers(self) -> int:
+        """The number of worker processes, or 1 if phrases are tokenized in the current process."""
+        return self._workers
+
+    @property
+    def metrics(self) -> Optional[TokenizerMetrics]:
+        """The metrics of the tokenizer, or None if it wasn't constructed with metrics."""
+        return self._tokenizer.metrics
+
+    def submit(self, phrase: str) -> 'Future[str]':
+        """Adds a phrase to the next batch.
+
+        Args:
+            phrase: The phrase to tokenize.
+
+        Returns:
+            A future of the words of the phrase encoded as JSON.
+        """
+        future: 'Future[str]' = Future()
+        self._queue.put((phrase, future))
+        return future
+
+    def tokenize(self, phrases: Sequence[str], timeout: Optional[float] = None) -> List[str]:
+        """Tokenizes phrases in the next batches and waits for the results.
+
+        Args:
+            phrases: The phrases to tokenize.
+            timeout: The maximum number of seconds to wait, or None to wait indefinitely.
+
+        Returns:
+            The words of each phrase encoded as JSON.
+        """
+        futures = [self.submit(phrase) for phrase in phrases]
+        return [future.result(timeout) for future in futures]
+
+    def count(self, counter: str, value: int = 1) -> None:
+        """Increments one of the counters of the service, see SERVICE_COUNTERS.
+
+        Args:
+            counter: The name of the counter.
+            value: The value to add.
+        """
+        with self._lock:
+            self._counters[counter] += value
+
+    def _run(self) -> None:
+        while True:
+            item = self._queue.get()
+            if item is None:
+                return
+
+            batch = [item]
+            deadline = perf_counter() + self._max_delay
+            while len(batch) < self._batch_size:
+                try:
+                    item = self._queue.get(timeout=max(deadline - perf_counter(), 0))
+                except queue.Empty:
+                    break
+                if item is None:
+                    # Stop after this batch, the item is put back for the outer loop.
+                    self._queue.put(None)
+                    break
+                batch.append(item)
+
+            self._dispatch(batch)
+
+    def _dispatch(self, batch: List[Tuple[str, Future]]) -> None:
+        self.count('batches')
+        self.count('batched_phrases', len(batch))
+        phrases = [phrase for phrase, _ in batch]
+
+        if self._pool is None:
+            try:
+                results = [encode_words_json(self._tokenizer.tokenize(phrase)) for phrase in phrases]
+                self._complete(batch, (results, None))
+            except Exception as e:
+                self._fail(batch, e)
+            return
+
+        self._in_flight.acquire()
+        self._pool.apply_async(_tokenize_worker_batch, (phrases,),
+                               callback=partial(self._complete, batch), error_callback=partial(self._fail, batch))
+
+    def _complete(self, batch: List[Tuple[str, Future]], result: Tuple[List[str], Optional[Dict[str, Any]]]) -> None:
+        results, snapshot = result
+        metrics = self._tokenizer.metrics
+        if self._pool is not None:
+            self._in_flight.release()
+        # Only worker processes return a snapshot, the current process records into the metrics directly.
+        if metrics is not None and snapshot is not None:
+            metrics.merge(snapshot)
+
+        for (_, future), words in zip(batch, results):
+            future.set_result(words)
+
+    def _fail(self, batch: List[Tuple[str, Future]], error: BaseException) -> None:
+        if self._pool is not None:
+            self._in_flight.release()
+        for _, future in batch:
+            future.set_exception(error)
+
+    def to_prometheus(self, prefix: str = 'dango') -> str:
+        """Returns the metrics of the tokenizer and the service in the Prometheus text exposition format.
+
+        Args:
+            prefix: The prefix of all metric names.
+        """
+        with self._lock:
+            counters = dict(self._counters)
+
+        lines = []
+        for name in SERVICE_COUNTERS:
+            metric = '{}_server_{}_total'.format(prefix, name)
+            lines.append('# HELP {} {}'.format(metric, _SERVICE_COUNTER_HELP[name]))
+            lines.append('# TYPE {} counter'.format(metric))
+            lines.append('{} {}'.format(metric, counters[name]))
+
+        metrics = self._tokenizer.metrics
+        return (metrics.to_prometheus(prefix) if metrics is not None else '') + '\n'.join(lines) + '\n'
+
+    def close(self) -> None:
+        """Stops the service after the submitted phrases have been tokenized."""
+        self._queue.put(None)
+        self._batcher.join()
+        if self._pool is not None:
+            self._pool.close()
+            self._pool.join()
+
+
+class RequestError(Exception):
+    """An invalid request, answered with the given HTTP status."""
+
+    def __init__(self, status: int, message: str):
+        super().__init__(message)
+        self.status = status
+
+
+class TokenizationRequestHandler(BaseHTTPRequestHandler):
+    """Handles the requests of a tokenization server.
+
+    POST /tokenize with {"text": "..."} returns {"words": [...]} and with
+    {"texts": ["...", ...]} returns {"results": [[...], ...]}, each word being an object
+    with the attributes of CompactWord. GET /health returns {"status": "ok"} and
+    GET /metrics the metrics in the Prometheus text format. Errors are returned as
+    {"error": "..."} with an appropriate status.
+    """
+
+    # Connections are kept alive, so clients don't pay for a new connection per request.
+    protocol_version = 'HTTP/1.1'
+
+    server: Any
+
+    def do_GET(self) -> None:
+        if self.path == '/health':
+            self._send(200, 'application/json', json.dumps({'status': 'ok', 'workers': self.server.service.workers}))
+        elif self.path == '/metrics':
+            self._send(200, 'text/plain; version=0.0.4', self.server.service.to_prometheus())
+        else:
+            self._send_error(RequestError(404, 'not found: {}'.format(self.path)))
+
+    def do_POST(self) -> None:
+        if self.path != '/tokenize':
+            self._send_error(RequestError(404, 'not found: {}'.format(self.path)))
+            return
+
+        service = self.server.service
+        service.count('requests')
+        try:
+            self._send(200, 'application/json', self._tokenize(self._read_json()))
+        except Exception as e:
+            service.count('request_errors')
+            if not isinstance(e, RequestError):
+                e = RequestError(500, '{}: {}'.format(type(e).__name__, e))
+            self._send_error(e)
+
+    def _read_json(self) -> Any:
+        length = self.headers.get('Content-Length')
+        if length is None or not length.isdigit():
+            raise RequestError(411, 'the request must have a Content-Length')
+        if int(length) > MAX_REQUEST_BYTES:
+            # The body isn't read, so the connection can't be reused.
+            self.close_connection = True
+            raise RequestError(413, 'the request must not be larger than {} bytes'.format(MAX_REQUEST_BYTES))
+
+        try:
+            return json.loads(self.rfile.read(int(length)).decode('utf-8'))
+        except ValueError as e:
+            raise RequestError(400, 'the request is not valid JSON: {}'.format(e))
+
+    def _tokenize(self, request: Any) -> str:
+        if isinstance(request, dict) and isinstance(request.get('text'), str):
+            return '{{"words":{}}}'.format(self.server.service.tokenize([request['text']])[0])
+        if isinstance(request, dict) and isinstance(request.get('texts'), list) and \
+                all(isinstance(text, str) for text in request['texts']):
+            return '{{"results":[{}]}}'.format(','.join(self.server.service.tokenize(request['texts'])))
+        raise RequestError(400, 'the request must be an object with either a "text" string or a "texts" array')
+
+    def _send_error(self, error: RequestError) -> None:
+        self._send(error.status, 'application/json', json.dumps({'error': str(error)}, ensure_ascii=False))
+
+    def _send(self, status: int, content_type: str, body: str) -> None:
+        data = body.encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', '{}; charset=utf-8'.format(content_type))
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def address_string(self) -> str:
+        # Clients of Unix sockets have no address.
+        return self.client_address[0] if isinstance(self.client_address, tuple) else 'unix'
+
+    def log_message(self, format: str, *args: Any) -> None:
+        # Requests are counted in the metrics instead of being logged.
+        pass
+
+
+class TokenizationServer(ThreadingMixIn, HTTPServer):
+    """An HTTP server tokenizing text with a TokenizationService, handling each connection in a thread."""
+
+    daemon_threads = True
+
+    def __init__(self, address: Tuple[str, int], service: TokenizationService):
+        """Constructs a new server listening on a TCP address.
+
+        Args:
+            address: The host and port to listen on, port 0 picks a free port.
+            service: The service that tokenizes the requests.
+        """
+        super().__init__(address, TokenizationRequestHandler)
+        self.service = service
+
+
+def _is_socket(path: str) -> bool:
+    try:
+        return stat.S_ISSOCK(os.lstat(path).st_mode)
+    except FileNotFoundError:
+        return False
+
+
+class UnixTokenizationServer(ThreadingMixIn, getattr(socketserver, 'UnixStreamServer', object)):  # type: ignore
+    """Like TokenizationServer, but listening on a Unix socket."""
+
+    daemon_threads = True
+
+    def __init__(self, path: str, service: TokenizationService):
+        """Constructs a new server listening on a Unix socket. Unix sockets are not available on Windows.
+
+        Args:
+            path: The path of the socket. A socket left over at the path, e.g. by a server
+                that was killed, is replaced.
+            service: The service that tokenizes the requests.
+
+        Raises:
+            FileExistsError: If something else than a socket exists at the path.
+        """
+        if os.path.lexists(path):
+            if not _is_socket(path):
+                raise FileExistsError('{} already exists and is not a socket'.format(path))
+            os.unlink(path)
+        super().__init__(path, TokenizationRequestHandler)
+        self.service = service
+
+    def server_close(self) -> None:
+        super().server_close()
+        if _is_socket(self.server_address):
+            os.unlink(self.server_address)
+
+
+def create_server(
+        service: TokenizationService,
+        host: str = '127.0.0.1',
+        port: int = 8080,
+        unix_socket: Optional[str] = None
+) -> Union[TokenizationServer, UnixTokenizationServer]:
+    """Returns a server for the given service, listening either on a TCP port or a Unix socket.
+
+    The server only starts handling requests once serve_forever is called.
+
+    Args:
+        service: The service that tokenizes the requests.
+        host: The host to listen on. The server is meant to be used locally only.
+        port: The port to listen on, port 0 picks a free port.
+        unix_socket: The path of a Unix socket to listen on instead of a TCP port.
+    """
+    if unix_socket is not None:
+        return UnixTokenizationServer(unix_socket, service)
+    return TokenizationServer((host, port), service)
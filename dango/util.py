@@ -1,3 +1,6 @@
+import re
+from typing import Iterable, Iterator, NamedTuple, Optional
+
 KATAKANA = (
     'ァアィイゥウェエォオ'
     'ヵカガキギクグヶケゲコゴ'
@@ -39,3 +42,54 @@ def katakana_to_hiragana(string: str) -> str:
         string: The string to convert.
     """
     return string.translate(KATAKANA_TO_HIRAGANA_TRANSLATION_TABLE)
+
+
+class CacheInfo(NamedTuple):
+    """Statistics of a cache."""
+
+    hits: int
+    misses: int
+    maxsize: Optional[int]
+    currsize: int
+
+
+# Characters after which a text can be split into independent segments without
+# affecting the tokenization, i.e. line breaks and sentence ending punctuation.
+SEGMENT_BOUNDARY_PATTERN = re.compile(r'(?<=[\n。．！？!?])(?![\n。．！？!?」』）)])')
+
+
+def iter_segments(chunks: Iterable[str], max_length: int = 4096) -> Iterator[str]:
+    """Returns the text made up of the given chunks split into segments at sentence or line boundaries.
+
+    Segments never exceed the maximum length. If there is no boundary within that
+    length the text is split at the maximum length instead. Joining all segments
+    results in the original text again.
+
+    Args:
+        chunks: The chunks of text to split, e.g. as read from a file.
+        max_length: The maximum length of a segment.
+    """
+    buffer = ''
+
+    for chunk in chunks:
+        buffer += chunk
+        boundaries = [0] + [m.start() for m in SEGMENT_BOUNDARY_PATTERN.finditer(buffer)] + [len(buffer)]
+        segments = [buffer[b:e] for b, e in zip(boundaries, boundaries[1:]) if b < e]
+
+        # The last segment might continue in the next chunk so we hold it back.
+        buffer = segments.pop() if segments else ''
+
+        for segment in segments:
+            yield from _split_to_length(segment, max_length)
+
+        while len(buffer) > max_length:
+            yield buffer[:max_length]
+            buffer = buffer[max_length:]
+
+    if buffer:
+        yield buffer
+
+
+def _split_to_length(segment: str, max_length: int) -> Iterator[str]:
+    for i in range(0, len(segment), max_length):
+        yield segment[i:i + max_length]
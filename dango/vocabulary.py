@@ -0,0 +1,42 @@
+from collections import Counter
+from typing import AbstractSet, Iterable, NamedTuple
+
+from .word import AnyWord, PartOfSpeech
+
+# The parts of speech that are not counted by default, as they are rarely of interest as vocabulary.
+DEFAULT_EXCLUDED_PARTS_OF_SPEECH = frozenset({PartOfSpeech.WHITESPACE, PartOfSpeech.SYMBOL, PartOfSpeech.PARTICLE})
+
+
+class VocabularyEntry(NamedTuple):
+    """A distinct word of a vocabulary, i.e. all inflections of a word count as the same entry."""
+
+    dictionary_form: str
+    dictionary_form_reading: str
+    part_of_speech: PartOfSpeech
+
+
+def count_words(
+        words: Iterable[AnyWord],
+        counts: 'Counter[VocabularyEntry]',
+        exclude: AbstractSet[PartOfSpeech] = DEFAULT_EXCLUDED_PARTS_OF_SPEECH
+) -> 'Counter[VocabularyEntry]':
+    """Adds the given words to vocabulary counts.
+
+    Args:
+        words: The words to count.
+        counts: The counts to add the words to.
+        exclude: The parts of speech of words that should not be counted.
+
+    Returns:
+        The given counts.
+
+    Raises:
+        ValueError: If the part of speech of a word wasn't computed.
+    """
+    for w in words:
+        pos = w.part_of_speech
+        if pos is None:
+            raise ValueError('the part of speech of {!r} is missing, it is needed to count words'.format(w.surface))
+        if pos not in exclude:
+            counts[VocabularyEntry(w.dictionary_form or '', w.dictionary_form_reading or '', pos)] += 1
+    return counts
@@ -1,11 +1,14 @@
 from enum import Enum, auto
-from typing import List
+from functools import lru_cache
+from typing import TYPE_CHECKING, AbstractSet, Any, Callable, List, Optional, Sequence, Tuple, Union
 
 from pygtrie import Trie
-from sudachipy.morpheme import Morpheme
 
 from .util import katakana_to_hiragana
 
+if TYPE_CHECKING:
+    from sudachipy.morpheme import Morpheme
+
 
 class PartOfSpeech(Enum):
     """The part of speech tag of a word."""
@@ -72,6 +75,27 @@ POS_MAPPING = Trie([
 ])
 
 
+def map_part_of_speech(features: Sequence[str]) -> PartOfSpeech:
+    """Returns the part of speech tag for the given morpheme features.
+
+    Args:
+        features: The part of speech features of a morpheme as returned by SudachiPy.
+    """
+    return _map_part_of_speech(tuple(features[:4]))
+
+
+@lru_cache(maxsize=None)
+def _map_part_of_speech(features: Tuple[str, ...]) -> PartOfSpeech:
+    # We use a trie to map the morpheme features to POS tags instead of
+    # a simple dict since there are feature tuples that can be mapped to
+    # more specific tags based on the longest matching prefix.
+    # The number of distinct features is bounded by the dictionary, so
+    # the cache can't grow indefinitely.
+
+    step = POS_MAPPING.longest_prefix(features)
+    return step.value if step else PartOfSpeech.UNKNOWN
+
+
 class Word:
     """A part of a phrase after tokenization.
 
@@ -80,25 +104,62 @@ class Word:
     part_of_speech property to detect what a word actually represents.
     """
 
-    def __init__(self, morphemes: List[Morpheme], dictionary_form_reading: str = None):
+    def __init__(
+            self,
+            morphemes: List['Morpheme'],
+            dictionary_form_reading: Optional[str] = None,
+            part_of_speech: Optional[PartOfSpeech] = None,
+            phrase: Optional[str] = None,
+            offset: int = 0,
+            find_dictionary_form_reading: Optional[Callable[['Morpheme'], str]] = None
+    ):
         """Constructs a new word.
 
         Args:
             morphemes: The morphemes the word will be made up of.
             dictionary_form_reading: The kana reading of the dictionary form.
+            part_of_speech: The part of speech tag of the word, if already known.
+                Otherwise it will be determined from the first morpheme.
+            phrase: The phrase the morphemes were created from. If given the surface
+                is sliced from it instead of being joined from the morphemes.
+            offset: The offset of the phrase within the whole text, which is added to
+                the offsets of the morphemes for begin and end.
+            find_dictionary_form_reading: A function returning the dictionary form reading for
+                the first morpheme, e.g. Tokenizer.find_dictionary_form_reading. If given and no
+                reading was passed it is called on first access of dictionary_form_reading.
         """
         self._morphemes = morphemes
-        self.dictionary_form_reading = dictionary_form_reading
+        self._part_of_speech = part_of_speech
+        self._phrase = phrase
+        self._offset = offset
+        self._surface: Optional[str] = None
+        self._dictionary_form_reading = dictionary_form_reading
+        self._find_dictionary_form_reading = find_dictionary_form_reading
 
     @property
-    def morphemes(self) -> List[Morpheme]:
+    def morphemes(self) -> List['Morpheme']:
         """The morphemes the word is made up of."""
         return self._morphemes
 
+    @property
+    def begin(self) -> int:
+        """The offset of the first character of the word in the tokenized text."""
+        return self._offset + self._morphemes[0].begin() if self._morphemes else self._offset
+
+    @property
+    def end(self) -> int:
+        """The offset after the last character of the word in the tokenized text."""
+        return self._offset + self._morphemes[-1].end() if self._morphemes else self._offset
+
     @property
     def surface(self) -> str:
         """The surface representation of the word."""
-        return ''.join(m.surface() for m in self._morphemes)
+        if self._surface is None:
+            if self._phrase is not None and self._morphemes:
+                self._surface = self._phrase[self._morphemes[0].begin():self._morphemes[-1].end()]
+            else:
+                self._surface = ''.join(m.surface() for m in self._morphemes)
+        return self._surface
 
     @property
     def surface_reading(self) -> str:
@@ -110,12 +171,147 @@ class Word:
         """The the dictionary form of the word."""
         return self._morphemes[0].dictionary_form() if self._morphemes else ''
 
+    @property
+    def dictionary_form_reading(self) -> Optional[str]:
+        """The kana reading of the dictionary form."""
+        if self._dictionary_form_reading is None and self._find_dictionary_form_reading is not None \
+                and self._morphemes:
+            self._dictionary_form_reading = self._find_dictionary_form_reading(self._morphemes[0])
+            self._find_dictionary_form_reading = None
+        return self._dictionary_form_reading
+
+    @dictionary_form_reading.setter
+    def dictionary_form_reading(self, reading: Optional[str]) -> None:
+        self._dictionary_form_reading = reading
+
     @property
     def part_of_speech(self) -> PartOfSpeech:
         """The part of speech tag of the word."""
+        if self._part_of_speech is None:
+            self._part_of_speech = map_part_of_speech(self._morphemes[0].part_of_speech())
+        return self._part_of_speech
+
+    def shifted(self, offset: int) -> 'Word':
+        """Returns a copy of the word whose begin and end are moved by the given offset.
+
+        Args:
+            offset: The number of characters to add to the offsets, e.g. the offset of the
+                tokenized phrase within a larger text.
+        """
+        return Word(self._morphemes, self._dictionary_form_reading, self._part_of_speech, self._phrase,
+                    self._offset + offset, self._find_dictionary_form_reading)
+
+
+class CompactWord:
+    """A word detached from the morphemes it was created from.
+
+    All attributes are computed once on creation and the word cannot be
+    modified afterwards. Since it does not hold any references to SudachiPy
+    objects it is cheap to keep in memory and can be pickled, e.g. to pass it
+    between processes.
+    """
+
+    __slots__ = (
+        'surface', 'surface_reading', 'dictionary_form', 'dictionary_form_reading', 'part_of_speech', 'begin', 'end'
+    )
+
+    # Attributes are None if they weren't computed, see CompactWord.from_word.
+    surface: Optional[str]
+    surface_reading: Optional[str]
+    dictionary_form: Optional[str]
+    dictionary_form_reading: Optional[str]
+    part_of_speech: Optional[PartOfSpeech]
+    begin: Optional[int]
+    end: Optional[int]
+
+    def __init__(
+            self,
+            surface: Optional[str],
+            surface_reading: Optional[str],
+            dictionary_form: Optional[str],
+            dictionary_form_reading: Optional[str],
+            part_of_speech: Optional[PartOfSpeech],
+            begin: Optional[int] = 0,
+            end: Optional[int] = 0
+    ):
+        """Constructs a new compact word.
+
+        Args:
+            surface: The surface representation of the word.
+            surface_reading: The kana reading of the surface representation.
+            dictionary_form: The dictionary form of the word.
+            dictionary_form_reading: The kana reading of the dictionary form.
+            part_of_speech: The part of speech tag of the word.
+            begin: The offset of the first character of the word in the tokenized text.
+            end: The offset after the last character of the word in the tokenized text.
+        """
+        object.__setattr__(self, 'surface', surface)
+        object.__setattr__(self, 'surface_reading', surface_reading)
+        object.__setattr__(self, 'dictionary_form', dictionary_form)
+        object.__setattr__(self, 'dictionary_form_reading', dictionary_form_reading)
+        object.__setattr__(self, 'part_of_speech', part_of_speech)
+        object.__setattr__(self, 'begin', begin)
+        object.__setattr__(self, 'end', end)
+
+    @classmethod
+    def from_word(cls, word: Union[Word, 'CompactWord'], fields: Optional[AbstractSet[str]] = None) -> 'CompactWord':
+        """Returns a compact copy of the given word.
+
+        Args:
+            word: The word to copy.
+            fields: The names of the attributes to copy, see WORD_FIELDS. Attributes that are
+                not copied are None, so they don't have to be computed. If None all are copied.
+        """
+        if fields is None:
+            if isinstance(word, CompactWord):
+                return word
+            return cls(word.surface, word.surface_reading, word.dictionary_form,
+                       word.dictionary_form_reading, word.part_of_speech, word.begin, word.end)
+
+        values: List[Any] = [getattr(word, name) if name in fields else None for name in cls.__slots__]
+        return cls(*values)
+
+    def shifted(self, offset: int) -> 'CompactWord':
+        """Returns a copy of the word whose begin and end are moved by the given offset.
+
+        Offsets that weren't computed stay None.
+
+        Args:
+            offset: The number of characters to add to the offsets, e.g. the offset of the
+                tokenized phrase within a larger text.
+        """
+        return CompactWord(
+            self.surface, self.surface_reading, self.dictionary_form, self.dictionary_form_reading,
+            self.part_of_speech, None if self.begin is None else self.begin + offset,
+            None if self.end is None else self.end + offset)
+
+    def _fields(self) -> Tuple[Any, ...]:
+        return tuple(getattr(self, name) for name in self.__slots__)
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        raise AttributeError('{} is immutable'.format(type(self).__name__))
+
+    def __delattr__(self, name: str) -> None:
+        raise AttributeError('{} is immutable'.format(type(self).__name__))
+
+    def __reduce__(self):
+        return type(self), self._fields()
+
+    def __eq__(self, other: Any) -> bool:
+        if not isinstance(other, CompactWord):
+            return NotImplemented
+        return self._fields() == other._fields()
+
+    def __hash__(self) -> int:
+        return hash(self._fields())
+
+    def __repr__(self) -> str:
+        return '{}({})'.format(type(self).__name__, ', '.join(
+            '{}={!r}'.format(name, value) for name, value in zip(self.__slots__, self._fields())))
+
 
-        # We use a trie to map the morpheme features to POS tags instead of
-        # a simple dict since there are feature tuples that can be mapped to
-        # more specific tags based on the longest matching prefix.
+# Either kind of word, as returned by a tokenizer depending on its configuration.
+AnyWord = Union[Word, CompactWord]
 
-        return POS_MAPPING.longest_prefix(self.morphemes[0].part_of_speech()[:4]).value or PartOfSpeech.UNKNOWN
+# The names of the attributes every kind of word provides.
+WORD_FIELDS = CompactWord.__slots__
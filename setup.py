@@ -1,9 +1,13 @@
 from setuptools import setup, find_packages
 
+version = {}
+with open("dango/version.py", "r", encoding="utf-8") as fh:
+    exec(fh.read(), version)
+
 with open("README.md", "r", encoding="utf-8") as fh:
     setup(
         name='dango',
-        version='0.0.1',
+        version=version['__version__'],
         description='An easy to use tokenizer for Japanese text, aimed at language learners and non-linguists',
         long_description=fh.read(),
         long_description_content_type="text/markdown",
@@ -22,13 +26,15 @@ with open("README.md", "r", encoding="utf-8") as fh:
             'Topic :: Text Processing :: Linguistic',
             'Natural Language :: Japanese'
         ],
-        python_requires='>=3.6',
+        python_requires='>=3.7',
         install_requires=[
             'pygtrie ~= 2.4',
             'SudachiPy ~= 0.5.2',
             'SudachiDict-core >= 20210608',
         ],
         extras_require={
+            'numpy': ['numpy'],
+            'arrow': ['pyarrow'],
             'dev': [
                 'build ~= 0.7',
                 'twine ~= 3.6',
@@ -0,0 +1,100 @@
+import asyncio
+import threading
+from typing import Any, Awaitable
+
+import pytest
+
+import dango
+from dango.aio import AsyncTokenizer
+from dango.word import CompactWord
+
+PHRASES = ['私は昨日映画を見ました', '東京に住んでいます', '', '明日雨が降りそう'] * 10
+
+
+def run(coroutine: Awaitable[Any]) -> Any:
+    loop = asyncio.new_event_loop()
+    try:
+        return loop.run_until_complete(coroutine)
+    finally:
+        loop.close()
+
+
+@pytest.mark.parametrize('executor', ['thread', 'process'])
+def test_tokenize(executor: str):
+    async def tokenize_all():
+        async with AsyncTokenizer(workers=2, executor=executor, max_batch_size=4, compact=True) as tokenizer:
+            return await asyncio.gather(*(tokenizer.tokenize(p) for p in PHRASES))
+
+    expected = [[CompactWord.from_word(w) for w in dango.tokenize(p)] for p in PHRASES]
+    assert run(tokenize_all()) == expected
+
+
+def test_backpressure():
+    async def tokenize_all():
+        # more concurrent requests than fit into the queue have to wait, but are processed eventually
+        async with AsyncTokenizer(max_batch_size=2, max_queue_size=2) as tokenizer:
+            return await asyncio.gather(*(tokenizer.tokenize(p) for p in PHRASES))
+
+    surfaces = [[w.surface for w in words] for words in run(tokenize_all())]
+    assert surfaces == [[w.surface for w in dango.tokenize(p)] for p in PHRASES]
+
+
+def test_iter_tokenize():
+    text = '私は昨日映画を見ました。東京に住んでいます！\n明日雨が降りそう'
+
+    async def tokenize_all():
+        async with AsyncTokenizer() as tokenizer:
+            return [w.surface async for w in tokenizer.iter_tokenize(text)]
+
+    assert run(tokenize_all()) == [w.surface for w in dango.iter_tokenize(text)]
+
+
+@pytest.mark.parametrize('executor', ['thread', 'process'])
+def test_iter_tokenize_offsets(executor: str):
+    text = '私は昨日映画を見ました。東京に住んでいます！\n明日雨が降りそう'
+
+    async def tokenize_all():
+        async with AsyncTokenizer(executor=executor) as tokenizer:
+            return [(w.surface, w.begin, w.end) async for w in tokenizer.iter_tokenize(text)]
+
+    offsets = run(tokenize_all())
+    assert ('明日', 23, 25) in offsets
+    assert offsets == [(w.surface, w.begin, w.end) for w in dango.iter_tokenize(text)]
+
+
+def test_process_workers_are_started_outside_of_the_event_loop(monkeypatch: pytest.MonkeyPatch):
+    threads = []
+
+    def create_tokenizer(**options: Any) -> dango.Tokenizer:
+        threads.append(threading.current_thread())
+        return dango.Tokenizer(**options)
+
+    monkeypatch.setattr('dango.aio.Tokenizer', create_tokenizer)
+
+    async def tokenize_all():
+        async with AsyncTokenizer(executor='process') as tokenizer:
+            return await asyncio.gather(*(tokenizer.tokenize(p) for p in PHRASES))
+
+    assert len(run(tokenize_all())) == len(PHRASES)
+    # the dictionary is loaded once, and not by the thread running the event loop
+    assert len(threads) == 1 and threads[0] is not threading.current_thread()
+
+
+def test_close_cancels_pending_requests():
+    async def close_while_pending():
+        tokenizer = AsyncTokenizer(max_batch_size=100, max_delay=60)
+        requests = [asyncio.ensure_future(tokenizer.tokenize(p)) for p in PHRASES]
+        # lets the batcher take the requests from the queue, where it waits for the batch to fill up
+        await asyncio.sleep(0.01)
+        await tokenizer.close()
+        return await asyncio.wait_for(asyncio.gather(*requests, return_exceptions=True), 5)
+
+    results = run(close_while_pending())
+    assert all(isinstance(r, asyncio.CancelledError) for r in results)
+
+
+def test_invalid_arguments():
+    with pytest.raises(ValueError):
+        AsyncTokenizer(workers=0)
+    with pytest.raises(ValueError):
+        AsyncTokenizer(executor='fiber')
@@ -0,0 +1,100 @@
+import pickle
+from pathlib import Path
+
+import pytest
+
+from dango import DiskPhraseCache, MemoryPhraseCache, Tokenizer
+from dango.cache import decode_words, encode_words
+from dango.word import CompactWord, PartOfSpeech
+
+WORDS = (
+    CompactWord('映画', 'えいが', '映画', 'えいが', PartOfSpeech.NOUN),
+    CompactWord('見ました', 'みました', '見る', 'みる', PartOfSpeech.VERB),
+)
+
+
+def test_memory_cache():
+    cache = MemoryPhraseCache()
+
+    assert cache.get('ns', '映画見ました') is None
+    cache.put('ns', '映画見ました', WORDS)
+    assert cache.get('ns', '映画見ました') == WORDS
+    assert cache.get('other', '映画見ました') is None, 'results are separated by namespace'
+
+    info = cache.info()
+    assert (info.hits, info.misses, info.currsize) == (1, 2, 1)
+
+
+def test_memory_cache_evicts_least_recently_used():
+    cache = MemoryPhraseCache(max_entries=2)
+
+    cache.put('ns', 'a', WORDS)
+    cache.put('ns', 'b', WORDS)
+    cache.get('ns', 'a')
+    cache.put('ns', 'c', WORDS)
+
+    assert cache.get('ns', 'a') == WORDS
+    assert cache.get('ns', 'b') is None
+    assert cache.get('ns', 'c') == WORDS
+
+
+def test_memory_cache_evicts_by_size():
+    cache = MemoryPhraseCache(max_entries=None, max_bytes=2000)
+
+    for i in range(100):
+        cache.put('ns', str(i), WORDS)
+
+    assert 0 < cache.info().currsize < 100
+    assert cache.get('ns', '99') == WORDS
+
+
+def test_encode_words():
+    assert decode_words(encode_words(WORDS)) == WORDS
+
+
+def test_encode_words_without_part_of_speech():
+    words = tuple(CompactWord.from_word(w, {'surface', 'dictionary_form'}) for w in WORDS)
+    assert decode_words(encode_words(words)) == words
+
+
+def test_disk_cache(tmp_path: Path):
+    path = str(tmp_path / 'cache.sqlite')
+
+    cache = DiskPhraseCache(path)
+    cache.put('ns', '映画見ました', WORDS)
+    cache.close()
+
+    # results persist when the cache is opened again
+    cache = DiskPhraseCache(path, memory_entries=10)
+    assert cache.get('ns', '映画見ました') == WORDS
+    assert cache.get('other', '映画見ました') is None
+    assert pickle.loads(pickle.dumps(cache)).get('ns', '映画見ました') == WORDS
+
+
+def test_disk_cache_evicts_oldest(tmp_path: Path):
+    cache = DiskPhraseCache(str(tmp_path / 'cache.sqlite'), max_entries=2)
+    cache.put('ns', 'a', WORDS)
+    cache.put('ns', 'b', WORDS)
+    cache.put('ns', 'c', WORDS)
+
+    assert cache.get('ns', 'a') is None
+    assert cache.get('ns', 'b') == WORDS
+    assert cache.get('ns', 'c') == WORDS
+    assert cache.info().maxsize == 2
+    assert cache.info().currsize == 2
+
+
+@pytest.mark.parametrize('cache_type', ['memory', 'disk'])
+def test_tokenizer_with_phrase_cache(tmp_path: Path, cache_type: str):
+    cache = MemoryPhraseCache() if cache_type == 'memory' else DiskPhraseCache(str(tmp_path / 'cache.sqlite'))
+    tokenizer = Tokenizer(phrase_cache=cache)
+    phrase = '私は昨日映画を見ました'
+    expected = [CompactWord.from_word(w) for w in Tokenizer().tokenize(phrase)]
+
+    first = tokenizer.tokenize(phrase)
+    first.clear()
+    second = tokenizer.tokenize(phrase)
+
+    assert first is not second
+    assert second == expected
+    assert cache.info().hits == 1
@@ -2,6 +2,7 @@ import io
 import sys
 from unittest.mock import patch, mock_open
 
+import pytest
 from _pytest.capture import CaptureFixture
 from _pytest.monkeypatch import MonkeyPatch
 
@@ -38,3 +39,159 @@ def test_reading_from_file(capsys: CaptureFixture, monkeypatch: MonkeyPatch):
 
     assert err == ''
     assert out == '私 は 昨日 映画 を 見ました\n東京 に 住んでいます\n明日 雨 が 降りそう\n'
+
+
+def test_line_breaks_are_preserved(capsys: CaptureFixture, monkeypatch: MonkeyPatch):
+    monkeypatch.setattr('sys.argv', ['dango'])
+    monkeypatch.setattr('sys.stdin', io.StringIO('私は昨日映画を見ました\n\n  東京に住んでいます  \n'))
+
+    dango.cli.main()
+    out, err = capsys.readouterr()
+
+    assert err == ''
+    assert out == '私 は 昨日 映画 を 見ました\n\n東京 に 住んでいます\n'
+
+
+@pytest.mark.parametrize('batch_size', ['1', '2', '256'])
+def test_multiple_jobs(capsys: CaptureFixture, monkeypatch: MonkeyPatch, batch_size: str):
+    monkeypatch.setattr('sys.argv', ['dango', '--jobs', '2', '--batch-size', batch_size])
+    monkeypatch.setattr('sys.stdin', io.StringIO('私は昨日映画を見ました\n東京に住んでいます\n明日雨が降りそう\n' * 3))
+
+    dango.cli.main()
+    out, err = capsys.readouterr()
+
+    assert err == ''
+    assert out == '私 は 昨日 映画 を 見ました\n東京 に 住んでいます\n明日 雨 が 降りそう\n' * 3
+
+
+def test_multiple_jobs_read_ahead_boundedly():
+    read = 0
+
+    class Lines(io.StringIO):
+        def __next__(self):
+            nonlocal read
+            read += 1
+            return super().__next__()
+
+    class FirstLine(io.StringIO):
+        def write(self, s):
+            # stop as soon as the first batch was written
+            raise BrokenPipeError()
+
+    with pytest.raises(BrokenPipeError):
+        dango.cli.write_surfaces_parallel(Lines('映画を見ました\n' * 10000), FirstLine(), 2, 10)
+
+    # the lines in flight are bounded by the jobs and the batch size, not the size of the input
+    assert read <= 2 * 2 * 10 + 2 * 10
+
+
+@pytest.mark.parametrize('jobs', ['0', '-1', 'two'])
+def test_invalid_jobs(capsys: CaptureFixture, monkeypatch: MonkeyPatch, jobs: str):
+    monkeypatch.setattr('sys.argv', ['dango', '--jobs', jobs])
+
+    with pytest.raises(SystemExit):
+        dango.cli.main()
+
+
+@pytest.mark.parametrize(('arguments', 'expected'), [
+    (['--mode', 'A'], '国家 公務 員 が 選挙 管理 委員 会 に 行きました\n'),
+    (['--mode', 'C'], '国家公務員 が 選挙管理委員会 に 行きました\n'),
+    (['--mode', 'A', '--jobs', '2'], '国家 公務 員 が 選挙 管理 委員 会 に 行きました\n'),
+])
+def test_split_mode(capsys: CaptureFixture, monkeypatch: MonkeyPatch, arguments, expected: str):
+    monkeypatch.setattr('sys.argv', ['dango'] + arguments)
+    monkeypatch.setattr('sys.stdin', io.StringIO('国家公務員が選挙管理委員会に行きました\n'))
+
+    dango.cli.main()
+    out, err = capsys.readouterr()
+
+    assert err == ''
+    assert out == expected
+
+
+@pytest.mark.parametrize('arguments', [['--mode', 'D'], ['--dict', 'medium']])
+def test_invalid_dictionary_arguments(monkeypatch: MonkeyPatch, arguments):
+    monkeypatch.setattr('sys.argv', ['dango'] + arguments)
+
+    with pytest.raises(SystemExit):
+        dango.cli.main()
+
+
+def test_profile(capsys: CaptureFixture, monkeypatch: MonkeyPatch):
+    monkeypatch.setattr('sys.argv', ['dango', '--profile'])
+    monkeypatch.setattr('sys.stdin', io.StringIO('私は昨日映画を見ました\n東京に住んでいます\n'))
+
+    dango.cli.main()
+    out, err = capsys.readouterr()
+
+    assert out == '私 は 昨日 映画 を 見ました\n東京 に 住んでいます\n'
+    assert 'analysis' in err and 'aggregation' in err and 'words' in err
+    assert '2 phrases' in err
+
+
+def test_profile_with_multiple_jobs(monkeypatch: MonkeyPatch):
+    monkeypatch.setattr('sys.argv', ['dango', '--profile', '--jobs', '2'])
+
+    with pytest.raises(SystemExit):
+        dango.cli.main()
+
+
+@pytest.mark.parametrize('jobs', ['1', '2'])
+def test_vocab(capsys: CaptureFixture, monkeypatch: MonkeyPatch, jobs: str):
+    monkeypatch.setattr('sys.argv', ['dango', 'vocab', '--jobs', jobs])
+    monkeypatch.setattr('sys.stdin', io.StringIO('私は昨日映画を見ました\n映画を見ない\n東京に住んでいます\n'))
+
+    dango.cli.main()
+    out, err = capsys.readouterr()
+    lines = out.splitlines()
+
+    assert err == ''
+    assert set(lines[:2]) == {'2\t映画\tえいが\tNOUN', '2\t見る\tみる\tVERB'}
+    assert '1\t住む\tすむ\tVERB' in lines
+    assert not any(line.endswith('PARTICLE') for line in lines)
+
+
+def test_vocab_top(capsys: CaptureFixture, monkeypatch: MonkeyPatch):
+    monkeypatch.setattr('sys.argv', ['dango', 'vocab', '--top', '1', '--exclude', 'NOUN,VERB'])
+    monkeypatch.setattr('sys.stdin', io.StringIO('私は昨日映画を見ました\n映画を見ない\n'))
+
+    dango.cli.main()
+    out, err = capsys.readouterr()
+
+    assert out == '2\tを\tを\tPARTICLE\n'
+
+
+def test_vocab_file_after_exclude(capsys: CaptureFixture, monkeypatch: MonkeyPatch, tmp_path):
+    path = tmp_path / 'input.txt'
+    path.write_text('私は昨日映画を見ました\n映画を見ない\n', encoding='utf-8')
+    monkeypatch.setattr('sys.argv', ['dango', 'vocab', '--top', '1', '--exclude', 'NOUN,VERB', str(path)])
+    monkeypatch.setattr('sys.stdin', io.StringIO(''))
+
+    dango.cli.main()
+    out, err = capsys.readouterr()
+
+    assert out == '2\tを\tを\tPARTICLE\n'
+
+
+def test_vocab_unknown_part_of_speech(capsys: CaptureFixture, monkeypatch: MonkeyPatch):
+    monkeypatch.setattr('sys.argv', ['dango', 'vocab', '--exclude', 'NOUN,VERBS'])
+
+    with pytest.raises(SystemExit):
+        dango.cli.main()
+    out, err = capsys.readouterr()
+
+    assert 'unknown part of speech VERBS' in err
+
+
+@pytest.mark.parametrize('jobs', ['1', '2'])
+def test_index(monkeypatch: MonkeyPatch, tmp_path, jobs: str):
+    path = tmp_path / 'out.dgc'
+    monkeypatch.setattr('sys.argv', ['dango', 'index', '--jobs', jobs, '-o', str(path)])
+    monkeypatch.setattr('sys.stdin', io.StringIO('私は昨日映画を見ました。東京に住んでいます。\n明日雨が降りそう\n'))
+
+    dango.cli.main()
+
+    with dango.Corpus(path) as corpus:
+        assert [''.join(w.surface or '' for w in words) for words in corpus] == \
+            ['私は昨日映画を見ました。', '東京に住んでいます。\n', '明日雨が降りそう\n']
+        assert corpus[0][-2].dictionary_form_reading == 'みる'
@@ -0,0 +1,79 @@
+import pytest
+
+import dango
+from dango.columns import PARTS_OF_SPEECH, TokenColumns
+from dango.word import CompactWord, PartOfSpeech
+
+PHRASES = ['私は昨日映画を見ました', '', '映画を見ました']
+
+
+def test_tokenize_columns():
+    columns = dango.tokenize_columns(PHRASES)
+    words = [CompactWord.from_word(w) for p in PHRASES for w in dango.tokenize(p)]
+
+    assert len(columns) == len(words)
+    assert columns.sentences == len(PHRASES)
+    assert [columns.word(i) for i in range(len(columns))] == words
+    assert list(columns.sentence) == [0] * 6 + [2] * 3
+    assert list(columns.begin) == [0, 1, 2, 4, 6, 7, 0, 2, 3]
+    assert list(columns.end) == [1, 2, 4, 6, 7, 11, 2, 3, 7]
+    assert [PARTS_OF_SPEECH[c] for c in columns.part_of_speech] == [w.part_of_speech for w in words]
+
+
+def test_strings_are_interned():
+    columns = dango.tokenize_columns(PHRASES)
+
+    # the words of the second non-empty phrase all occurred in the first one already
+    assert list(columns.surface[6:]) == list(columns.surface[3:6])
+    assert columns.strings[columns.dictionary_form[5]] == '見る'
+
+
+def test_tokenize_columns_with_workers():
+    assert dango.tokenize_columns(PHRASES, workers=2).columns() == dango.tokenize_columns(PHRASES).columns()
+
+
+def test_to_numpy():
+    np = pytest.importorskip('numpy')
+
+    columns = dango.tokenize_columns(PHRASES)
+    arrays = columns.to_numpy()
+
+    assert arrays['surface'].tolist() == list(columns.surface)
+    assert np.bincount(arrays['part_of_speech'])[PARTS_OF_SPEECH.index(PartOfSpeech.VERB)] == 2
+
+
+def test_to_arrow():
+    pytest.importorskip('pyarrow')
+
+    table = dango.tokenize_columns(PHRASES).to_arrow()
+
+    assert table.num_rows == 9
+    assert table.column('surface').to_pylist()[:6] == ['私', 'は', '昨日', '映画', 'を', '見ました']
+    assert table.column('part_of_speech').to_pylist()[5] == 'VERB'
+
+
+def test_empty_columns():
+    columns = TokenColumns()
+    assert len(columns) == 0
+    assert columns.sentences == 0
+
+
+def test_columns_with_filtered_words():
+    tokenizer = dango.Tokenizer(exclude_pos={PartOfSpeech.PARTICLE})
+    columns = tokenizer.tokenize_columns(['私は映画を見ました'])
+
+    assert list(columns.begin) == [0, 2, 5]
+    assert list(columns.end) == [1, 4, 9]
+
+
+def test_columns_with_fields():
+    tokenizer = dango.Tokenizer(compact=True, fields={'surface'})
+    columns = tokenizer.tokenize_columns(['私は映画を見ました'], workers=2)
+
+    assert [columns.strings[i] for i in columns.surface] == ['私', 'は', '映画', 'を', '見ました']
+    assert PARTS_OF_SPEECH[columns.part_of_speech[-1]] == PartOfSpeech.VERB
+
+
+def test_columns_without_part_of_speech():
+    with pytest.raises(ValueError, match='part of speech'):
+        TokenColumns().append([CompactWord('映画', None, None, None, None)])
@@ -0,0 +1,113 @@
+import pytest
+
+import dango
+from dango.corpus import Corpus, CorpusWriter, write_corpus
+from dango.word import CompactWord, PartOfSpeech
+
+PHRASES = ['私は昨日映画を見ました', '', '映画を見ました', '東京に住んでいます']
+
+
+@pytest.fixture
+def corpus_path(tmp_path):
+    path = tmp_path / 'corpus.dgc'
+    # a small buffer so that the words are written to disk in several parts
+    write_corpus(path, dango.tokenize_many(PHRASES), buffer_words=4)
+    return path
+
+
+def test_read_corpus(corpus_path):
+    with Corpus(corpus_path) as corpus:
+        expected = [[CompactWord.from_word(w) for w in dango.tokenize(p)] for p in PHRASES]
+
+        assert len(corpus) == corpus.sentences == 4
+        assert corpus.words == sum(map(len, expected))
+        assert list(corpus) == expected
+        assert list(corpus.sentence_offsets) == [0, 6, 6, 9, 12]
+
+
+def test_random_access(corpus_path):
+    with Corpus(corpus_path) as corpus:
+        assert [w.surface for w in corpus[2]] == ['映画', 'を', '見ました']
+        assert [w.surface for w in corpus[-1]] == ['東京', 'に', '住んでいます']
+        assert corpus[1] == []
+        assert corpus.word(5).dictionary_form == '見る'
+
+        with pytest.raises(IndexError):
+            corpus[4]
+
+
+def test_columns(corpus_path):
+    with Corpus(corpus_path) as corpus:
+        columns = corpus.columns()
+        assert list(columns['begin'][:6]) == [0, 1, 2, 4, 6, 7]
+        assert corpus.string(columns['dictionary_form'][-1]) == '住む'
+        assert corpus.strings.index('映画') == columns['surface'][3]
+        del columns
+
+
+def test_to_numpy(corpus_path):
+    np = pytest.importorskip('numpy')
+
+    with Corpus(corpus_path) as corpus:
+        arrays = corpus.to_numpy()
+        pos = np.bincount(arrays['part_of_speech'])[dango.columns.PARTS_OF_SPEECH.index(PartOfSpeech.VERB)]
+
+        assert pos == 3
+        assert not arrays['surface'].flags.writeable
+        del arrays
+
+
+def test_close_while_arrays_are_in_use(corpus_path):
+    pytest.importorskip('numpy')
+
+    corpus = Corpus(corpus_path)
+    part_of_speech = corpus.to_numpy()['part_of_speech']
+
+    with pytest.raises(BufferError):
+        corpus.close()
+    # the corpus is still usable and can be closed once the array is gone
+    assert [w.surface for w in corpus[2]] == ['映画', 'を', '見ました']
+    assert part_of_speech[0] == dango.columns.PARTS_OF_SPEECH.index(PartOfSpeech.PRONOUN)
+
+    del part_of_speech
+    corpus.close()
+    corpus.close()
+
+
+def test_corpus_writer(tmp_path):
+    path = tmp_path / 'corpus.dgc'
+
+    with CorpusWriter(path) as writer:
+        writer.append(dango.tokenize('映画を見ました'))
+        assert (writer.sentences, writer.words) == (1, 3)
+        assert not path.exists(), 'the file is only written when the writer is closed'
+
+    with Corpus(path) as corpus:
+        assert [w.surface for w in corpus[0]] == ['映画', 'を', '見ました']
+
+
+def test_failed_writer_leaves_no_file(tmp_path):
+    with pytest.raises(RuntimeError):
+        with CorpusWriter(tmp_path / 'corpus.dgc') as writer:
+            writer.append(dango.tokenize('映画を見ました'))
+            raise RuntimeError()
+
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_empty_corpus(tmp_path):
+    write_corpus(tmp_path / 'corpus.dgc', [])
+
+    with Corpus(tmp_path / 'corpus.dgc') as corpus:
+        assert len(corpus) == corpus.words == 0
+        assert list(corpus) == []
+
+
+def test_invalid_file(tmp_path, corpus_path):
+    (tmp_path / 'text.dgc').write_text('私は昨日映画を見ました', encoding='utf-8')
+    with pytest.raises(ValueError, match='not a dango corpus'):
+        Corpus(tmp_path / 'text.dgc')
+
+    (tmp_path / 'truncated.dgc').write_bytes(corpus_path.read_bytes()[:-1])
+    with pytest.raises(ValueError, match='truncated'):
+        Corpus(tmp_path / 'truncated.dgc')
@@ -0,0 +1,98 @@
+import random
+
+import pytest
+
+from dango import Document, Tokenizer, TokenizerMetrics
+
+TEXT = '私は昨日映画を見ました。東京に住んでいます。\n本を読んだ'
+
+
+def describe_word(w):
+    return w.surface, w.part_of_speech, w.begin, w.end
+
+
+def describe(document: Document):
+    return [describe_word(w) for w in document.words]
+
+
+def test_document():
+    document = Document(TEXT)
+
+    assert document.text == TEXT
+    assert document.segments == ['私は昨日映画を見ました。', '東京に住んでいます。\n', '本を読んだ']
+    assert [w.surface for w in document.segment_words(1)] == ['東京', 'に', '住んでいます', '。', '\n']
+    assert document.segment_offset(2) == 23
+    assert document.word_at(9).surface == '見ました'
+    assert document.word_at(len(TEXT)) is None
+    # offsets of words are relative to the whole text, except for those of a segment
+    assert (document.word_at(24).begin, document.words[-1].begin) == (24, 25)
+    assert document.segment_words(2)[-1].begin == 2
+
+
+def test_edit_tokenizes_only_affected_segments():
+    metrics = TokenizerMetrics()
+    document = Document(TEXT, Tokenizer(metrics=metrics))
+    metrics.reset()
+
+    assert document.edit(15, 6, '住んでいない') == range(1, 2)
+    assert metrics.snapshot()['phrases'] == 1
+    assert [w.surface for w in document.segment_words(1)] == ['東京', 'に', '住んでいない', '。', '\n']
+    assert document.text == '私は昨日映画を見ました。東京に住んでいない。\n本を読んだ'
+
+
+def test_edit_splits_and_joins_segments():
+    document = Document(TEXT)
+
+    # a new sentence boundary splits the segment
+    assert document.edit(2, 0, 'です。') == range(0, 2)
+    assert document.segments[:2] == ['私はです。', '昨日映画を見ました。']
+
+    # removing a boundary joins the segments
+    assert document.edit(4, 1, '') == range(0, 1)
+    assert document.segments[0] == '私はです昨日映画を見ました。'
+
+
+def test_random_edits():
+    rng = random.Random(0)
+    pieces = ['私は', '昨日', '映画を見ました', '。', '」', '\n', '東京に住んでいます', '！', '「']
+    document = Document(TEXT)
+
+    for _ in range(100):
+        text = document.text
+        offset = rng.randint(0, len(text))
+        deleted = rng.randint(0, min(5, len(text) - offset))
+        inserted = ''.join(rng.choice(pieces) for _ in range(rng.randint(0, 2)))
+
+        document.edit(offset, deleted, inserted)
+
+        assert document.text == text[:offset] + inserted + text[offset + deleted:]
+        # the result is the same as tokenizing the edited text from scratch
+        expected = Document(document.text)
+        assert document.segments == expected.segments
+        assert describe(document) == describe(expected)
+        assert [document.segment_offset(i) for i in range(len(expected.segments))] == \
+            [expected.segment_offset(i) for i in range(len(expected.segments))]
+        assert document.word_at(len(document.text)) is None
+        if document.text:
+            position = rng.randrange(len(document.text))
+            assert describe_word(document.word_at(position)) == describe_word(expected.word_at(position))
+
+
+def test_edit_empty_document():
+    document = Document()
+    assert document.words == []
+
+    assert document.edit(0, 0, '映画を見ました') == range(0, 1)
+    assert [w.surface for w in document.words] == ['映画', 'を', '見ました']
+
+    assert document.edit(0, 7, '') == range(0, 0)
+    assert document.segments == []
+
+
+def test_invalid_edit():
+    document = Document(TEXT)
+
+    with pytest.raises(ValueError):
+        document.edit(len(TEXT), 1, '')
+    with pytest.raises(ValueError):
+        document.edit(-1, 0, 'a')
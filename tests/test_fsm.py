@@ -0,0 +1,67 @@
+from typing import List
+from unittest.mock import Mock
+
+import pytest
+
+from dango.fsm import State, StateMachine
+
+
+class RecordingState(State):
+    def __init__(self, name: str):
+        self.name = name
+
+    def on_input(self, context: List[str], morpheme: Mock) -> None:
+        context.append(self.name)
+
+
+START = RecordingState('START')
+VERB = RecordingState('VERB')
+INFLECTION = RecordingState('INFLECTION')
+OTHER = RecordingState('OTHER')
+
+PART_OF_SPEECH_TABLE = [
+    ('名詞', '*', '*', '*', '*', '*'),
+    ('動詞', '一般', '*', '*', '*', '*'),
+    ('助動詞', '*', '*', '*', '*', '*'),
+]
+
+FSM = StateMachine(
+    [START, VERB, INFLECTION, OTHER],
+    START,
+    OTHER,
+    [
+        (None, ('動詞', '一般', '*', '*'), VERB),
+        (VERB, ('助動詞', '*', '*', '*'), INFLECTION),
+        (INFLECTION, ('助動詞', '*', '*', '*'), INFLECTION),
+    ])
+
+
+def morpheme(pos_id: int) -> Mock:
+    return Mock(**{
+        'part_of_speech_id.return_value': pos_id,
+        'part_of_speech.return_value': list(PART_OF_SPEECH_TABLE[pos_id % len(PART_OF_SPEECH_TABLE)])
+    })
+
+
+@pytest.mark.parametrize(('pos_ids', 'expected'), [
+    ([], []),
+    ([0, 1, 2, 2, 0], ['OTHER', 'VERB', 'INFLECTION', 'INFLECTION', 'OTHER']),
+    ([2, 1, 0, 2], ['OTHER', 'VERB', 'OTHER', 'OTHER']),
+])
+def test_run(pos_ids: List[int], expected: List[str]):
+    assert FSM.run([], [morpheme(i) for i in pos_ids]) == expected
+
+
+@pytest.mark.parametrize('pos_ids', [
+    [],
+    [0, 1, 2, 2, 0],
+    [2, 1, 0, 2],
+    # part of speech IDs unknown at compile time are matched by their features
+    [4, 5, 5, 3],
+])
+def test_compiled_run_is_equivalent(pos_ids: List[int]):
+    compiled = FSM.compile(PART_OF_SPEECH_TABLE)
+    morphemes = [morpheme(i) for i in pos_ids]
+
+    assert compiled.run([], morphemes) == FSM.run([], morphemes)
+    assert [list(c) for c in compiled.iter_run([], morphemes)] == [list(c) for c in FSM.iter_run([], morphemes)]
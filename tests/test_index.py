@@ -0,0 +1,83 @@
+import pytest
+
+import dango
+from dango.index import ConcordanceLine, Posting, WordIndex
+from dango.word import PartOfSpeech
+
+SENTENCES = ['私は昨日映画を見ました。', '映画を見ていない。', '東京に住んでいます。', '本を読んだ。']
+
+
+@pytest.fixture
+def index(tmp_path):
+    with WordIndex(str(tmp_path / 'index.sqlite')) as index:
+        index.add(SENTENCES, batch_size=3)
+        yield index
+
+
+def test_lookup(index: WordIndex):
+    assert len(index) == 4
+    # inflected forms are found by their dictionary form
+    assert index.lookup('見る') == [Posting(0, 7, 11, PartOfSpeech.VERB), Posting(1, 3, 8, PartOfSpeech.VERB)]
+    assert index.lookup('見る', limit=1) == [Posting(0, 7, 11, PartOfSpeech.VERB)]
+    assert index.lookup('見る', PartOfSpeech.NOUN) == []
+    assert index.lookup('犬') == []
+    assert index.sentence(2) == '東京に住んでいます。'
+
+
+def test_concordance(index: WordIndex):
+    assert index.concordance('見る', width=3) == [
+        ConcordanceLine(0, '映画を', '見ました', '。'),
+        ConcordanceLine(1, '映画を', '見ていない', '。'),
+    ]
+
+
+def test_frequency(index: WordIndex):
+    assert index.frequency('映画') == 2
+    assert index.frequency('映画', PartOfSpeech.NOUN) == 2
+    assert index.frequency('犬') == 0
+    assert index.most_common(2) == [('。', PartOfSpeech.SYMBOL, 4), ('を', PartOfSpeech.PARTICLE, 3)]
+    assert index.most_common(2, PartOfSpeech.VERB) == [('見る', PartOfSpeech.VERB, 2), ('住む', PartOfSpeech.VERB, 1)]
+
+
+def test_add_incrementally(tmp_path):
+    path = str(tmp_path / 'index.sqlite')
+
+    with WordIndex(path) as index:
+        assert index.add(SENTENCES[:2]) == 2
+
+    # the index is reopened and extended in parallel
+    with WordIndex(path) as index:
+        assert index.add(SENTENCES[2:] + ['犬を見た。'], workers=2, chunksize=1) == 3
+        assert len(index) == 5
+        assert [p.sentence_id for p in index.lookup('見る')] == [0, 1, 4]
+        assert index.frequency('を') == 4
+
+
+def test_add_reads_ahead_boundedly(tmp_path):
+    with WordIndex(str(tmp_path / 'index.sqlite')) as index:
+        def sentences():
+            for i in range(200):
+                # at most two chunks per worker are read ahead of the batch being tokenized
+                assert i - len(index) <= 10 + 2 * 2 * 5 + 5
+                yield '映画を見ました。'
+
+        assert index.add(sentences(), workers=2, chunksize=5, batch_size=10) == 200
+
+
+def test_custom_tokenizer(tmp_path):
+    tokenizer = dango.Tokenizer(split_mode='A')
+
+    with WordIndex(str(tmp_path / 'index.sqlite'), tokenizer, exclude={PartOfSpeech.SYMBOL}) as index:
+        index.add(['東京都に住んでいる。'])
+        assert index.frequency('東京') == 1
+        assert index.frequency('。') == 0
+
+
+def test_tokenizer_without_index_fields(tmp_path):
+    with pytest.raises(ValueError, match='dictionary_form'):
+        WordIndex(str(tmp_path / 'index.sqlite'), dango.Tokenizer(fields={'surface'}))
+
+
+def test_sentence_not_found(index: WordIndex):
+    with pytest.raises(KeyError):
+        index.sentence(10)
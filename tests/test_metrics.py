@@ -0,0 +1,112 @@
+import io
+import pickle
+
+import pytest
+
+from dango import MemoryPhraseCache, Tokenizer, TokenizerMetrics
+from dango.metrics import STAGES
+
+
+def test_record_phrase():
+    metrics = TokenizerMetrics(buckets=(0.001, 0.01))
+    metrics.record_phrase(10, 6, 4, (0.0005, 0.005, 0.5), reading_cache_hits=3, reading_cache_misses=1)
+    metrics.record_phrase(5, 3, 2, (0.001, 0.001, 0.001))
+
+    snapshot = metrics.snapshot()
+
+    assert (snapshot['phrases'], snapshot['characters'], snapshot['morphemes'], snapshot['words']) == (2, 15, 9, 6)
+    assert (snapshot['reading_cache_hits'], snapshot['reading_cache_misses']) == (3, 1)
+    assert snapshot['stages']['analysis']['buckets'] == {0.001: 2, 0.01: 2, float('inf'): 2}
+    assert snapshot['stages']['aggregation']['buckets'] == {0.001: 1, 0.01: 2, float('inf'): 2}
+    assert snapshot['stages']['words']['buckets'] == {0.001: 1, 0.01: 1, float('inf'): 2}
+    assert snapshot['stages']['words']['seconds'] == 0.501
+    assert snapshot['stages']['words']['count'] == 2
+
+    metrics.reset()
+    assert metrics.snapshot()['phrases'] == 0
+
+
+def test_to_prometheus():
+    metrics = TokenizerMetrics(buckets=(0.001,))
+    metrics.record_phrase(10, 6, 4, (0.0005, 0.005, 0.5))
+    metrics.record_phrase_cache(hit=True)
+
+    lines = metrics.to_prometheus().splitlines()
+
+    assert '# TYPE dango_phrases_total counter' in lines
+    assert 'dango_phrases_total 1' in lines
+    assert 'dango_phrase_cache_hits_total 1' in lines
+    assert '# TYPE dango_stage_duration_seconds histogram' in lines
+    assert 'dango_stage_duration_seconds_bucket{stage="analysis",le="0.001"} 1' in lines
+    assert 'dango_stage_duration_seconds_bucket{stage="aggregation",le="0.001"} 0' in lines
+    assert 'dango_stage_duration_seconds_bucket{stage="aggregation",le="+Inf"} 1' in lines
+    assert 'dango_stage_duration_seconds_count{stage="words"} 1' in lines
+
+
+def test_tokenizer_records_metrics():
+    metrics = TokenizerMetrics()
+    tokenizer = Tokenizer(metrics=metrics)
+
+    words = tokenizer.tokenize('私は昨日映画を見ました')
+    snapshot = metrics.snapshot()
+
+    assert [w.surface for w in words] == ['私', 'は', '昨日', '映画', 'を', '見ました']
+    assert (snapshot['phrases'], snapshot['characters'], snapshot['morphemes'], snapshot['words']) == (1, 11, 8, 6)
+    # only 見ました is not in its dictionary form, so its reading has to be looked up
+    assert (snapshot['reading_cache_hits'], snapshot['reading_cache_misses']) == (0, 1)
+    assert all(snapshot['stages'][stage]['count'] == 1 for stage in STAGES)
+    assert snapshot['stages']['analysis']['seconds'] > 0
+
+    tokenizer.tokenize('私は昨日映画を見ました')
+    assert metrics.snapshot()['reading_cache_hits'] == 1
+
+
+def test_iter_tokenize_records_metrics():
+    metrics = TokenizerMetrics()
+    text = '私は映画を見ました。\n東京に住んでいます！\n'
+
+    words = list(Tokenizer(metrics=metrics).iter_tokenize(io.StringIO(text)))
+
+    assert ''.join(w.surface for w in words) == text
+    assert all(text[w.begin:w.end] == w.surface for w in words)
+    assert metrics.snapshot()['phrases'] == 2
+    assert metrics.snapshot()['words'] == len(words)
+
+
+def test_phrase_cache_metrics():
+    metrics = TokenizerMetrics()
+    tokenizer = Tokenizer(metrics=metrics, phrase_cache=MemoryPhraseCache())
+
+    for _ in range(3):
+        tokenizer.tokenize('私は昨日映画を見ました')
+
+    snapshot = metrics.snapshot()
+    assert (snapshot['phrase_cache_hits'], snapshot['phrase_cache_misses'], snapshot['phrases']) == (2, 1, 1)
+
+
+def test_metrics_are_not_shared_between_processes():
+    metrics = TokenizerMetrics()
+    metrics.record_phrase(10, 6, 4, (0.0005, 0.005, 0.5))
+
+    assert pickle.loads(pickle.dumps(metrics)).snapshot()['phrases'] == 0
+
+
+def test_merge():
+    metrics = TokenizerMetrics(buckets=(0.001, 0.01))
+    metrics.record_phrase(10, 6, 4, (0.0005, 0.005, 0.5))
+    other = TokenizerMetrics(buckets=(0.001, 0.01))
+    other.record_phrase(5, 3, 2, (0.001, 0.001, 0.001), reading_cache_misses=2)
+    other.record_phrase_cache(hit=False)
+
+    metrics.merge(other.snapshot())
+    snapshot = metrics.snapshot()
+
+    assert (snapshot['phrases'], snapshot['characters'], snapshot['reading_cache_misses']) == (2, 15, 2)
+    assert snapshot['phrase_cache_misses'] == 1
+    assert snapshot['stages']['words']['buckets'] == {0.001: 1, 0.01: 1, float('inf'): 2}
+    assert snapshot['stages']['words']['seconds'] == 0.501
+
+
+def test_merge_different_buckets():
+    with pytest.raises(ValueError):
+        TokenizerMetrics(buckets=(0.001,)).merge(TokenizerMetrics().snapshot())
@@ -0,0 +1,55 @@
+from concurrent.futures import ThreadPoolExecutor
+from threading import Thread
+from typing import List
+
+import dango
+from dango import Tokenizer, TokenizerPool
+
+PHRASES = ['私は昨日映画を見ました', '東京に住んでいます', 'この店はまだ開いていない', '明日雨が降りそう'] * 25
+
+
+def test_get_returns_one_tokenizer_per_thread():
+    pool = TokenizerPool()
+    tokenizers: List[Tokenizer] = []
+
+    def get_twice():
+        tokenizer = pool.get()
+        assert pool.get() is tokenizer
+        tokenizers.append(tokenizer)
+
+    threads = [Thread(target=get_twice) for _ in range(2)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert len(tokenizers) == 2
+    assert tokenizers[0] is not tokenizers[1]
+
+
+def test_checkout_reuses_tokenizers():
+    pool = TokenizerPool()
+
+    with pool.checkout() as first:
+        with pool.checkout() as second:
+            assert first is not second
+
+    with pool.checkout() as third:
+        assert third is first or third is second
+
+
+def test_concurrent_tokenize():
+    pool = TokenizerPool(compact=True)
+    expected = [pool.create().tokenize(p) for p in PHRASES]
+
+    with ThreadPoolExecutor(4) as executor:
+        assert list(executor.map(pool.tokenize, PHRASES)) == expected
+
+
+def test_module_level_tokenize_uses_thread_local_tokenizers():
+    with ThreadPoolExecutor(2) as executor:
+        tokenizers = set(executor.map(lambda _: dango.get_default_tokenizer(), range(2)))
+        surfaces = list(executor.map(lambda p: [w.surface for w in dango.tokenize(p)], PHRASES))
+
+    assert dango.get_default_tokenizer() not in tokenizers
+    assert surfaces == [[w.surface for w in dango.tokenize(p)] for p in PHRASES]
@@ -0,0 +1,95 @@
+import json
+import pickle
+from typing import Any, Dict
+
+import pytest
+
+from dango import Tokenizer
+from dango.rules import WORD_AGGREGATION_FSM, dump_rules, load_rules, parse_rules, rules_fingerprint
+
+SURU_RULES: Dict[str, Any] = {
+    'states': [
+        {'name': 'OTHER', 'start_new_word': True},
+        {'name': 'NOUN', 'start_new_word': True},
+        {'name': 'SURU'},
+    ],
+    'initial_state': 'OTHER',
+    'default_state': 'OTHER',
+    'transitions': [
+        {'features': ['名詞', '普通名詞', 'サ変可能', '*'], 'to': 'NOUN'},
+        {'from': 'NOUN', 'features': ['動詞', '非自立可能', '*', '*'], 'to': 'SURU'},
+        {'from': 'SURU', 'features': ['助動詞', '*', '*', '*'], 'to': 'SURU'},
+    ],
+}
+
+
+def test_dump_and_parse_default_rules():
+    rules = parse_rules(json.loads(json.dumps(dump_rules(WORD_AGGREGATION_FSM))))
+
+    assert dump_rules(rules) == dump_rules(WORD_AGGREGATION_FSM)
+    assert rules_fingerprint(rules) == rules_fingerprint(WORD_AGGREGATION_FSM)
+
+
+def test_fingerprint_depends_on_rules():
+    assert rules_fingerprint(parse_rules(SURU_RULES)) == rules_fingerprint(parse_rules(SURU_RULES))
+    assert rules_fingerprint(parse_rules(SURU_RULES)) != rules_fingerprint(WORD_AGGREGATION_FSM)
+
+
+@pytest.mark.parametrize(('change', 'message'), [
+    ({'states': []}, 'at least one state'),
+    ({'states': [{'name': 'OTHER', 'start_new_word': True}] * 2}, 'more than once'),
+    ({'states': [{'name': 'OTHER', 'start_new_word': 'yes'}]}, 'must be a boolean'),
+    ({'initial_state': 'VERB'}, 'unknown state'),
+    ({'default_state': 'SURU'}, 'must start a new word'),
+    ({'transitions': [{'features': ['名詞', '*', '*'], 'to': 'NOUN'}]}, 'list of 4 strings'),
+    ({'transitions': [{'features': ['名詞', '*', '*', '*'], 'to': 'VERB'}]}, 'unknown state'),
+    ({'transitions': [{'features': ['名詞', '*', '*', '*'], 'to': 'SURU'}]}, 'must start a new word'),
+    ({'transitions': [{'features': ['名詞', '*', '*', '*'], 'to': 'NOUN', 'if': 'x'}]}, 'unknown keys'),
+    ({'transitions': [
+        {'features': ['名詞', '*', '*', '*'], 'to': 'NOUN'},
+        {'features': ['名詞', '*', '*', '*'], 'to': 'OTHER'},
+    ]}, 'conflicts'),
+    ({'priority': 1}, 'unknown keys'),
+])
+def test_invalid_rules(change: Dict[str, Any], message: str):
+    with pytest.raises(ValueError, match=message):
+        parse_rules(dict(SURU_RULES, **change))
+
+
+def test_load_rules(tmp_path):
+    path = tmp_path / 'suru.json'
+    path.write_text(json.dumps(SURU_RULES, ensure_ascii=False), encoding='utf-8')
+
+    assert dump_rules(load_rules(path)) == dump_rules(parse_rules(SURU_RULES))
+    assert dump_rules(load_rules(str(path))) == dump_rules(parse_rules(SURU_RULES))
+
+
+def test_load_rules_unsupported_format(tmp_path):
+    path = tmp_path / 'rules.ini'
+    path.write_text('', encoding='utf-8')
+
+    with pytest.raises(ValueError, match='unsupported'):
+        load_rules(path)
+
+
+def test_tokenizer_with_rules(tmp_path):
+    path = tmp_path / 'suru.json'
+    path.write_text(json.dumps(SURU_RULES, ensure_ascii=False), encoding='utf-8')
+
+    tokenizer = Tokenizer(rules=str(path))
+    assert [w.surface for w in tokenizer.tokenize('毎日勉強しました')] == ['毎日', '勉強しました']
+    assert [w.surface for w in Tokenizer().tokenize('毎日勉強しました')] == ['毎日', '勉強', 'しました']
+
+    # the rules are loaded again in other processes
+    copy = pickle.loads(pickle.dumps(tokenizer))
+    assert [w.surface for w in copy.tokenize('毎日勉強しました')] == ['毎日', '勉強しました']
+
+
+def test_rules_are_compiled_once():
+    tokenizer = Tokenizer()
+    other = Tokenizer(dictionary=tokenizer.dictionary)
+
+    assert tokenizer._aggregation_fsm is other._aggregation_fsm
+    assert tokenizer._cache_namespace == other._cache_namespace
+    assert Tokenizer(dictionary=tokenizer.dictionary, rules=parse_rules(SURU_RULES))._cache_namespace != \
+        tokenizer._cache_namespace
@@ -0,0 +1,138 @@
+import json
+import socket
+import sys
+import threading
+import urllib.error
+import urllib.request
+from typing import Any, Iterator, Tuple
+
+import pytest
+
+from dango import Tokenizer, TokenizerMetrics
+from dango.server import TokenizationService, create_server, encode_words_json
+
+
+@pytest.fixture(params=[1, 2], ids=['in-process', 'workers'])
+def service(request) -> Iterator[TokenizationService]:
+    service = TokenizationService(Tokenizer(compact=True, metrics=TokenizerMetrics()), workers=request.param)
+    yield service
+    service.close()
+
+
+@pytest.fixture
+def url(service: TokenizationService) -> Iterator[str]:
+    server = create_server(service, port=0)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield 'http://{}:{}'.format(*server.server_address)
+    server.shutdown()
+    server.server_close()
+
+
+def request(url: str, body: Any = None) -> Tuple[int, str]:
+    data = None if body is None else (body if isinstance(body, bytes) else json.dumps(body).encode('utf-8'))
+    try:
+        with urllib.request.urlopen(url, data) as response:
+            return response.status, response.read().decode('utf-8')
+    except urllib.error.HTTPError as e:
+        return e.code, e.read().decode('utf-8')
+
+
+def test_encode_words_json():
+    words = Tokenizer(fields={'surface', 'part_of_speech'}).tokenize('見ました')
+
+    assert json.loads(encode_words_json(words)) == [{
+        'surface': '見ました', 'surface_reading': 'みました', 'dictionary_form': '見る',
+        'dictionary_form_reading': 'みる', 'part_of_speech': 'VERB', 'begin': 0, 'end': 4
+    }]
+
+
+def test_service_batches_phrases(service: TokenizationService):
+    results = service.tokenize(['映画を見ました', '東京に住んでいます'] * 50)
+
+    assert [w['surface'] for w in json.loads(results[0])] == ['映画', 'を', '見ました']
+    assert [w['dictionary_form'] for w in json.loads(results[-1])] == ['東京', 'に', '住む']
+    assert service.metrics is not None
+    assert service.metrics.snapshot()['phrases'] == 100
+    assert 'dango_server_batched_phrases_total 100' in service.to_prometheus()
+
+
+def test_tokenize(url: str):
+    status, body = request(url + '/tokenize', {'text': '映画を見ました'})
+
+    assert status == 200
+    assert [w['surface'] for w in json.loads(body)['words']] == ['映画', 'を', '見ました']
+
+    status, body = request(url + '/tokenize', {'texts': ['見ました', '東京に住んでいます']})
+
+    assert status == 200
+    assert [[w['dictionary_form'] for w in words] for words in json.loads(body)['results']] == \
+        [['見る'], ['東京', 'に', '住む']]
+
+
+@pytest.mark.parametrize('body', [b'{', {'text': 1}, {'texts': ['a', 2]}, ['映画']],
+                         ids=['invalid json', 'text', 'texts', 'array'])
+def test_invalid_request(url: str, body: Any):
+    status, response = request(url + '/tokenize', body)
+
+    assert status == 400
+    assert 'error' in json.loads(response)
+
+
+def test_health_and_metrics(url: str, service: TokenizationService):
+    request(url + '/tokenize', {'text': '映画を見ました'})
+    request(url + '/tokenize', {'texts': 1})
+
+    assert request(url + '/health') == (200, json.dumps({'status': 'ok', 'workers': service.workers}))
+
+    status, metrics = request(url + '/metrics')
+    assert status == 200
+    assert 'dango_phrases_total 1\n' in metrics
+    assert 'dango_server_requests_total 2\n' in metrics
+    assert 'dango_server_request_errors_total 1\n' in metrics
+
+    assert request(url + '/unknown')[0] == 404
+
+
+@pytest.mark.skipif(sys.platform == 'win32', reason='Unix sockets are not available on Windows')
+def test_unix_socket(tmp_path):
+    path = str(tmp_path / 'dango.sock')
+    service = TokenizationService(Tokenizer(compact=True))
+    server = create_server(service, unix_socket=path)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+
+    try:
+        body = json.dumps({'text': '見ました'}).encode('utf-8')
+        with socket.socket(socket.AF_UNIX) as client:
+            client.connect(path)
+            client.sendall(b'POST /tokenize HTTP/1.1\r\nContent-Length: ' + str(len(body)).encode('ascii') +
+                           b'\r\nConnection: close\r\n\r\n' + body)
+            response = b''.join(iter(lambda: client.recv(4096), b'')).decode('utf-8')
+    finally:
+        server.shutdown()
+        server.server_close()
+        service.close()
+
+    assert response.startswith('HTTP/1.1 200')
+    assert json.loads(response.split('\r\n\r\n', 1)[1])['words'][0]['dictionary_form'] == '見る'
+
+
+@pytest.mark.skipif(sys.platform == 'win32', reason='Unix sockets are not available on Windows')
+def test_unix_socket_replaces_only_sockets(tmp_path):
+    path = tmp_path / 'dango.sock'
+    service = TokenizationService(Tokenizer(compact=True))
+
+    try:
+        # a socket left over by a previous server is replaced
+        with socket.socket(socket.AF_UNIX) as stale:
+            stale.bind(str(path))
+        create_server(service, unix_socket=str(path)).server_close()
+        assert not path.exists()
+
+        # any other file is kept
+        path.write_text('data', encoding='utf-8')
+        with pytest.raises(FileExistsError, match='not a socket'):
+            create_server(service, unix_socket=str(path))
+        assert path.read_text(encoding='utf-8') == 'data'
+    finally:
+        service.close()
@@ -1,8 +1,15 @@
+import io
+import pickle
+import subprocess
+import sys
+import threading
 from typing import List
 
 import pytest
 
 import dango
+from dango import Tokenizer
+from dango.word import CompactWord, map_part_of_speech
 
 
 def test_empty_phrase():
@@ -59,3 +66,266 @@ def test_tokenize(expected: List[str]):
 ], ids=lambda e: ''.join(e))
 def test_dictionary_form_reading(phrase: str, expected: List[str]):
     assert [w.dictionary_form_reading for w in dango.tokenize(phrase)] == expected
+
+
+def test_tokenize_many():
+    phrases = ['昨日映画を見ました', '', '東京に住んでいます', 'このビルは高くなかった']
+    expected = [[w.surface for w in dango.tokenize(p)] for p in phrases]
+
+    assert [[w.surface for w in words] for words in dango.tokenize_many(phrases)] == expected
+
+
+def test_tokenize_many_with_workers():
+    phrases = ['昨日映画を見ました', '', '東京に住んでいます', 'このビルは高くなかった'] * 5
+    expected = [[CompactWord.from_word(w) for w in dango.tokenize(p)] for p in phrases]
+
+    assert list(dango.tokenize_many(phrases, workers=2, chunksize=3)) == expected
+
+
+def test_tokenize_many_reads_ahead_boundedly():
+    consumed = 0
+
+    def phrases():
+        nonlocal consumed
+        for _ in range(10000):
+            consumed += 1
+            yield '映画を見ました'
+
+    results = dango.tokenize_many(phrases(), workers=2, chunksize=10)
+    next(results)
+
+    # at most two chunks per worker are submitted ahead, plus the chunk that is being submitted
+    assert consumed <= 2 * 2 * 10 + 10
+
+
+def test_tokenize_many_invalid_workers():
+    with pytest.raises(ValueError):
+        dango.tokenize_many([], workers=0)
+
+
+def test_iter_tokenize():
+    phrase = '私は昨日映画を見ました。東京に住んでいます！\nこの店はまだ開いていない'
+    assert [w.surface for w in dango.iter_tokenize(phrase)] == [w.surface for w in dango.tokenize(phrase)]
+
+
+def test_iter_tokenize_file():
+    text = '私は昨日映画を見ました。\n東京に住んでいます\n' * 100
+    words = dango.iter_tokenize(io.StringIO(text))
+    assert ''.join(w.surface for w in words) == text
+
+
+def test_compact_tokenizer():
+    phrase = '私は昨日映画を見ました'
+    words = Tokenizer(compact=True).tokenize(phrase)
+
+    assert all(isinstance(w, CompactWord) for w in words)
+    assert words == [CompactWord.from_word(w) for w in dango.tokenize(phrase)]
+
+
+def test_part_of_speech_table():
+    tokenizer = Tokenizer()
+
+    for w in tokenizer.tokenize('私は昨日映画を見ました。'):
+        pos_id = w.morphemes[0].part_of_speech_id()
+        assert tokenizer.part_of_speech_table[pos_id] == map_part_of_speech(w.morphemes[0].part_of_speech())
+
+
+def test_reading_cache():
+    tokenizer = Tokenizer(reading_cache_size=10)
+    phrase = '昨日映画を見ました'
+
+    assert [w.dictionary_form_reading for w in tokenizer.tokenize(phrase)] == ['きのう', 'えいが', 'を', 'みる']
+    info = tokenizer.reading_cache_info()
+    assert (info.hits, info.misses, info.maxsize, info.currsize) == (0, 1, 10, 1)
+
+    assert [w.dictionary_form_reading for w in tokenizer.tokenize(phrase)] == ['きのう', 'えいが', 'を', 'みる']
+    assert tokenizer.reading_cache_info().hits == 1
+
+
+def test_reading_cache_disabled():
+    tokenizer = Tokenizer(reading_cache_size=0)
+    phrase = '昨日映画を見ました'
+
+    assert [w.dictionary_form_reading for w in tokenizer.tokenize(phrase)] == ['きのう', 'えいが', 'を', 'みる']
+    assert tokenizer.reading_cache_info().currsize == 0
+
+
+def test_import_does_not_load_sudachipy():
+    code = (
+        'import sys, dango\n'
+        'assert "sudachipy" not in sys.modules\n'
+        'dango.tokenize("")\n'
+        'assert "sudachipy" in sys.modules\n'
+    )
+    subprocess.run([sys.executable, '-c', code], check=True)
+
+
+def test_default_tokenizer():
+    assert dango.DEFAULT_TOKENIZER is dango.get_default_tokenizer()
+
+
+def test_shared_dictionary():
+    tokenizer = Tokenizer()
+    other = Tokenizer(dictionary=tokenizer.dictionary)
+
+    assert other.dictionary is tokenizer.dictionary
+    assert [w.surface for w in other.tokenize('私は昨日映画を見ました')] == ['私', 'は', '昨日', '映画', 'を', '見ました']
+
+
+@pytest.mark.skipif(not sys.platform.startswith('linux'), reason='requires /proc/self/maps')
+def test_dictionary_is_memory_mapped():
+    Tokenizer()
+
+    # The system dictionary should be mapped read-only and shared, so that
+    # its pages are shared with any other process using the same file.
+    with open('/proc/self/maps') as f:
+        mappings = [line.split() for line in f if line.rstrip().endswith('system.dic')]
+
+    assert mappings
+    assert all(m[1] == 'r--s' for m in mappings)
+
+
+def test_word_offsets():
+    phrase = '私は昨日映画を見ました'
+    assert [(w.begin, w.end) for w in dango.tokenize(phrase)] == [(0, 1), (1, 2), (2, 4), (4, 6), (6, 7), (7, 11)]
+
+
+def test_iter_tokenize_word_offsets():
+    text = '私は映画を見ました。\n東京に住んでいます！\n' * 3
+    assert all(text[w.begin:w.end] == w.surface for w in dango.iter_tokenize(io.StringIO(text)))
+
+
+@pytest.mark.parametrize(('split_mode', 'expected'), [
+    ('A', ['国家', '公務', '員', 'が', '選挙', '管理', '委員', '会', 'に', '行きました']),
+    ('B', ['国家', '公務員', 'が', '選挙', '管理', '委員会', 'に', '行きました']),
+    ('C', ['国家公務員', 'が', '選挙管理委員会', 'に', '行きました']),
+])
+def test_split_mode(split_mode: str, expected: List[str]):
+    tokenizer = Tokenizer(split_mode=split_mode)
+
+    assert tokenizer.split_mode == split_mode
+    assert [w.surface for w in tokenizer.tokenize('国家公務員が選挙管理委員会に行きました')] == expected
+    assert pickle.loads(pickle.dumps(tokenizer)).split_mode == split_mode
+
+
+def test_dictionary_type():
+    pytest.importorskip('sudachidict_small')
+
+    tokenizer = Tokenizer(dictionary_type='small')
+    assert tokenizer._cache_namespace != Tokenizer()._cache_namespace
+    assert [w.surface for w in tokenizer.tokenize('私は昨日映画を見ました')] == ['私', 'は', '昨日', '映画', 'を', '見ました']
+
+
+def test_shared_dictionary_in_spawned_workers(monkeypatch: pytest.MonkeyPatch):
+    pytest.importorskip('sudachidict_small')
+    import multiprocessing
+
+    # spawned workers don't inherit the dictionary but have to load the same one again
+    monkeypatch.setattr('multiprocessing.Pool', multiprocessing.get_context('spawn').Pool)
+    tokenizer = Tokenizer(dictionary=dango.dango.load_dictionary('small'))
+    phrases = ['国立国会図書館に行きました'] * 4
+
+    expected = [[w.surface for w in words] for words in tokenizer.tokenize_many(phrases)]
+    assert expected[0] != [w.surface for w in dango.tokenize(phrases[0])]
+    assert [[w.surface for w in words] for words in tokenizer.tokenize_many(phrases, workers=2)] == expected
+
+
+def test_pickle_tokenizer_with_unknown_dictionary():
+    from sudachipy.dictionary import Dictionary
+
+    with pytest.raises(TypeError, match='load_dictionary'):
+        pickle.dumps(Tokenizer(dictionary=Dictionary()))
+
+
+def test_user_dictionaries(tmp_path):
+    source = tmp_path / 'user.csv'
+    source.write_text('ダンゴムシ語,4786,4786,5000,ダンゴムシ語,名詞,固有名詞,一般,*,*,*,ダンゴムシゴ,ダンゴムシ語,*,*,*,*,*\n',
+                      encoding='utf-8')
+    user_dictionary = str(tmp_path / 'user.dic')
+    subprocess.run([sys.executable, '-c', 'from sudachipy.command_line import main; main()',
+                    'ubuild', '-o', user_dictionary, str(source)], check=True, stdout=subprocess.DEVNULL)
+
+    tokenizer = Tokenizer(user_dictionaries=[user_dictionary])
+
+    assert [w.surface for w in tokenizer.tokenize('ダンゴムシ語を話す')] == ['ダンゴムシ語', 'を', '話す']
+    assert [w.surface for w in Tokenizer().tokenize('ダンゴムシ語を話す')] != ['ダンゴムシ語', 'を', '話す']
+    assert tokenizer._cache_namespace != Tokenizer()._cache_namespace
+
+
+@pytest.mark.parametrize('options', [
+    dict(split_mode='D'),
+    dict(dictionary_type='medium'),
+])
+def test_invalid_dictionary_options(options):
+    with pytest.raises(ValueError):
+        Tokenizer(**options)
+
+
+def test_shared_dictionary_with_dictionary_options():
+    with pytest.raises(ValueError):
+        Tokenizer(dictionary=dango.get_default_tokenizer().dictionary, dictionary_type='core')
+
+
+def test_fields():
+    tokenizer = Tokenizer(fields={'surface', 'part_of_speech'})
+    words = tokenizer.tokenize('私は昨日映画を見ました')
+
+    assert [w.surface for w in words] == ['私', 'は', '昨日', '映画', 'を', '見ました']
+    # the reading wasn't looked up, but still is on access
+    assert tokenizer.reading_cache_info().misses == 0
+    assert words[-1].dictionary_form_reading == 'みる'
+    assert tokenizer.reading_cache_info().misses == 1
+
+
+def test_deferred_reading_lookup_is_guarded():
+    tokenizer = Tokenizer(fields={'surface', 'part_of_speech'})
+    word = tokenizer.tokenize('見ました')[0]
+    readings = []
+    reader = threading.Thread(target=lambda: readings.append(word.dictionary_form_reading))
+
+    # the reading is looked up in another thread, which has to wait while the dictionary is in use
+    with tokenizer._read_lock:
+        reader.start()
+        reader.join(0.1)
+        assert reader.is_alive()
+    reader.join()
+
+    assert readings == ['みる']
+
+
+def test_compact_fields():
+    tokenizer = Tokenizer(compact=True, fields={'surface', 'dictionary_form'})
+    word = tokenizer.tokenize('見ました')[0]
+
+    assert (word.surface, word.dictionary_form) == ('見ました', '見る')
+    assert (word.surface_reading, word.dictionary_form_reading) == (None, None)
+    # the part of speech is always kept
+    assert word.part_of_speech == dango.PartOfSpeech.VERB
+    assert [w.dictionary_form for ws in tokenizer.tokenize_many(['見ました'], workers=2) for w in ws] == ['見る']
+    assert tokenizer._cache_namespace != Tokenizer(compact=True)._cache_namespace
+
+
+def test_invalid_fields():
+    with pytest.raises(ValueError, match='reading'):
+        Tokenizer(fields={'surface', 'reading'})
+
+
+def test_exclude_pos():
+    tokenizer = Tokenizer(exclude_pos={dango.PartOfSpeech.PARTICLE})
+    words = tokenizer.tokenize('私は昨日映画を見ました')
+
+    assert [w.surface for w in words] == ['私', '昨日', '映画', '見ました']
+    # readings are only looked up for words that are returned
+    assert tokenizer.reading_cache_info().misses == 1
+    assert [(w.begin, w.end) for w in tokenizer.iter_tokenize('私は昨日映画を見ました')] == \
+        [(0, 1), (2, 4), (4, 6), (7, 11)]
+
+
+def test_include_pos():
+    tokenizer = Tokenizer(include_pos={dango.PartOfSpeech.VERB}, exclude_pos=set())
+    assert [w.surface for w in tokenizer.tokenize('私は昨日映画を見ました')] == ['見ました']
+    assert [w.surface for w in tokenizer.iter_tokenize('映画を見ました。本を読んだ。')] == ['見ました', '読んだ']
+    assert [[w.surface for w in ws] for ws in tokenizer.tokenize_many(['映画を見ました'], workers=2)] == \
+        [['見ました']]
+    assert tokenizer._cache_namespace != Tokenizer()._cache_namespace
+    assert pickle.loads(pickle.dumps(tokenizer)).tokenize('映画を見ました')[0].surface == '見ました'
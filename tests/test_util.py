@@ -1,6 +1,8 @@
+from typing import List
+
 import pytest
 
-from dango.util import katakana_to_hiragana
+from dango.util import iter_segments, katakana_to_hiragana
 
 KATAKANA = (
     'ァアィイゥウェエォオカガキギク'
@@ -31,3 +33,17 @@ HIRAGANA = (
 ])
 def test_katakana_to_hiragana(string: str, expected: str):
     assert katakana_to_hiragana(string) == expected
+
+
+@pytest.mark.parametrize(['chunks', 'max_length', 'expected'], [
+    ([''], 10, []),
+    (['私は映画を見ました。東京に住んでいます'], 100, ['私は映画を見ました。', '東京に住んでいます']),
+    (['「見た。」と言った！？次\n\nあ'], 100, ['「見た。」と言った！？', '次\n\n', 'あ']),
+    # segments can continue across chunks
+    (['映画を見', 'ました。東京', 'に'], 100, ['映画を見ました。', '東京に']),
+    # segments without any boundary are split at the maximum length
+    (['あいうえおかきくけこ'], 4, ['あいうえ', 'おかきく', 'けこ']),
+    (['あいう。えおかきくけこ'], 4, ['あいう。', 'えおかき', 'くけこ'])
+])
+def test_iter_segments(chunks: List[str], max_length: int, expected: List[str]):
+    assert list(iter_segments(chunks, max_length)) == expected
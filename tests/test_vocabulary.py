@@ -0,0 +1,56 @@
+from collections import Counter
+
+import pytest
+
+import dango
+from dango import Tokenizer, VocabularyEntry
+from dango.vocabulary import count_words
+from dango.word import PartOfSpeech
+
+TEXTS = ['私は昨日映画を見ました。', '東京に住んでいます。', '映画を見ない！']
+
+MIRU = VocabularyEntry('見る', 'みる', PartOfSpeech.VERB)
+EIGA = VocabularyEntry('映画', 'えいが', PartOfSpeech.NOUN)
+
+
+def test_count_words():
+    counts = count_words(dango.tokenize('映画を見た'), Counter())
+
+    assert counts == Counter({EIGA: 1, MIRU: 1})
+
+
+def test_count_words_exclude_nothing():
+    counts = count_words(dango.tokenize('映画を見た'), Counter(), exclude=frozenset())
+
+    assert counts[VocabularyEntry('を', 'を', PartOfSpeech.PARTICLE)] == 1
+
+
+def test_count_vocabulary():
+    counts = dango.count_vocabulary(TEXTS)
+
+    # inflections count towards the same entry
+    assert counts[MIRU] == 2
+    assert counts[EIGA] == 2
+    assert not any(entry.part_of_speech in (PartOfSpeech.PARTICLE, PartOfSpeech.SYMBOL) for entry in counts)
+    assert set(counts.most_common(2)) == {(EIGA, 2), (MIRU, 2)}
+
+
+def test_count_vocabulary_with_workers():
+    tokenizer = Tokenizer()
+    texts = TEXTS * 20
+
+    assert tokenizer.count_vocabulary(texts, workers=2, chunksize=7) == tokenizer.count_vocabulary(texts)
+
+
+def test_count_vocabulary_with_pos_filter():
+    tokenizer = Tokenizer(include_pos={PartOfSpeech.VERB, PartOfSpeech.PARTICLE})
+    counts = tokenizer.count_vocabulary(TEXTS)
+
+    # the excluded parts of speech still apply on top of the filter of the tokenizer
+    assert {entry.dictionary_form for entry in counts} == {'見る', '住む'}
+    assert counts[MIRU] == 2
+
+
+def test_count_vocabulary_invalid_workers():
+    with pytest.raises(ValueError):
+        dango.count_vocabulary(TEXTS, workers=0)
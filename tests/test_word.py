@@ -1,9 +1,10 @@
+import pickle
 from typing import List
 from unittest.mock import Mock
 
 import pytest
 
-from dango.word import Word, PartOfSpeech
+from dango.word import CompactWord, Word, PartOfSpeech, map_part_of_speech
 
 
 def test_morphemes_property():
@@ -22,6 +23,15 @@ def test_surface_property(surfaces: List[str], expected: str):
     assert word.surface == expected
 
 
+def test_surface_is_sliced_from_phrase():
+    morphemes = [Mock(**{'begin.return_value': 2, 'end.return_value': 3}),
+                 Mock(**{'begin.return_value': 3, 'end.return_value': 5})]
+    word = Word(morphemes, phrase='映画を見た。', offset=10)
+
+    assert word.surface == 'を見た'
+    assert (word.begin, word.end) == (12, 15)
+
+
 @pytest.mark.parametrize(('reading_forms', 'expected'), [
     ([], ''),
     (['ミル'], 'みる'),
@@ -58,3 +68,85 @@ def test_part_of_speech_property(pos: List[str], expected: str):
         Mock(**{'part_of_speech.return_value': ['should', 'be', 'ignored']})
     ])
     assert word.part_of_speech == expected
+
+
+def test_compact_word_from_word():
+    word = Word([
+        Mock(**{
+            'surface.return_value': '見',
+            'reading_form.return_value': 'ミ',
+            'dictionary_form.return_value': '見る',
+            'part_of_speech.return_value': ['動詞', '非自立可能', '*', '*', '上一段-マ行', '連用形-一般'],
+            'begin.return_value': 3
+        }),
+        Mock(**{'surface.return_value': 'た', 'reading_form.return_value': 'タ', 'end.return_value': 5})
+    ], 'みる')
+
+    assert CompactWord.from_word(word) == CompactWord('見た', 'みた', '見る', 'みる', PartOfSpeech.VERB, 3, 5)
+
+
+def test_compact_word_from_word_with_fields():
+    morpheme = Mock(**{
+        'surface.return_value': '見る',
+        'part_of_speech.return_value': ['動詞', '非自立可能', '*', '*', '上一段-マ行', '終止形-一般'],
+        'begin.return_value': 0,
+        'end.return_value': 2,
+    })
+    word = Word([morpheme], 'みる')
+
+    compact = CompactWord.from_word(word, {'surface', 'part_of_speech'})
+
+    assert compact == CompactWord('見る', None, None, None, PartOfSpeech.VERB, None, None)  # type: ignore
+    morpheme.reading_form.assert_not_called()
+    morpheme.dictionary_form.assert_not_called()
+
+
+def test_dictionary_form_reading_is_found_on_first_access():
+    morpheme = Mock()
+    find_reading = Mock(return_value='みる')
+    word = Word([morpheme], find_dictionary_form_reading=find_reading)
+
+    find_reading.assert_not_called()
+    assert word.dictionary_form_reading == 'みる'
+    assert word.dictionary_form_reading == 'みる'
+    find_reading.assert_called_once_with(morpheme)
+
+
+def test_shifted():
+    word = Word([Mock(**{'begin.return_value': 1, 'end.return_value': 3})], 'みる', PartOfSpeech.VERB, offset=2)
+    shifted = word.shifted(10)
+
+    assert (shifted.begin, shifted.end, shifted.dictionary_form_reading) == (13, 15, 'みる')
+    assert (word.begin, word.end) == (3, 5)
+
+    compact = CompactWord('見た', 'みた', '見る', 'みる', PartOfSpeech.VERB, 3, 5)
+    assert compact.shifted(10) == CompactWord('見た', 'みた', '見る', 'みる', PartOfSpeech.VERB, 13, 15)
+    assert CompactWord('見た', None, None, None, None, None, None).shifted(10).begin is None
+
+
+def test_compact_word_is_immutable():
+    word = CompactWord('見た', 'みた', '見る', 'みる', PartOfSpeech.VERB)
+
+    with pytest.raises(AttributeError):
+        word.surface = '見る'  # type: ignore
+
+
+def test_compact_word_can_be_pickled():
+    word = CompactWord('見た', 'みた', '見る', 'みる', PartOfSpeech.VERB)
+    assert pickle.loads(pickle.dumps(word)) == word
+
+
+def test_part_of_speech_argument():
+    # a part of speech that is already known takes precedence over the morpheme features
+    word = Word([Mock(**{'part_of_speech.return_value': ['名詞', '*', '*', '*', '*']})], None, PartOfSpeech.NAME)
+    assert word.part_of_speech == PartOfSpeech.NAME
+
+
+@pytest.mark.parametrize(('pos', 'expected'), [
+    (['名詞', '*', '*', '*', '*', '*'], PartOfSpeech.NOUN),
+    (['名詞', '固有名詞', '地名', '一般', '*', '*'], PartOfSpeech.PLACE_NAME),
+    (['空白', '*', '*', '*', '*', '*'], PartOfSpeech.WHITESPACE),
+    (['unknown', '*', '*', '*', '*', '*'], PartOfSpeech.UNKNOWN),
+])
+def test_map_part_of_speech(pos: List[str], expected: PartOfSpeech):
+    assert map_part_of_speech(pos) == expected